@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Microbenchmark: cost of broadcasting one large webhook to N SSE clients.
+
+Compares serializing the event per client (the old serve_sse behaviour)
+with encoding the frame once in record_webhook and sharing the bytes.
+
+Usage:
+    python bench/bench_broadcast.py [--body-mb 1] [--rounds 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hooklens  # noqa: E402
+
+
+def per_client(event, sinks):
+    for sink in sinks:
+        sink.write(f'data: {json.dumps(event)}\n\n'.encode('utf-8'))
+
+
+def shared_frame(event, sinks):
+    frame = hooklens.sse_frame(event)
+    for sink in sinks:
+        sink.write(frame)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--body-mb', type=float, default=1.0)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    body = json.dumps({'blob': 'x' * int(args.body_mb * 1024 * 1024)})
+    event = {'type': 'webhook', 'payload': {
+        'id': 'bench', 'timestamp': '', 'method': 'POST', 'path': '/webhook',
+        'headers': {'Content-Type': 'application/json'}, 'body': body,
+    }}
+
+    results = []
+    with open(os.devnull, 'wb', buffering=0) as devnull:
+        for clients in (1, 10, 50, 200):
+            sinks = [devnull] * clients
+            row = {'clients': clients}
+            for name, strategy in (('per_client_ms', per_client), ('shared_frame_ms', shared_frame)):
+                start = time.perf_counter()
+                for _ in range(args.rounds):
+                    strategy(event, sinks)
+                row[name] = round((time.perf_counter() - start) / args.rounds * 1000, 2)
+            results.append(row)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Measure ingest on one channel while many SSE clients watch others.
+
+--clients SSE clients are attached and drained. Compared:
+  unfiltered   every client watches all channels (/events)
+  other        every client watches another channel (/events?channel=other)
+Webhooks are always posted to /webhook/hot. With channel subscriptions,
+a capture only wakes the streams of its own channel, so the server's CPU
+time per request should stay flat in the second run however many
+clients watch other channels.
+
+Usage:
+    python bench/bench_channels.py [--clients 200] [--requests 2000]
+"""
+
+import argparse
+import json
+import threading
+import time
+
+from common import cpu_seconds, open_sse, post_webhooks, start_server, stop_server
+
+
+def drain(sock):
+    try:
+        while sock.recv(65536):
+            pass
+    except OSError:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--engine', default='threaded')
+    args = parser.parse_args()
+
+    body = json.dumps({'event': 'bench', 'data': 'x' * 256})
+    results = {}
+    for name, events_path in (('unfiltered', '/events'), ('other', '/events?channel=other')):
+        proc, port = start_server('--engine', args.engine, '--quiet', '--max-requests', '1000')
+        sockets = []
+        try:
+            for _ in range(args.clients):
+                sock = open_sse(port, events_path)
+                sockets.append(sock)
+                threading.Thread(target=drain, args=(sock,), daemon=True).start()
+            time.sleep(0.5)
+            cpu_before = cpu_seconds(proc.pid)
+            result = post_webhooks(
+                port, args.requests, args.concurrency, body, reuse=True, path='/webhook/hot'
+            )
+            # Let the woken streams finish their writes
+            time.sleep(0.5)
+            cpu = cpu_seconds(proc.pid) - cpu_before
+            result['server_cpu_ms_per_request'] = round(cpu * 1000 / max(result['requests'], 1), 3)
+            results[name] = result
+        finally:
+            for sock in sockets:
+                sock.close()
+            stop_server(proc)
+    print(json.dumps({'engine': args.engine, 'clients': args.clients, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Ingest throughput for chunked vs. Content-Length request bodies.
+
+Usage:
+    python bench/bench_chunked.py [--requests 500] [--body-kb 256] [--chunk-kb 8]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import time
+
+from common import start_server, stop_server
+
+
+def send(port, requests, body, chunk_size, chunked):
+    start = time.perf_counter()
+    for _ in range(requests):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        if chunked:
+            chunks = (body[i:i + chunk_size] for i in range(0, len(body), chunk_size))
+            conn.request('POST', '/webhook', chunks, {'Content-Type': 'application/octet-stream'},
+                         encode_chunked=True)
+        else:
+            conn.request('POST', '/webhook', body, {'Content-Type': 'application/octet-stream'})
+        response = conn.getresponse()
+        response.read()
+        conn.close()
+        if response.status != 200:
+            raise RuntimeError(f'unexpected status {response.status}')
+    elapsed = time.perf_counter() - start
+    return {
+        'requests_per_sec': round(requests / elapsed, 1),
+        'mb_per_sec': round(requests * len(body) / elapsed / 1024 / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--body-kb', type=int, default=256)
+    parser.add_argument('--chunk-kb', type=int, default=8)
+    parser.add_argument('--engine', default='threaded')
+    args = parser.parse_args()
+
+    # Random bytes: exercises the binary (base64) path as well
+    body = os.urandom(args.body_kb * 1024)
+    results = {}
+    proc, port = start_server('--engine', args.engine)
+    try:
+        for name, chunked in (('content_length', False), ('chunked', True)):
+            results[name] = send(port, args.requests, body, args.chunk_kb * 1024, chunked)
+    finally:
+        stop_server(proc)
+    print(json.dumps({'engine': args.engine, 'body_kb': args.body_kb, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""Compare webhook ingest throughput of the threaded and asyncio engines.
+
+Usage:
+    python bench/bench_engines.py [--requests N] [--concurrency C]
+"""
+
+import argparse
+import json
+
+from common import post_webhooks, start_server, stop_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--body-size', type=int, default=512)
+    args = parser.parse_args()
+
+    body = json.dumps({'event': 'bench', 'data': 'x' * args.body_size})
+    results = {}
+    for engine in ('threaded', 'asyncio'):
+        proc, port = start_server('--engine', engine)
+        try:
+            results[engine] = post_webhooks(port, args.requests, args.concurrency, body)
+        finally:
+            stop_server(proc)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Measure GET /api/export over a large persisted capture set.
+
+Writes --records synthetic captures straight into a --store directory,
+starts HookLens on it (keeping only a small history in memory) and
+streams the whole set as NDJSON and as HAR. Reports records/s, MB/s and
+the server's resident memory before the export and at its peak, which
+should stay flat however many records are exported.
+
+Usage:
+    python bench/bench_export.py [--records N] [--body-bytes B]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+
+from common import ROOT, proc_status, start_server, stop_server
+
+sys.path.insert(0, ROOT)
+import hooklens  # noqa: E402
+
+
+def write_store(directory, records, body_bytes):
+    """Append records to a capture log the same way the server does."""
+    log = hooklens.CaptureLog(directory)
+    body = json.dumps({'event': 'bench', 'data': 'x' * body_bytes})
+    batch = []
+    for number in range(records):
+        webhook_data = {
+            'id': str(uuid.uuid4()),
+            'timestamp': '2026-01-01 00:00:00',
+            'method': 'POST',
+            'path': f'/webhook?n={number}',
+            'headers': {'Host': 'localhost', 'Content-Type': 'application/json'},
+            'body': body,
+            'body_encoding': None,
+            'body_size': len(body),
+            'body_spooled': False,
+        }
+        batch.append(json.dumps(webhook_data).encode('utf-8'))
+        if len(batch) == 10000:
+            log.write_batch(batch)
+            batch = []
+    if batch:
+        log.write_batch(batch)
+    log.close()
+
+
+def export(port, export_format):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=600)
+    started = time.perf_counter()
+    conn.request('GET', f'/api/export?format={export_format}')
+    response = conn.getresponse()
+    size = 0
+    lines = 0
+    while True:
+        data = response.read(1024 * 1024)
+        if not data:
+            break
+        size += len(data)
+        lines += data.count(b'\n')
+    elapsed = time.perf_counter() - started
+    conn.close()
+    return size, elapsed, lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--records', type=int, default=1000000)
+    parser.add_argument('--body-bytes', type=int, default=128)
+    parser.add_argument('--formats', default='ndjson,har')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='hooklens-export-')
+    try:
+        started = time.perf_counter()
+        write_store(directory, args.records, args.body_bytes)
+        setup = time.perf_counter() - started
+        store_bytes = sum(
+            os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)
+        )
+        proc, port = start_server('--store', directory, '--quiet', '--max-requests', '100')
+        try:
+            results = {}
+            for export_format in args.formats.split(','):
+                rss_before = proc_status(proc.pid, 'VmRSS')
+                size, elapsed, lines = export(port, export_format)
+                results[export_format] = {
+                    'bytes': size,
+                    'seconds': round(elapsed, 2),
+                    'records_per_sec': round(args.records / elapsed),
+                    'mb_per_sec': round(size / elapsed / 1e6, 1),
+                    'rss_before_kb': rss_before,
+                    'rss_after_kb': proc_status(proc.pid, 'VmRSS'),
+                    'rss_peak_kb': proc_status(proc.pid, 'VmHWM'),
+                }
+                if export_format == 'ndjson':
+                    results[export_format]['records'] = lines
+        finally:
+            stop_server(proc)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print(json.dumps({
+        'records': args.records,
+        'store_mb': round(store_bytes / 1e6, 1),
+        'setup_seconds': round(setup, 1),
+        'results': results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Measure ingest latency and server memory with many SSE clients attached.
+
+Half of the clients read their stream continuously (idle dashboards), the
+other half never read (stalled tabs). Stalled clients used to pin every
+event in their own queue; with the shared event ring memory stays flat.
+
+Usage:
+    python bench/bench_fanout.py [--clients 200] [--requests 2000]
+"""
+
+import argparse
+import http.client
+import json
+import socket
+import threading
+import time
+
+from common import open_sse, percentile, rss_kb, start_server, stop_server
+
+
+def drain(sock):
+    try:
+        while sock.recv(65536):
+            pass
+    except OSError:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--body-size', type=int, default=4096)
+    parser.add_argument('--engine', default='threaded')
+    args = parser.parse_args()
+
+    proc, port = start_server('--engine', args.engine)
+    sockets = []
+    try:
+        for index in range(args.clients):
+            sock = open_sse(port)
+            sockets.append(sock)
+            if index % 2 == 0:
+                threading.Thread(target=drain, args=(sock,), daemon=True).start()
+            else:
+                # Stalled tab: tiny receive buffer, never read
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        time.sleep(0.5)
+        rss_before = rss_kb(proc.pid)
+
+        body = json.dumps({'event': 'bench', 'data': 'x' * args.body_size})
+        latencies = []
+        conn = None
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+            conn.request('POST', '/webhook', body, {'Content-Type': 'application/json'})
+            conn.getresponse().read()
+            conn.close()
+            latencies.append(time.perf_counter() - start)
+        time.sleep(1)
+
+        print(json.dumps({
+            'engine': args.engine,
+            'clients': args.clients,
+            'requests': args.requests,
+            'ingest_p50_ms': round(percentile(latencies, 50) * 1000, 2),
+            'ingest_p99_ms': round(percentile(latencies, 99) * 1000, 2),
+            'rss_before_kb': rss_before,
+            'rss_after_kb': rss_kb(proc.pid),
+        }, indent=2))
+    finally:
+        for sock in sockets:
+            sock.close()
+        stop_server(proc)
+
+
+if __name__ == '__main__':
+    main()
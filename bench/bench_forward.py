@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Measure ingest throughput while every capture is relayed upstream.
+
+A stub upstream runs in this process. It answers after --upstream-delay-ms
+and fails a share of first attempts with 503 so retries are exercised.
+Compared:
+  capture_only   no --forward-to
+  forward        --forward-to the stub
+  forward_rate   --forward-to the stub with --forward-rate
+
+For each run the report gives the ingest rate seen by webhook senders,
+how long the upstream took to receive everything, and how many TCP
+connections the upstream accepted (pooling keeps this near
+--forward-concurrency).
+
+Usage:
+    python bench/bench_forward.py [--requests N] [--upstream-delay-ms MS]
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+from common import post_webhooks, start_server, stop_server
+
+
+class Upstream(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, delay, fail_ratio):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), UpstreamHandler)
+        self.delay = delay
+        self.fail_ratio = fail_ratio
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.connections = 0
+            self.received = set()
+            self.attempts = 0
+            self.last = None
+
+
+class UpstreamHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        record_id = self.headers.get('X-HookLens-Id', '')
+        time.sleep(self.server.delay)
+        with self.server.lock:
+            self.server.attempts += 1
+            # Fail the first attempt of a fixed share of requests
+            fail = (record_id not in self.server.received and self.server.fail_ratio
+                    and hash(record_id) % 100 < self.server.fail_ratio * 100)
+            self.server.received.add(record_id)
+            if not fail:
+                self.server.last = time.perf_counter()
+        self.send_response(503 if fail else 200)
+        if fail:
+            self.send_header('Retry-After', '0')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--upstream-delay-ms', type=float, default=20)
+    parser.add_argument('--fail-ratio', type=float, default=0.1)
+    parser.add_argument('--forward-concurrency', type=int, default=8)
+    parser.add_argument('--forward-rate', type=float, default=200)
+    args = parser.parse_args()
+
+    upstream = Upstream(args.upstream_delay_ms / 1000.0, args.fail_ratio)
+    threading.Thread(target=upstream.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{upstream.server_address[1]}/hook'
+    forward = ['--forward-to', url, '--forward-concurrency', str(args.forward_concurrency),
+               '--forward-queue', str(args.requests * 2)]
+    configs = (
+        ('capture_only', []),
+        ('forward', forward),
+        ('forward_rate', forward + ['--forward-rate', str(args.forward_rate)]),
+    )
+
+    body = json.dumps({'event': 'bench', 'data': 'x' * 256})
+    results = {}
+    for name, extra in configs:
+        upstream.reset()
+        proc, port = start_server(*extra, '--quiet', '--max-requests', str(args.requests))
+        try:
+            started = time.perf_counter()
+            result = post_webhooks(port, args.requests, args.concurrency, body, reuse=True)
+            if extra:
+                deadline = time.time() + 120
+                while time.time() < deadline and upstream.attempts < result['requests']:
+                    time.sleep(0.05)
+                while time.time() < deadline:
+                    # Wait for retries to settle
+                    before = upstream.attempts
+                    time.sleep(0.5)
+                    if upstream.attempts == before:
+                        break
+                result['upstream_received'] = len(upstream.received)
+                result['upstream_attempts'] = upstream.attempts
+                result['upstream_connections'] = upstream.connections
+                if upstream.last is not None:
+                    result['delivered_after_sec'] = round(upstream.last - started, 2)
+            results[name] = result
+        finally:
+            stop_server(proc)
+    upstream.shutdown()
+    print(json.dumps({
+        'upstream_delay_ms': args.upstream_delay_ms,
+        'fail_ratio': args.fail_ratio,
+        'results': results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Measure what loading and reloading the GUI costs on the wire.
+
+A first visit fetches the page and its two assets; a reload only
+revalidates the page (the assets are cached under versioned URLs).
+Also reports GET / throughput for full and 304 responses.
+
+Usage:
+    python bench/bench_gui.py [--requests N]
+"""
+
+import argparse
+import http.client
+import json
+import re
+import time
+import zlib
+
+from common import start_server, stop_server
+
+
+def fetch(conn, path, headers):
+    conn.request('GET', path, headers=headers)
+    response = conn.getresponse()
+    body = response.read()
+    return response, body
+
+
+def throughput(port, headers, requests):
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    started = time.perf_counter()
+    for _ in range(requests):
+        fetch(conn, '/', headers)
+    elapsed = time.perf_counter() - started
+    conn.close()
+    return round(requests / elapsed, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    proc, port = start_server('--quiet')
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        results = {}
+        for name, headers in (('identity', {}), ('gzip', {'Accept-Encoding': 'gzip'})):
+            response, page = fetch(conn, '/', headers)
+            etag = response.getheader('ETag')
+            html = page
+            if response.getheader('Content-Encoding') == 'gzip':
+                html = zlib.decompress(page, 16 + zlib.MAX_WBITS)
+            assets = re.findall(rb'(?:href|src)="(/static/[^"]+)"', html)
+            first = len(page) + sum(len(fetch(conn, a.decode(), headers)[1]) for a in assets)
+            response, body = fetch(conn, '/', dict(headers, **{'If-None-Match': etag}))
+            results[name] = {
+                'first_load_body_bytes': first,
+                'reload_status': response.status,
+                'reload_body_bytes': len(body),
+            }
+        conn.close()
+        # etag is the gzip variant's, from the last loop iteration
+        results['page_requests_per_sec'] = {
+            'full': throughput(port, {'Accept-Encoding': 'gzip'}, args.requests),
+            'not_modified': throughput(
+                port, {'Accept-Encoding': 'gzip', 'If-None-Match': etag}, args.requests
+            ),
+        }
+    finally:
+        stop_server(proc)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
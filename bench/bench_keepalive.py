@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Compare webhook ingest with and without HTTP/1.1 connection reuse.
+
+Each client thread either opens a new connection per request or sends all
+of its requests over one persistent connection.
+
+The threaded engine holds a worker per open connection and closes
+connections while others wait for one, so with --concurrency above its
+--workers (16 by default) some keep-alive requests reconnect.
+
+Usage:
+    python bench/bench_keepalive.py [--requests N] [--concurrency C]
+"""
+
+import argparse
+import json
+
+from common import post_webhooks, start_server, stop_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--body-size', type=int, default=512)
+    args = parser.parse_args()
+
+    body = json.dumps({'event': 'bench', 'data': 'x' * args.body_size})
+    results = {}
+    for engine in ('threaded', 'asyncio'):
+        proc, port = start_server('--engine', engine, '--max-requests', str(args.requests))
+        try:
+            results[engine] = {
+                mode: post_webhooks(port, args.requests, args.concurrency, body, reuse=reuse)
+                for mode, reuse in (('new_connection', False), ('keep_alive', True))
+            }
+        finally:
+            stop_server(proc)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
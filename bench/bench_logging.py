@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Measure ingest throughput while the access log goes to a slow consumer.
+
+The server's stdout is a pipe, shrunk to one page on Linux so it fills
+quickly, drained at a fixed slow rate. Compared:
+  sync          --log-policy block --log-buffer 1, which makes every request
+                wait for its line to be written, like a plain print()
+  buffered_block  the default buffer with the block policy
+  buffered_drop   the default buffer with the drop policy (the default)
+  quiet           --quiet
+
+Usage:
+    python bench/bench_logging.py [--requests N] [--drain-bytes-per-sec B]
+"""
+
+import argparse
+import fcntl
+import json
+import subprocess
+import threading
+import time
+
+from common import post_webhooks, start_server, stop_server
+
+CONFIGS = (
+    ('sync', ['--log-policy', 'block', '--log-buffer', '1']),
+    ('buffered_block', ['--log-policy', 'block']),
+    ('buffered_drop', ['--log-policy', 'drop']),
+    ('quiet', ['--quiet']),
+)
+
+
+# fcntl.F_SETPIPE_SZ, missing from the fcntl module before Python 3.10
+F_SETPIPE_SZ = 1031
+
+
+def slow_drain(stream, bytes_per_sec, stop):
+    """Read from stream in small pieces at roughly bytes_per_sec."""
+    piece = 256
+    while not stop.is_set():
+        if not stream.read1(piece):
+            break
+        time.sleep(piece / bytes_per_sec)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--drain-bytes-per-sec', type=int, default=8192)
+    args = parser.parse_args()
+
+    body = json.dumps({'event': 'bench', 'data': 'x' * 256})
+    results = {}
+    for name, extra in CONFIGS:
+        proc, port = start_server(*extra, '--max-requests', '1000', stdout=subprocess.PIPE)
+        try:
+            fcntl.fcntl(proc.stdout.fileno(), F_SETPIPE_SZ, 4096)
+        except OSError:
+            pass
+        stop = threading.Event()
+        drain = threading.Thread(
+            target=slow_drain, args=(proc.stdout, args.drain_bytes_per_sec, stop), daemon=True
+        )
+        drain.start()
+        try:
+            results[name] = post_webhooks(port, args.requests, args.concurrency, body, reuse=True)
+        finally:
+            stop.set()
+            stop_server(proc)
+    print(json.dumps({'drain_bytes_per_sec': args.drain_bytes_per_sec, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Measure the memory held per captured request.
+
+Builds --records synthetic captures in process, with headers parsed from
+a raw header block the way the server does, and reports the bytes each
+one holds (tracemalloc) in two forms:
+  dict      the JSON-shaped dict every request used to be stored as
+  capture   hooklens.Capture
+and, for Capture, the cost once stored in history and the search index.
+With --server, HookLens is also started with room for every record and
+its resident memory is read before and after --records webhooks are
+posted (Linux only).
+
+Usage:
+    python bench/bench_memory.py [--records 100000] [--body-bytes 512] [--server]
+"""
+
+import argparse
+import base64
+import gc
+import http.client
+import io
+import json
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+
+from common import ROOT, post_webhooks, proc_status, start_server, stop_server
+
+sys.path.insert(0, ROOT)
+import hooklens  # noqa: E402
+
+HEADER_BLOCK = (
+    b'Host: localhost:8080\r\n'
+    b'User-Agent: Stripe/1.0 (+https://stripe.com/docs/webhooks)\r\n'
+    b'Content-Type: application/json; charset=utf-8\r\n'
+    b'Accept: */*; q=0.5, application/xml\r\n'
+    b'Cache-Control: no-cache\r\n'
+    b'Stripe-Signature: t=%d,v1=%064x\r\n'
+    b'Content-Length: %d\r\n'
+    b'\r\n'
+)
+
+
+def make_body(number, body_bytes):
+    body = json.dumps({'id': f'evt_{number}', 'type': 'invoice.paid', 'data': ''})
+    return body[:-2] + 'x' * max(body_bytes - len(body), 0) + '"}'
+
+
+def parse_headers(number, body):
+    """Parse a header block that, like a real one, is partly unique per request."""
+    block = HEADER_BLOCK % (1700000000 + number, hash((number, 'signature')) & (2 ** 256 - 1), len(body))
+    return http.client.parse_headers(io.BytesIO(block))
+
+
+def as_dict(number, body_bytes):
+    """A record as record_webhook built it before Capture."""
+    body = make_body(number, body_bytes).encode('utf-8')
+    headers = parse_headers(number, body)
+    try:
+        body_text, body_encoding = body.decode('utf-8'), 'utf-8'
+    except UnicodeDecodeError:
+        body_text, body_encoding = base64.b64encode(body).decode('ascii'), 'base64'
+    return {
+        'id': str(uuid.uuid4()),
+        'timestamp': datetime.now().strftime(hooklens.TIMESTAMP_FORMAT),
+        'channel': 'default',
+        'method': 'POST',
+        'path': '/webhook',
+        'headers': {key: value for key, value in headers.items()},
+        'body': body_text,
+        'body_encoding': body_encoding,
+        'body_size': len(body),
+        'body_spooled': False,
+    }
+
+
+def as_capture(number, body_bytes):
+    body = make_body(number, body_bytes).encode('utf-8')
+    return hooklens.Capture(
+        uuid.uuid4().bytes, time.time_ns(), 'default', 'POST', '/webhook',
+        parse_headers(number, body).items(), body,
+    )
+
+
+def measure(build):
+    """Return the bytes held by what build() returns.
+
+    The result is freed before returning, so it cannot share interned
+    strings with the next measurement.
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    gc.collect()
+    return held
+
+
+def per_record(held, records):
+    return {'bytes_per_record': round(held / records), 'mb_per_100k': round(held / records * 100000 / 1e6, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--records', type=int, default=100000)
+    parser.add_argument('--body-bytes', type=int, default=512)
+    parser.add_argument('--server', action='store_true')
+    args = parser.parse_args()
+    count, body_bytes = args.records, args.body_bytes
+
+    results = {}
+    held = measure(lambda: [as_dict(number, body_bytes) for number in range(count)])
+    results['dict'] = per_record(held, count)
+    held = measure(lambda: [as_capture(number, body_bytes) for number in range(count)])
+    results['capture'] = per_record(held, count)
+
+    def stored():
+        webhooks = hooklens.webhooks = hooklens.HistoryStore(count, None)
+        search_index = hooklens.search_index = hooklens.SearchIndex()
+        for number in range(count):
+            hooklens.store_webhook(as_capture(number, body_bytes))
+        hooklens.webhooks = hooklens.HistoryStore()
+        hooklens.search_index = hooklens.SearchIndex()
+        return webhooks, search_index
+    held = measure(stored)
+    results['capture_in_history'] = per_record(held, count)
+
+    if args.server:
+        proc, port = start_server('--quiet', '--max-requests', str(count), '--max-memory-mb', '0')
+        try:
+            before = proc_status(proc.pid, 'VmRSS')
+            post_webhooks(port, count, 8, make_body(0, body_bytes), reuse=True)
+            after = proc_status(proc.pid, 'VmRSS')
+        finally:
+            stop_server(proc)
+        results['server_rss'] = per_record((after - before) * 1024, count)
+
+    print(json.dumps({'records': count, 'body_bytes': body_bytes, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
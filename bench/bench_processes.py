@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Measure webhook ingest scaling across --processes 1/2/4/8.
+
+The load is generated by several client processes so the generator
+itself is not limited to one core. Give the machine more cores than
+server processes plus client processes, or the numbers will flatten out
+at the core count.
+
+Usage:
+    python bench/bench_processes.py [--requests N] [--clients P] [--concurrency C]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import time
+
+from common import post_webhooks, start_server, stop_server
+
+
+def load(job):
+    port, requests, concurrency, body = job
+    return post_webhooks(port, requests, concurrency, body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--clients', type=int, default=4, help='load generator processes')
+    parser.add_argument('--concurrency', type=int, default=16, help='threads per client process')
+    parser.add_argument('--body-size', type=int, default=512)
+    parser.add_argument('--processes', default='1,2,4,8')
+    args = parser.parse_args()
+
+    body = json.dumps({'event': 'bench', 'data': 'x' * args.body_size})
+    results = {}
+    with multiprocessing.Pool(args.clients) as pool:
+        for processes in [int(n) for n in args.processes.split(',')]:
+            proc, port = start_server('--processes', str(processes), '--max-requests', '1000')
+            try:
+                job = (port, args.requests // args.clients, args.concurrency, body)
+                started = time.perf_counter()
+                stats = pool.map(load, [job] * args.clients)
+                elapsed = time.perf_counter() - started
+            finally:
+                stop_server(proc)
+            done = sum(s['requests'] for s in stats)
+            results[processes] = {
+                'requests': done,
+                'errors': sum(s['errors'] for s in stats),
+                'requests_per_sec': round(done / elapsed, 1),
+                'p99_ms': max(s['p99_ms'] for s in stats),
+            }
+    print(json.dumps({'cpus': os.cpu_count(), 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Benchmark the GUI's rendering cost per incoming event.
+
+By default the JavaScript embedded in hooklens.py is run under Node.js
+against a stub DOM (bench/render_harness.js), comparing the incremental
+virtual list with a full rebuild of every row.
+
+With --live RATE a HookLens server is started and fed RATE webhooks per
+second instead. Open the printed URL in a browser and record a trace in
+the DevTools Performance panel to see real layout and paint costs.
+
+Usage:
+    python bench/bench_render.py
+    python bench/bench_render.py --live 300 --duration 60
+"""
+
+import argparse
+import http.client
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import start_server, stop_server
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hooklens  # noqa: E402
+
+HARNESS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'render_harness.js')
+
+
+def run_headless():
+    node = shutil.which('node') or shutil.which('nodejs')
+    if node is None:
+        sys.exit('Node.js is required for the headless benchmark; try --live instead.')
+    with tempfile.NamedTemporaryFile('w', suffix='.js', delete=False) as handle:
+        handle.write(hooklens.GUI_JS)
+    try:
+        subprocess.run([node, HARNESS, handle.name], check=True)
+    finally:
+        os.unlink(handle.name)
+
+
+def run_live(rate, duration):
+    proc, port = start_server()
+    print(f'Open http://localhost:{port}/ - sending {rate} webhooks/s for {duration}s')
+    body = json.dumps({'event': 'order.paid', 'data': {'items': list(range(50))}})
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    try:
+        deadline = time.time() + duration
+        interval = 1.0 / rate
+        next_send = time.time()
+        while time.time() < deadline:
+            conn.request('POST', '/webhook', body, {'Content-Type': 'application/json'})
+            conn.getresponse().read()
+            conn.close()
+            next_send += interval
+            time.sleep(max(0.0, next_send - time.time()))
+    finally:
+        stop_server(proc)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--live', type=float, metavar='RATE')
+    parser.add_argument('--duration', type=float, default=60)
+    args = parser.parse_args()
+    if args.live:
+        run_live(args.live, args.duration)
+    else:
+        run_headless()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Benchmark /api/requests queries against a linear scan of the history.
+
+Builds an in-process history of synthetic captures, then times the same
+filters through SearchIndex and by scanning every stored record.
+
+Usage:
+    python bench/bench_search.py [--records 100000] [--repeat 20]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hooklens  # noqa: E402
+
+EVENTS = ['user.created', 'user.deleted', 'order.paid', 'order.refunded', 'invoice.sent']
+METHODS = ['POST', 'POST', 'POST', 'PUT', 'DELETE']
+
+
+def make_record(index, rng):
+    headers = {'Host': 'localhost', 'Content-Type': 'application/json'}
+    if index % 10 == 0:
+        headers['X-Signature'] = 'sha256=%x' % index
+    body = json.dumps({
+        'event': rng.choice(EVENTS),
+        'data': {'id': index, 'customer': 'cust_%d' % rng.randrange(5000), 'amount': rng.randrange(10000)},
+    })
+    return hooklens.Capture(
+        uuid.uuid4().bytes, time.time_ns(), hooklens.DEFAULT_CHANNEL, rng.choice(METHODS),
+        '/webhook', headers.items(), body.encode('utf-8'),
+    )
+
+
+def linear(records, method=None, header=None, q=None, limit=50):
+    tokens = hooklens.text_tokens(q) if q else []
+    found = []
+    for record in records:
+        if method and record.method != method:
+            continue
+        if header and header.lower() not in (name.lower() for name in record.headers[::2]):
+            continue
+        if tokens:
+            body_tokens = set(hooklens.body_tokens(record.body.decode('utf-8'), hooklens.SearchIndex.MAX_TOKENS))
+            if not all(token in body_tokens for token in tokens):
+                continue
+        found.append(record)
+        if len(found) == limit:
+            break
+    return found
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--records', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    hooklens.webhooks = hooklens.HistoryStore(args.records, None)
+    hooklens.search_index = hooklens.SearchIndex()
+    start = time.perf_counter()
+    for index in range(args.records):
+        hooklens.store_webhook(make_record(index, rng))
+    build_s = time.perf_counter() - start
+    newest = hooklens.webhooks.newest()
+
+    queries = [
+        {'method': 'DELETE'},
+        {'header': 'x-signature'},
+        {'q': 'cust_4242'},
+        {'method': 'PUT', 'q': 'order refunded'},
+    ]
+    results = []
+    for query in queries:
+        index_ms, (found, _) = timed(lambda: hooklens.search_index.search(**query), args.repeat)
+        scan_ms, scanned = timed(lambda: linear(newest, **query), max(1, args.repeat // 10))
+        results.append({
+            'query': query,
+            'matches': len(found),
+            'index_ms': round(index_ms, 3),
+            'linear_scan_ms': round(scan_ms, 3),
+            'same_result': [r.uid for r in found] == [r.uid for r in scanned],
+        })
+    print(json.dumps({
+        'records': args.records,
+        'ingest_us_per_record': round(build_s / args.records * 1e6, 1),
+        'queries': results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
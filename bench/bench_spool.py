@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Peak server memory while receiving large uploads, with and without spooling.
+
+Each upload is then downloaded back from /api/requests/{id}/body, whole
+and as a Range, on both engines.
+
+Usage:
+    python bench/bench_spool.py [--uploads 5] [--size-mb 50]
+"""
+
+import argparse
+import http.client
+import json
+import time
+
+from common import proc_status, start_server, stop_server
+
+CHUNK = b'x' * (1024 * 1024)
+
+
+def upload(port, size_mb):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    body = (CHUNK for _ in range(size_mb))
+    conn.request('POST', '/webhook', body, {
+        'Content-Type': 'application/octet-stream',
+        'Content-Length': str(size_mb * len(CHUNK)),
+    })
+    response = conn.getresponse()
+    data = response.read()
+    conn.close()
+    return response.status, json.loads(data).get('id')
+
+
+def download(port, record_id, size_mb):
+    """GET a body whole and as a Range; return (statuses, seconds for the whole)."""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    start = time.perf_counter()
+    conn.request('GET', f'/api/requests/{record_id}/body')
+    response = conn.getresponse()
+    received = len(response.read())
+    elapsed = time.perf_counter() - start
+    statuses = [response.status if received == size_mb * len(CHUNK) else 'short']
+    conn.request('GET', f'/api/requests/{record_id}/body', headers={'Range': 'bytes=10-19'})
+    response = conn.getresponse()
+    statuses.append(response.status if response.read() == CHUNK[10:20] else 'bad range')
+    conn.close()
+    return statuses, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--uploads', type=int, default=5)
+    parser.add_argument('--size-mb', type=int, default=50)
+    args = parser.parse_args()
+
+    results = {}
+    in_memory = ['--spool-threshold', '0', '--max-memory-mb', '0']
+    for name, extra in (('in_memory', in_memory),
+                        ('spooled', []),
+                        ('in_memory_asyncio', in_memory + ['--engine', 'asyncio']),
+                        ('spooled_asyncio', ['--engine', 'asyncio'])):
+        proc, port = start_server(*extra)
+        try:
+            start = time.perf_counter()
+            uploads = [upload(port, args.size_mb) for _ in range(args.uploads)]
+            elapsed = time.perf_counter() - start
+            download_statuses, download_elapsed = download(port, uploads[-1][1], args.size_mb)
+            results[name] = {
+                'statuses': sorted({status for status, _ in uploads}),
+                'mb_per_sec': round(args.uploads * args.size_mb / elapsed, 1),
+                'download_statuses': download_statuses,
+                'download_mb_per_sec': round(args.size_mb / download_elapsed, 1),
+                'peak_rss_kb': proc_status(proc.pid, 'VmHWM'),
+                'rss_kb': proc_status(proc.pid, 'VmRSS'),
+            }
+        finally:
+            stop_server(proc)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Measure SSE delivery cost per event with and without batching/compression.
+
+A burst of webhooks is sent while several SSE clients are connected.
+Reported per delivered event: bytes on the wire, socket reads on the
+client side (each server write to an idle, fast reader arrives as its
+own read, so this tracks the server's send syscalls) and server CPU time
+(from /proc, Linux only).
+
+Usage:
+    python bench/bench_sse_batching.py [--events 5000] [--clients 10]
+"""
+
+import argparse
+import json
+import threading
+import time
+
+from common import cpu_seconds, open_sse, post_webhooks, start_server, stop_server
+
+CONFIGS = (
+    ('unbatched', ['--sse-batch-ms', '0', '--no-sse-compression'], False),
+    ('batched_50ms', ['--sse-batch-ms', '50', '--no-sse-compression'], False),
+    ('batched_50ms_gzip', ['--sse-batch-ms', '50'], True),
+)
+
+
+def run(extra, gzip, events, clients, body):
+    proc, port = start_server(*extra, '--max-requests', str(events))
+    received = [0] * clients
+    reads = [0] * clients
+    sockets = []
+    try:
+        headers = {'Accept-Encoding': 'gzip'} if gzip else {}
+        for index in range(clients):
+            sock = open_sse(port, headers=headers)
+            sockets.append(sock)
+
+            def reader(sock=sock, index=index):
+                try:
+                    while True:
+                        data = sock.recv(65536)
+                        if not data:
+                            break
+                        received[index] += len(data)
+                        reads[index] += 1
+                except OSError:
+                    pass
+
+            threading.Thread(target=reader, daemon=True).start()
+        time.sleep(0.5)
+
+        cpu = cpu_seconds(proc.pid)
+        wire = sum(received)
+        reads_before = sum(reads)
+        post_webhooks(port, events, 16, body)
+        # Wait until the streams go quiet
+        last = -1
+        while last != sum(received):
+            last = sum(received)
+            time.sleep(0.3)
+        delivered = events * clients
+        result = {
+            'bytes_per_event': round((sum(received) - wire) / delivered, 1),
+            'writes_per_event': round((sum(reads) - reads_before) / delivered, 3),
+        }
+        if cpu is not None:
+            result['cpu_us_per_event'] = round((cpu_seconds(proc.pid) - cpu) / delivered * 1e6, 1)
+        return result
+    finally:
+        for sock in sockets:
+            sock.close()
+        stop_server(proc)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--events', type=int, default=5000)
+    parser.add_argument('--clients', type=int, default=10)
+    parser.add_argument('--body-size', type=int, default=1024)
+    args = parser.parse_args()
+
+    body = json.dumps({'event': 'order.paid', 'data': {'note': 'lorem ipsum ' * (args.body_size // 12)}})
+    results = {}
+    for name, extra, gzip in CONFIGS:
+        results[name] = run(extra, gzip, args.events, args.clients, body)
+    print(json.dumps({'events': args.events, 'clients': args.clients, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
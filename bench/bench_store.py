@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Compare ingest throughput with persistence (--store) on and off.
+
+Usage:
+    python bench/bench_store.py [--requests N] [--concurrency C] [--body-size B]
+"""
+
+import argparse
+import json
+import shutil
+import tempfile
+
+from common import post_webhooks, start_server, stop_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--body-size', type=int, default=2048)
+    args = parser.parse_args()
+
+    body = json.dumps({'event': 'bench', 'data': 'x' * args.body_size})
+    store_dir = tempfile.mkdtemp(prefix='hooklens-bench-')
+    results = {}
+    try:
+        for name, extra in (('memory_only', []), ('store', ['--store', store_dir])):
+            proc, port = start_server(*extra)
+            try:
+                results[name] = post_webhooks(port, args.requests, args.concurrency, body)
+            finally:
+                stop_server(proc)
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
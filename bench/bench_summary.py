@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Compare SSE bytes per event for full and summary streams.
+
+One client subscribes to ``/events`` and one to ``/events?mode=summary``
+while webhooks with large bodies are sent. Compression is off so the
+numbers reflect what the browser has to parse and keep.
+
+Usage:
+    python bench/bench_summary.py [--events 500] [--body-kb 64]
+"""
+
+import argparse
+import json
+import threading
+import time
+
+from common import open_sse, post_webhooks, start_server, stop_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--events', type=int, default=500)
+    parser.add_argument('--body-kb', type=int, default=64)
+    args = parser.parse_args()
+
+    body = json.dumps({'event': 'order.paid', 'data': {'note': 'x' * (args.body_kb * 1024)}})
+    proc, port = start_server('--no-sse-compression', '--max-requests', str(args.events))
+    modes = {'full': '/events', 'summary': '/events?mode=summary'}
+    received = {}
+    sockets = []
+    try:
+        for name, path in modes.items():
+            sock = open_sse(port, path)
+            sockets.append(sock)
+            received[name] = 0
+
+            def reader(sock=sock, name=name):
+                try:
+                    while True:
+                        data = sock.recv(65536)
+                        if not data:
+                            break
+                        received[name] += len(data)
+                except OSError:
+                    pass
+
+            threading.Thread(target=reader, daemon=True).start()
+        time.sleep(0.5)
+        before = dict(received)
+
+        post_webhooks(port, args.events, 8, body)
+        last = -1
+        while last != sum(received.values()):
+            last = sum(received.values())
+            time.sleep(0.3)
+
+        results = {
+            name: round((received[name] - before[name]) / args.events, 1)
+            for name in modes
+        }
+        print(json.dumps({
+            'events': args.events,
+            'body_bytes': len(body),
+            'bytes_per_event': results,
+            'reduction': round(results['full'] / results['summary'], 1),
+        }, indent=2))
+    finally:
+        for sock in sockets:
+            sock.close()
+        stop_server(proc)
+
+
+if __name__ == '__main__':
+    main()
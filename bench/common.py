@@ -0,0 +1,155 @@
+"""Shared helpers for the HookLens benchmarks."""
+
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HOOKLENS = os.path.join(ROOT, 'hooklens.py')
+
+
+def free_port():
+    """Return a TCP port that is currently free on localhost."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(*args, port=None, stdout=subprocess.DEVNULL):
+    """Start hooklens.py in a subprocess and wait until it accepts requests."""
+    port = port or free_port()
+    proc = subprocess.Popen(
+        [sys.executable, HOOKLENS, '--port', str(port)] + list(args),
+        stdout=stdout,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('OPTIONS', '/webhook')
+            conn.getresponse().read()
+            conn.close()
+            return proc, port
+        except OSError:
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError('HookLens did not start')
+
+
+def stop_server(proc):
+    """Terminate a server started with start_server()."""
+    proc.terminate()
+    try:
+        proc.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def percentile(samples, pct):
+    """Return the pct-th percentile of samples (nearest rank)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def proc_status(pid, field):
+    """Read a numeric field (e.g. VmRSS, Threads) from /proc/<pid>/status."""
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            for line in status:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def rss_kb(pid):
+    """Resident set size of pid in KiB (Linux only, None elsewhere)."""
+    return proc_status(pid, 'VmRSS')
+
+
+def open_sse(port, path='/events', headers=None):
+    """Open a raw SSE connection and return the connected socket."""
+    sock = socket.create_connection(('127.0.0.1', port))
+    lines = [f'GET {path} HTTP/1.1', 'Host: localhost', 'Accept: text/event-stream']
+    for key, value in (headers or {}).items():
+        lines.append(f'{key}: {value}')
+    sock.sendall(('\r\n'.join(lines) + '\r\n\r\n').encode('ascii'))
+    return sock
+
+
+def post_webhooks(port, requests, concurrency, body, reuse=False, path='/webhook'):
+    """POST requests to path from concurrency threads; return stats.
+
+    With reuse, each thread sends all its requests over one persistent
+    connection (reconnecting if the server closes it).
+    """
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    per_thread = requests // concurrency
+
+    def client():
+        local = []
+        failed = 0
+        conn = None
+        for _ in range(per_thread):
+            start = time.perf_counter()
+            try:
+                if conn is None:
+                    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+                conn.request('POST', path, body, {'Content-Type': 'application/json'})
+                response = conn.getresponse()
+                response.read()
+                if not reuse or response.will_close:
+                    conn.close()
+                    conn = None
+                if response.status != 200:
+                    failed += 1
+                    continue
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                if conn is not None:
+                    conn.close()
+                    conn = None
+                continue
+            local.append(time.perf_counter() - start)
+        if conn is not None:
+            conn.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'requests_per_sec': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def cpu_seconds(pid):
+    """User plus system CPU time consumed by pid (Linux only)."""
+    try:
+        with open(f'/proc/{pid}/stat') as stat:
+            fields = stat.read().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError):
+        return None
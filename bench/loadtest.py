@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""Reproducible load test for HookLens ingest and SSE fan-out.
+
+Starts hooklens.py, attaches --subscribers /events clients, then drives
+/webhook from --concurrency keep-alive connections with a seeded mix of
+methods and body sizes. Each request carries its send time in the query
+string, so subscribers measure end-to-end delivery latency from the
+summary events they receive. Throughput, ingest and delivery latency
+(p50/p99/p999), server RSS, thread count and CPU time are printed as
+JSON. Save a run with --output and compare later runs with --compare.
+
+Anything after ``--`` is passed to hooklens.py.
+
+Usage:
+    python bench/loadtest.py [--requests N | --duration S] [--concurrency C]
+                             [--body-sizes 256,4096] [--methods POST,PUT]
+                             [--subscribers N] [--output run.json]
+                             [--compare baseline.json] [-- SERVER ARGS...]
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import platform
+import random
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from common import ROOT, cpu_seconds, open_sse, percentile, proc_status, start_server, stop_server
+
+# Send time (monotonic ns) carried in each request's query string
+SENT_RE = re.compile(rb'[?&]t=(\d+)')
+
+# Metrics shown by --compare: (section, key, True if higher is better)
+COMPARED = (
+    ('ingest', 'requests_per_sec', True),
+    ('ingest', 'p50_ms', False),
+    ('ingest', 'p99_ms', False),
+    ('ingest', 'p999_ms', False),
+    ('delivery', 'p50_ms', False),
+    ('delivery', 'p99_ms', False),
+    ('delivery', 'p999_ms', False),
+    ('server', 'rss_peak_kb', False),
+    ('server', 'threads_peak', False),
+    ('server', 'cpu_ms_per_request', False),
+)
+
+
+def latency_stats(samples):
+    """p50/p99/p999/max of samples in seconds, as milliseconds."""
+    return {
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+        'p999_ms': round(percentile(samples, 99.9) * 1000, 3),
+        'max_ms': round(max(samples) * 1000, 3) if samples else 0.0,
+    }
+
+
+def make_plan(requests, methods, sizes, seed):
+    """The (method, body size) of every request, the same for every run."""
+    rng = random.Random(seed)
+    return [(rng.choice(methods), rng.choice(sizes)) for _ in range(requests)]
+
+
+def make_body(size):
+    """A JSON body of exactly size bytes (at least the empty object)."""
+    padding = max(size - len('{"data": ""}'), 0)
+    return b'{}' if size < len('{"data": ""}') else b'{"data": "' + b'x' * padding + b'"}'
+
+
+def send_requests(port, plan, path, keepalive, deadline):
+    """Send plan over one connection; return (latencies, errors, bytes)."""
+    bodies = {}
+    latencies = []
+    errors = 0
+    sent_bytes = 0
+    conn = None
+    for method, size in plan:
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        body = bodies.get(size)
+        if body is None:
+            body = bodies[size] = make_body(size)
+        started = time.perf_counter()
+        try:
+            if conn is None:
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            conn.request(method, f'{path}?t={time.monotonic_ns()}', body,
+                         {'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            response.read()
+            if not keepalive or response.will_close:
+                conn.close()
+                conn = None
+            if response.status != 200:
+                errors += 1
+                continue
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            if conn is not None:
+                conn.close()
+                conn = None
+            continue
+        latencies.append(time.perf_counter() - started)
+        sent_bytes += len(body)
+    if conn is not None:
+        conn.close()
+    return latencies, errors, sent_bytes
+
+
+def client_process(job):
+    """Run a share of the connections in a separate process."""
+    port, plans, path, keepalive, deadline = job
+    results = []
+    threads = [
+        threading.Thread(target=lambda plan=plan: results.append(
+            send_requests(port, plan, path, keepalive, deadline)))
+        for plan in plans
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class Subscriber:
+    """An /events client recording how long each capture took to arrive."""
+
+    def __init__(self, port, mode):
+        self.sock = open_sse(port, f'/events?mode={mode}')
+        self.latencies = []
+        self.thread = threading.Thread(target=self.read_loop, daemon=True)
+        self.thread.start()
+
+    def read_loop(self):
+        buffer = b''
+        try:
+            while True:
+                data = self.sock.recv(262144)
+                if not data:
+                    return
+                now = time.monotonic_ns()
+                buffer += data
+                lines = buffer.split(b'\n')
+                buffer = lines.pop()
+                for line in lines:
+                    if line.startswith(b'data: '):
+                        match = SENT_RE.search(line)
+                        if match is not None:
+                            self.latencies.append((now - int(match.group(1))) / 1e9)
+        except OSError:
+            pass
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+def process_tree(pid):
+    """pid and its children (worker processes in --processes mode)."""
+    pids = [pid]
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as children:
+            pids += [int(child) for child in children.read().split()]
+    except OSError:
+        pass
+    return pids
+
+
+class Sampler:
+    """Samples the server's RSS and thread count while the test runs."""
+
+    def __init__(self, pid, interval=0.1):
+        self.pid = pid
+        self.interval = interval
+        self.rss_peak = 0
+        self.threads_peak = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def sample(self):
+        pids = process_tree(self.pid)
+        rss = sum(proc_status(pid, 'VmRSS') or 0 for pid in pids)
+        threads = sum(proc_status(pid, 'Threads') or 0 for pid in pids)
+        self.rss_peak = max(self.rss_peak, rss)
+        self.threads_peak = max(self.threads_peak, threads)
+        return rss, threads
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+        return self.sample()
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+            text=True, timeout=10,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(result, baseline):
+    """Return {metric: {baseline, current, change_pct}} for COMPARED metrics."""
+    changes = {}
+    for section, key, _ in COMPARED:
+        before = baseline.get(section, {}).get(key)
+        after = result.get(section, {}).get(key)
+        if before is None or after is None:
+            continue
+        change = round((after - before) * 100.0 / before, 1) if before else None
+        changes[f'{section}.{key}'] = {'baseline': before, 'current': after, 'change_pct': change}
+    return changes
+
+
+def print_comparison(changes):
+    better = {f'{section}.{key}': higher for section, key, higher in COMPARED}
+    for name, change in changes.items():
+        pct = change['change_pct']
+        verdict = ''
+        if pct is not None and abs(pct) >= 5:
+            verdict = 'better' if (pct > 0) == better[name] else 'WORSE'
+        print(f'{name:28} {change["baseline"]:>12} -> {change["current"]:>12}  '
+              f'{"" if pct is None else f"{pct:+.1f}%":>8} {verdict}', file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--requests', type=int, default=5000,
+                        help='Requests to send (the plan; --duration may stop earlier)')
+    parser.add_argument('--duration', type=float, help='Stop sending after this many seconds')
+    parser.add_argument('--concurrency', type=int, default=16, help='Sender connections')
+    parser.add_argument('--client-processes', type=int, default=1,
+                        help='Spread the sender connections over this many processes')
+    parser.add_argument('--body-sizes', default='256,4096',
+                        help='Comma-separated body sizes in bytes, picked at random per request')
+    parser.add_argument('--methods', default='POST', help='Comma-separated methods, picked at random')
+    parser.add_argument('--path', default='/webhook', help='Path to send to, e.g. /webhook/bench')
+    parser.add_argument('--no-keepalive', action='store_true', help='Open a connection per request')
+    parser.add_argument('--subscribers', type=int, default=10, help='/events clients measuring delivery')
+    parser.add_argument('--sse-mode', choices=('summary', 'full'), default='summary')
+    parser.add_argument('--seed', type=int, default=1, help='Seed for the method and size mix')
+    parser.add_argument('--output', metavar='PATH', help='Also write the JSON result to PATH')
+    parser.add_argument('--compare', metavar='PATH', help='Compare against a saved result')
+    parser.add_argument('server_args', nargs=argparse.REMAINDER,
+                        help='Arguments for hooklens.py, after --')
+    args = parser.parse_args()
+    server_args = args.server_args[1:] if args.server_args[:1] == ['--'] else args.server_args
+
+    methods = args.methods.upper().split(',')
+    sizes = [int(size) for size in args.body_sizes.split(',')]
+    plan = make_plan(args.requests, methods, sizes, args.seed)
+    plans = [plan[index::args.concurrency] for index in range(args.concurrency)]
+
+    proc, port = start_server('--quiet', *server_args)
+    subscribers = []
+    try:
+        subscribers = [Subscriber(port, args.sse_mode) for _ in range(args.subscribers)]
+        time.sleep(0.5)
+        for subscriber in subscribers:
+            subscriber.latencies.clear()
+        sampler = Sampler(proc.pid)
+        rss_start, threads_start = sampler.sample()
+        cpu_start = sum(cpu_seconds(pid) or 0 for pid in process_tree(proc.pid))
+        sampler.start()
+
+        keepalive = not args.no_keepalive
+        deadline = time.monotonic() + args.duration if args.duration else None
+        started = time.perf_counter()
+        if args.client_processes > 1:
+            jobs = [(port, plans[index::args.client_processes], args.path, keepalive, deadline)
+                    for index in range(args.client_processes)]
+            with multiprocessing.Pool(args.client_processes) as pool:
+                outcomes = [item for items in pool.map(client_process, jobs) for item in items]
+        else:
+            outcomes = client_process((port, plans, args.path, keepalive, deadline))
+        elapsed = time.perf_counter() - started
+
+        latencies = [latency for outcome in outcomes for latency in outcome[0]]
+        errors = sum(outcome[1] for outcome in outcomes)
+        sent_bytes = sum(outcome[2] for outcome in outcomes)
+
+        # Wait for the last events to reach every subscriber
+        expected = len(latencies)
+        wait_until = time.monotonic() + 10
+        while (time.monotonic() < wait_until
+               and any(len(subscriber.latencies) < expected for subscriber in subscribers)):
+            time.sleep(0.05)
+        rss_end, threads_end = sampler.stop()
+        cpu = sum(cpu_seconds(pid) or 0 for pid in process_tree(proc.pid)) - cpu_start
+    finally:
+        for subscriber in subscribers:
+            subscriber.close()
+        stop_server(proc)
+
+    delivered = [latency for subscriber in subscribers for latency in subscriber.latencies]
+    result = {
+        'config': {
+            'requests': args.requests,
+            'duration': args.duration,
+            'concurrency': args.concurrency,
+            'client_processes': args.client_processes,
+            'body_sizes': sizes,
+            'methods': methods,
+            'path': args.path,
+            'keepalive': keepalive,
+            'subscribers': args.subscribers,
+            'sse_mode': args.sse_mode,
+            'seed': args.seed,
+            'server_args': server_args,
+        },
+        'environment': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'ingest': dict({
+            'requests': len(latencies),
+            'errors': errors,
+            'seconds': round(elapsed, 3),
+            'requests_per_sec': round(len(latencies) / elapsed, 1),
+            'mb_per_sec': round(sent_bytes / elapsed / 1e6, 2),
+        }, **latency_stats(latencies)),
+        'delivery': dict({
+            'subscribers': len(subscribers),
+            'expected': expected * len(subscribers),
+            'received': len(delivered),
+        }, **latency_stats(delivered)),
+        'server': {
+            'rss_start_kb': rss_start,
+            'rss_peak_kb': sampler.rss_peak,
+            'rss_end_kb': rss_end,
+            'threads_start': threads_start,
+            'threads_peak': sampler.threads_peak,
+            'threads_end': threads_end,
+            'cpu_seconds': round(cpu, 3),
+            'cpu_ms_per_request': round(cpu * 1000 / max(len(latencies), 1), 3),
+        },
+    }
+    if args.compare:
+        with open(args.compare) as baseline:
+            result['comparison'] = compare(result, json.load(baseline))
+        print_comparison(result['comparison'])
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, 'w') as out:
+            out.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+// Headless harness for the GUI script embedded in hooklens.py.
+//
+// Runs the GUI script (GUI_JS) against a minimal stub DOM and times how
+// much work each incoming event costs as the request list grows. Invoked
+// by bench_render.py; usage: node render_harness.js <script.js>
+
+'use strict';
+
+const fs = require('fs');
+const vm = require('vm');
+const { performance } = require('perf_hooks');
+
+class StubElement {
+    constructor(tagName, id) {
+        this.tagName = tagName;
+        this.id = id || '';
+        this.children = [];
+        this.parentNode = null;
+        this.style = {};
+        this.dataset = {};
+        this.textContent = '';
+        this.html = '';
+        const classes = new Set();
+        this.classList = {
+            add: (name) => classes.add(name),
+            remove: (name) => classes.delete(name),
+            toggle: (name) => (classes.has(name) ? classes.delete(name) : classes.add(name)),
+            contains: (name) => classes.has(name),
+        };
+        Object.defineProperty(this, 'className', {
+            get: () => Array.from(classes).join(' '),
+            set: (value) => {
+                classes.clear();
+                String(value).split(/\s+/).filter(Boolean).forEach((name) => classes.add(name));
+            },
+        });
+    }
+
+    set innerHTML(value) { this.html = value; }
+    get innerHTML() { return this.html; }
+    insertAdjacentHTML(position, value) { this.html += value; }
+
+    get nextSibling() {
+        if (!this.parentNode) return null;
+        const siblings = this.parentNode.children;
+        return siblings[siblings.indexOf(this) + 1] || null;
+    }
+
+    get offsetHeight() {
+        return this.classList.contains('expanded') ? 400 : 46;
+    }
+
+    insertBefore(node, reference) {
+        if (node.parentNode) node.remove();
+        const index = reference ? this.children.indexOf(reference) : this.children.length;
+        this.children.splice(index, 0, node);
+        node.parentNode = this;
+        return node;
+    }
+
+    appendChild(node) { return this.insertBefore(node, null); }
+    removeChild(node) { node.remove(); return node; }
+
+    remove() {
+        if (!this.parentNode) return;
+        const siblings = this.parentNode.children;
+        siblings.splice(siblings.indexOf(this), 1);
+        this.parentNode = null;
+    }
+
+    querySelector(selector) {
+        const index = this.html.indexOf('<div class="request-body">');
+        if (selector !== '.request-body' || index === -1) return null;
+        return { remove: () => { this.html = this.html.slice(0, index); } };
+    }
+
+    closest(selector) {
+        let node = this;
+        while (node && !node.classList.contains(selector.replace('.', ''))) node = node.parentNode;
+        return node;
+    }
+
+    getBoundingClientRect() {
+        return { top: this.id === 'requestList' ? 300 - win.scrollY : 0 };
+    }
+}
+
+const elements = {};
+const documentStub = {
+    getElementById(id) {
+        if (!elements[id]) elements[id] = new StubElement('div', id);
+        return elements[id];
+    },
+    createElement(tagName) { return new StubElement(tagName); },
+    body: new StubElement('body'),
+};
+const list = documentStub.getElementById('requestList');
+['noRequests', 'topSpacer', 'bottomSpacer'].forEach((id) => list.appendChild(documentStub.getElementById(id)));
+
+let frames = [];
+const records = new Map();
+const win = {
+    scrollY: 0,
+    innerHeight: 900,
+    location: { protocol: 'http:', host: 'localhost:8080', search: '' },
+    addEventListener() {},
+    scrollBy(x, y) { this.scrollY += y; },
+};
+
+const context = vm.createContext({
+    window: win,
+    document: documentStub,
+    navigator: { clipboard: { writeText: () => Promise.resolve() } },
+    EventSource: function () {},
+    requestAnimationFrame: (callback) => frames.push(callback),
+    setTimeout: () => 0,
+    fetch: (url) => {
+        const record = records.get(decodeURIComponent(url.split('/').pop()));
+        return Promise.resolve({ ok: !!record, json: () => Promise.resolve(record) });
+    },
+    console,
+    Map, Set, JSON, URLSearchParams, String, Object, Math, Promise,
+});
+
+const source = fs.readFileSync(process.argv[2], 'utf8') + `
+globalThis.hooklens = {
+    addRequest, renderRequests, toggleRequest,
+    createRequestHeaderHTML, createRequestDetailsHTML,
+    requests: () => requests,
+    details: () => details,
+    rows: () => rows,
+};`;
+vm.runInContext(source, context);
+const gui = context.hooklens;
+
+function flushFrames() {
+    const pending = frames;
+    frames = [];
+    pending.forEach((callback) => callback());
+}
+
+let counter = 0;
+function makeRequest() {
+    counter++;
+    const body = JSON.stringify({
+        event: 'order.paid',
+        data: { id: counter, items: Array.from({ length: 20 }, (_, i) => ({ sku: 'sku-' + i, qty: i })) },
+    });
+    const record = {
+        id: 'req-' + counter,
+        timestamp: '2024-01-01 00:00:00',
+        method: 'POST',
+        path: '/webhook',
+        headers: { 'Content-Type': 'application/json', 'User-Agent': 'bench' },
+        body: body,
+        body_encoding: 'utf-8',
+        body_size: body.length,
+        body_spooled: false,
+    };
+    records.set(record.id, record);
+    return record;
+}
+
+// Old behaviour: every event rebuilt and re-formatted the whole list
+function fullRebuild() {
+    list.innerHTML = gui.requests().map((req) =>
+        gui.createRequestHeaderHTML(req) + gui.createRequestDetailsHTML(req)).join('');
+}
+
+const results = [];
+for (const size of [100, 1000, 10000]) {
+    while (gui.requests().length < size - 50) {
+        gui.addRequest(makeRequest());
+        flushFrames();
+    }
+    let start = performance.now();
+    for (let i = 0; i < 50; i++) {
+        gui.addRequest(makeRequest());
+        flushFrames();
+    }
+    const incremental = (performance.now() - start) / 50;
+
+    const samples = size >= 10000 ? 3 : 10;
+    start = performance.now();
+    for (let i = 0; i < samples; i++) fullRebuild();
+    const rebuild = (performance.now() - start) / samples;
+
+    results.push({
+        list_size: gui.requests().length,
+        incremental_ms_per_event: Number(incremental.toFixed(3)),
+        full_rebuild_ms_per_event: Number(rebuild.toFixed(3)),
+        rows_in_dom: gui.rows().size,
+    });
+}
+
+// Time expanding a row whose full record has already been fetched
+const first = gui.requests()[0].id;
+gui.details().set(first, records.get(first));
+let start = performance.now();
+gui.toggleRequest(first);
+const expandMs = performance.now() - start;
+
+console.log(JSON.stringify({ results, expand_row_ms: Number(expandMs.toFixed(3)) }, null, 2));
@@ -6,836 +6,4847 @@ Copyright (c) HookLens contributors - by LV3
 """
 
 import argparse
+import asyncio
+import atexit
+import base64
+import bisect
+import email.parser
+import email.policy
+import functools
+import hashlib
+import heapq
 import html
+import http.client
+import io
 import json
+import math
+import os
 import queue
+import random
+import re
+import select
+import selectors
+import shutil
+import signal
+import socket
+import struct
+import sys
+import tempfile
 import threading
+import time
 import uuid
+import zlib
+from collections import OrderedDict, deque
 from datetime import datetime
+from http import HTTPStatus
 from http.server import HTTPServer, BaseHTTPRequestHandler
-from urllib.parse import urlparse
+from urllib.parse import parse_qs, parse_qsl, urlparse
+from xml.etree import ElementTree
 
-# Global event queue for SSE
-event_queues = []
-event_queues_lock = threading.Lock()
 
-# Store received webhooks
-webhooks = []
-webhooks_lock = threading.Lock()
 
-HTML_TEMPLATE = '''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>HookLens - Webhook Debugger</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-        body {
-            font-family: 'SF Mono', 'Monaco', 'Inconsolata', 'Fira Code', 'Consolas', monospace;
-            background-color: #0d1117;
-            color: #c9d1d9;
-            min-height: 100vh;
-            padding: 20px;
-        }
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-        }
-        header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 30px;
-            padding-bottom: 20px;
-            border-bottom: 1px solid #30363d;
-        }
-        h1 {
-            font-size: 24px;
-            font-weight: 600;
-            color: #58a6ff;
-        }
-        .status {
-            display: flex;
-            align-items: center;
-            gap: 8px;
-        }
-        .status-dot {
-            width: 10px;
-            height: 10px;
-            border-radius: 50%;
-            background-color: #f85149;
-            transition: background-color 0.3s;
-        }
-        .status-dot.connected {
-            background-color: #3fb950;
-        }
-        .status-text {
-            font-size: 14px;
-            color: #8b949e;
-        }
-        .endpoint-section {
-            background-color: #161b22;
-            border: 1px solid #30363d;
-            border-radius: 6px;
-            padding: 16px;
-            margin-bottom: 24px;
-        }
-        .endpoint-label {
-            font-size: 12px;
-            color: #8b949e;
-            margin-bottom: 8px;
-            text-transform: uppercase;
-            letter-spacing: 0.5px;
-        }
-        .endpoint-url {
-            display: flex;
-            align-items: center;
-            gap: 12px;
-        }
-        .endpoint-url code {
-            background-color: #0d1117;
-            padding: 10px 14px;
-            border-radius: 4px;
-            font-size: 14px;
-            color: #58a6ff;
-            flex-grow: 1;
-            border: 1px solid #30363d;
-        }
-        .copy-btn {
-            background-color: #21262d;
-            border: 1px solid #30363d;
-            color: #c9d1d9;
-            padding: 10px 16px;
-            border-radius: 4px;
-            cursor: pointer;
-            font-size: 14px;
-            font-family: inherit;
-            transition: background-color 0.2s, border-color 0.2s;
-        }
-        .copy-btn:hover {
-            background-color: #30363d;
-            border-color: #8b949e;
-        }
-        .copy-btn.copied {
-            background-color: #238636;
-            border-color: #238636;
-        }
-        .logs-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 16px;
-        }
-        .logs-title {
-            font-size: 16px;
-            font-weight: 600;
-        }
-        .clear-btn {
-            background-color: transparent;
-            border: 1px solid #30363d;
-            color: #8b949e;
-            padding: 6px 12px;
-            border-radius: 4px;
-            cursor: pointer;
-            font-size: 12px;
-            font-family: inherit;
-            transition: background-color 0.2s, color 0.2s;
-        }
-        .clear-btn:hover {
-            background-color: #21262d;
-            color: #c9d1d9;
-        }
-        .export-btn {
-            background-color: #1f6feb;
-            border: 1px solid #1f6feb;
-            color: #ffffff;
-            padding: 6px 12px;
-            border-radius: 4px;
-            cursor: pointer;
-            font-size: 12px;
-            font-family: inherit;
-            transition: background-color 0.2s;
-            margin-right: 8px;
-        }
-        .export-btn:hover {
-            background-color: #388bfd;
-            border-color: #388bfd;
-        }
-        .export-btn:disabled {
-            background-color: #21262d;
-            border-color: #30363d;
-            color: #8b949e;
-            cursor: not-allowed;
-        }
-        .header-buttons {
-            display: flex;
-            gap: 8px;
-        }
-        .no-requests {
-            text-align: center;
-            padding: 60px 20px;
-            color: #8b949e;
-            background-color: #161b22;
-            border: 1px dashed #30363d;
-            border-radius: 6px;
-        }
-        .no-requests-icon {
-            font-size: 48px;
-            margin-bottom: 16px;
-            opacity: 0.5;
-        }
-        .request-list {
-            display: flex;
-            flex-direction: column;
-            gap: 12px;
-        }
-        .request-item {
-            background-color: #161b22;
-            border: 1px solid #30363d;
-            border-radius: 6px;
-            overflow: hidden;
-        }
-        .request-header {
-            display: flex;
-            align-items: center;
-            padding: 12px 16px;
-            cursor: pointer;
-            transition: background-color 0.2s;
-            gap: 12px;
-        }
-        .request-header:hover {
-            background-color: #1c2128;
-        }
-        .expand-icon {
-            color: #8b949e;
-            font-size: 12px;
-            transition: transform 0.2s;
-            width: 16px;
-        }
-        .request-item.expanded .expand-icon {
-            transform: rotate(90deg);
-        }
-        .method-badge {
-            background-color: #238636;
-            color: #ffffff;
-            padding: 4px 8px;
-            border-radius: 4px;
-            font-size: 11px;
-            font-weight: 600;
-            text-transform: uppercase;
-        }
-        .method-badge.get { background-color: #1f6feb; }
-        .method-badge.post { background-color: #238636; }
-        .method-badge.put { background-color: #9e6a03; }
-        .method-badge.delete { background-color: #da3633; }
-        .method-badge.patch { background-color: #8957e5; }
-        .request-path {
-            flex-grow: 1;
-            font-size: 14px;
-            color: #c9d1d9;
-        }
-        .request-timestamp {
-            font-size: 12px;
-            color: #8b949e;
-        }
-        .request-body {
-            display: none;
-            border-top: 1px solid #30363d;
-        }
-        .request-item.expanded .request-body {
-            display: block;
-        }
-        .section {
-            padding: 16px;
-            border-bottom: 1px solid #30363d;
-        }
-        .section:last-child {
-            border-bottom: none;
-        }
-        .section-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 12px;
-        }
-        .section-title {
-            font-size: 12px;
-            color: #8b949e;
-            text-transform: uppercase;
-            letter-spacing: 0.5px;
-        }
-        .headers-table {
-            width: 100%;
-            font-size: 13px;
-        }
-        .headers-table tr {
-            border-bottom: 1px solid #21262d;
-        }
-        .headers-table tr:last-child {
-            border-bottom: none;
-        }
-        .headers-table td {
-            padding: 6px 0;
-            vertical-align: top;
-        }
-        .headers-table td:first-child {
-            color: #7ee787;
-            padding-right: 16px;
-            white-space: nowrap;
-        }
-        .headers-table td:last-child {
-            color: #c9d1d9;
-            word-break: break-all;
-        }
-        .json-content {
-            background-color: #0d1117;
-            padding: 16px;
-            border-radius: 4px;
-            overflow-x: auto;
-            font-size: 13px;
-            line-height: 1.5;
-        }
-        .json-key {
-            color: #7ee787;
-            cursor: pointer;
-        }
-        .json-key:hover {
-            text-decoration: underline;
-        }
-        .json-string {
-            color: #a5d6ff;
-            cursor: pointer;
-        }
-        .json-string:hover {
-            text-decoration: underline;
-        }
-        .json-number {
-            color: #79c0ff;
-            cursor: pointer;
-        }
-        .json-number:hover {
-            text-decoration: underline;
-        }
-        .json-boolean {
-            color: #ff7b72;
-            cursor: pointer;
-        }
-        .json-boolean:hover {
-            text-decoration: underline;
-        }
-        .json-null {
-            color: #ff7b72;
-            cursor: pointer;
-        }
-        .json-null:hover {
-            text-decoration: underline;
-        }
-        .json-bracket {
-            color: #8b949e;
-        }
-        .raw-body {
-            background-color: #0d1117;
-            padding: 16px;
-            border-radius: 4px;
-            white-space: pre-wrap;
-            word-break: break-all;
-            font-size: 13px;
-            color: #c9d1d9;
-        }
-        .copy-toast {
-            position: fixed;
-            bottom: 20px;
-            right: 20px;
-            background-color: #238636;
-            color: #ffffff;
-            padding: 12px 20px;
-            border-radius: 6px;
-            font-size: 14px;
-            opacity: 0;
-            transform: translateY(10px);
-            transition: opacity 0.3s, transform 0.3s;
-            z-index: 1000;
-        }
-        .copy-toast.show {
-            opacity: 1;
-            transform: translateY(0);
+# Metric name -> (type, help, histogram buckets) for GET /metrics
+METRIC_TYPES = {
+    'hooklens_http_requests_total': ('counter', 'HTTP requests handled, by method and path', None),
+    'hooklens_http_request_duration_seconds': (
+        'histogram', 'Time spent handling a request (SSE streams excluded)',
+        (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    ),
+    'hooklens_webhook_body_bytes': (
+        'histogram', 'Size of captured webhook bodies',
+        (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864),
+    ),
+    'hooklens_access_log_dropped_total': ('counter', 'Access log lines dropped because the buffer was full', None),
+    'hooklens_lock_acquisitions_total': ('counter', 'Acquisitions of instrumented locks', None),
+    'hooklens_lock_wait_seconds': (
+        'histogram', 'Time spent waiting for an instrumented lock that was already held',
+        (0.000001, 0.00001, 0.0001, 0.001, 0.01, 0.1, 1),
+    ),
+    'hooklens_forward_total': ('counter', 'Finished upstream deliveries, by kind and outcome', None),
+    'hooklens_forward_retries_total': ('counter', 'Upstream delivery attempts that were retried', None),
+    'hooklens_webhook_rejected_total': ('counter', 'Webhooks refused before their body was read, by reason', None),
+    'hooklens_webhook_skipped_total': ('counter', 'Webhooks not stored: sampled out or folded into a duplicate', None),
+}
+
+
+class Metrics:
+    """Counters and histograms for GET /metrics.
+
+    Every thread records into its own shard, so recording takes no lock
+    and never contends with other threads. A scrape merges all shards;
+    shards of threads that have exited are folded into one retired shard.
+    """
+
+    def __init__(self):
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.shards = []
+        self.retired = ({}, {})
+
+    def shard(self):
+        try:
+            return self.local.shard
+        except AttributeError:
+            shard = self.local.shard = ({}, {})
+            with self.lock:
+                self.shards.append((threading.current_thread(), shard))
+            return shard
+
+    def inc(self, name, labels=(), value=1):
+        """Add value to a counter."""
+        counters = self.shard()[0]
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name, value, labels=()):
+        """Record one histogram sample."""
+        histograms = self.shard()[1]
+        key = (name, labels)
+        buckets = METRIC_TYPES[name][2]
+        counts = histograms.get(key)
+        if counts is None:
+            # One count per bucket, then +Inf, then the sum of samples
+            counts = histograms[key] = [0] * (len(buckets) + 1) + [0.0]
+        counts[bisect.bisect_left(buckets, value)] += 1
+        counts[-1] += value
+
+    @staticmethod
+    def merge(into, shard):
+        counters, histograms = into
+        for key, value in list(shard[0].items()):
+            counters[key] = counters.get(key, 0) + value
+        for key, counts in list(shard[1].items()):
+            merged = histograms.get(key)
+            if merged is None:
+                histograms[key] = list(counts)
+            else:
+                histograms[key] = [a + b for a, b in zip(merged, counts)]
+
+    def collect(self):
+        """Return ``(counters, histograms)`` summed over every thread."""
+        with self.lock:
+            live = []
+            for thread, shard in self.shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    self.merge(self.retired, shard)
+            self.shards = live
+            total = ({}, {})
+            self.merge(total, self.retired)
+            for _, shard in live:
+                self.merge(total, shard)
+        return total
+
+
+# Global metrics registry
+metrics = Metrics()
+
+
+class TimedLock:
+    """A Lock that reports acquisitions and contended wait time to metrics.
+
+    Only a contended acquisition is timed, so the uncontended path costs
+    one extra counter increment.
+    """
+
+    def __init__(self, name):
+        self.lock = threading.Lock()
+        self.labels = (('lock', name),)
+
+    def acquire(self, blocking=True, timeout=-1):
+        if not self.lock.acquire(False):
+            if not blocking:
+                return False
+            started = time.perf_counter()
+            if not self.lock.acquire(True, timeout):
+                return False
+            metrics.observe('hooklens_lock_wait_seconds', time.perf_counter() - started, self.labels)
+        metrics.inc('hooklens_lock_acquisitions_total', self.labels)
+        return True
+
+    def release(self):
+        self.lock.release()
+
+    def _is_owned(self):
+        # Used by threading.Condition; same answer a plain Lock gives it
+        return self.lock.locked()
+
+    __enter__ = acquire
+
+    def __exit__(self, *exc_info):
+        self.lock.release()
+
+
+class EventRing:
+    """Append-only ring of encoded SSE frames shared by every SSE client.
+
+    Each event gets a sequence number. Clients keep their own cursor and
+    read forward from it, so a broadcast costs O(1) no matter how many
+    clients are connected. A client that falls more than ``capacity``
+    events behind skips ahead and is told how many events it missed.
+
+    Events are tagged with the channel they were captured on. A client
+    subscribed to some channels only reads their events and is only
+    woken by them, so an append wakes the subscribers of its channel
+    (and unfiltered ones) rather than every client.
+
+    Frames carry an SSE ``id:`` of the form ``<epoch>-<seq>``. The epoch
+    changes on every restart, so a stale Last-Event-ID from a previous
+    server run is never mistaken for a position in this one.
+    """
+
+    def __init__(self, capacity=1024, max_bytes=None):
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.events = [None] * capacity
+        self.next_seq = 0
+        self.oldest_seq = 0
+        self.bytes = 0
+        self.epoch = format(time.time_ns() // 1000000, 'x')
+        self.lock = TimedLock('event_ring')
+        self.condition = threading.Condition(self.lock)
+        self.listeners = []
+        # Connected SSE clients -> sequence number they have read up to
+        self.clients = {}
+        # Connected SSE clients -> (channels or None for all, their Condition)
+        self.subscriptions = {}
+        # Channel (None for every channel) -> Conditions of its subscribers
+        self.watchers = {}
+        # Channel -> sequence number of its newest event
+        self.channel_heads = {}
+        self.next_client = 0
+
+    def append(self, frame, summary=None, channel=None):
+        """Add a ``data:`` frame, tag it with its event id and wake readers.
+
+        ``summary`` is an optional compact variant of the same event sent to
+        ``mode=summary`` clients; it shares the event's id and sequence.
+        """
+        with self.condition:
+            seq = self.next_seq
+            slot = seq % self.capacity
+            if seq - self.oldest_seq >= self.capacity:
+                self.drop_oldest()
+            event_id = f'id: {self.epoch}-{seq}\n'.encode('ascii')
+            full = event_id + frame
+            self.events[slot] = (full, event_id + summary if summary is not None else full, channel)
+            self.bytes += self.event_bytes(self.events[slot])
+            self.next_seq = seq + 1
+            self.channel_heads[channel] = seq
+            while self.max_bytes and self.bytes > self.max_bytes and self.oldest_seq < seq:
+                self.drop_oldest()
+            self.condition.notify_all()
+            for key in (None, channel):
+                for waiter in self.watchers.get(key, ()):
+                    waiter.notify()
+            listeners = list(self.listeners)
+        for listener in listeners:
+            listener(channel)
+        return seq
+
+    def drop_oldest(self):
+        """Forget the oldest frame. Caller must hold the condition."""
+        slot = self.oldest_seq % self.capacity
+        self.bytes -= self.event_bytes(self.events[slot])
+        self.events[slot] = None
+        self.oldest_seq += 1
+
+    @staticmethod
+    def event_bytes(event):
+        full, summary, _ = event
+        return len(full) + (len(summary) if summary is not full else 0)
+
+    def head(self):
+        """Return the sequence number the next event will get."""
+        with self.condition:
+            return self.next_seq
+
+    def parse_id(self, event_id):
+        """Return the sequence number in event_id, or None if it is not ours."""
+        epoch, _, seq = (event_id or '').strip().partition('-')
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def read(self, cursor, summary=False, client=None):
+        """Return ``(events, new_cursor, missed)`` for events after cursor.
+
+        Only references are copied under the lock; callers write the
+        frames to their socket after it has been released. With summary
+        set, the compact variant of each event is returned. client (from
+        subscribe) records the new cursor for backlog reporting and
+        limits the events to the client's channels.
+        """
+        variant = 1 if summary else 0
+        with self.condition:
+            missed = 0
+            if cursor < self.oldest_seq:
+                missed = self.oldest_seq - cursor
+                cursor = self.oldest_seq
+            channels = None
+            if client is not None:
+                self.clients[client] = self.next_seq
+                channels = self.subscriptions[client][0]
+            events = [self.events[seq % self.capacity] for seq in range(cursor, self.next_seq)]
+            if channels is None:
+                events = [event[variant] for event in events]
+            else:
+                events = [event[variant] for event in events if event[2] in channels]
+            return events, self.next_seq, missed
+
+    def subscribe(self, channels=None):
+        """Register an SSE client and return its id for read() and wait().
+
+        With channels (an iterable of names), the client only receives
+        events captured on those channels.
+        """
+        channels = frozenset(channels) if channels else None
+        with self.condition:
+            client = self.next_client
+            self.next_client += 1
+            self.clients[client] = self.next_seq
+            waiter = threading.Condition(self.lock)
+            self.subscriptions[client] = (channels, waiter)
+            for key in channels or (None,):
+                self.watchers.setdefault(key, set()).add(waiter)
+            return client
+
+    def unsubscribe(self, client):
+        with self.condition:
+            self.clients.pop(client, None)
+            channels, waiter = self.subscriptions.pop(client, (None, None))
+            for key in channels or (None,):
+                waiters = self.watchers.get(key)
+                if waiters is not None:
+                    waiters.discard(waiter)
+                    if not waiters:
+                        del self.watchers[key]
+
+    def backlogs(self):
+        """Return ``{client: events not yet read}`` for connected clients."""
+        with self.condition:
+            return {client: self.next_seq - seq for client, seq in self.clients.items()}
+
+    def pending(self, cursor, channels):
+        """True if an event after cursor is on one of channels. Lock held."""
+        if channels is None:
+            return self.next_seq != cursor
+        return any(self.channel_heads.get(channel, -1) >= cursor for channel in channels)
+
+    def wait(self, cursor, timeout, client=None):
+        """Block until an event newer than cursor exists or timeout expires.
+
+        With client, only events on the client's channels count.
+        """
+        with self.condition:
+            channels, waiter = self.subscriptions.get(client, (None, self.condition))
+            if not self.pending(cursor, channels):
+                waiter.wait(timeout)
+            return self.pending(cursor, channels)
+
+    def add_listener(self, callback):
+        """Call callback(channel) from the appending thread after every append."""
+        with self.condition:
+            self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self.condition:
+            if callback in self.listeners:
+                self.listeners.remove(callback)
+
+
+# Global event ring for SSE
+event_ring = EventRing()
+
+CONNECTED_FRAME = b'data: {"type": "connected"}\n\n'
+KEEPALIVE_FRAME = b': keepalive\n\n'
+
+# How long an SSE stream waits after an event for more to batch with it
+sse_batch_delay = 0.05
+
+# Whether SSE streams are gzip-compressed for clients that accept it
+sse_compression = True
+
+# Rough per-record cost of a Capture, its id and its headers tuple
+RECORD_OVERHEAD = 320
+
+
+@functools.lru_cache(maxsize=1024)
+def format_timestamp(seconds):
+    """Local time of an epoch second as a record "timestamp"."""
+    return time.strftime(TIMESTAMP_FORMAT, time.localtime(seconds))
+
+
+@functools.lru_cache(maxsize=1024)
+def timestamp_seconds(timestamp):
+    """Epoch seconds of a record "timestamp" (many records share a second)."""
+    return datetime.strptime(timestamp, TIMESTAMP_FORMAT).timestamp()
+
+
+class Capture:
+    """A captured request, kept compact while it sits in history.
+
+    The id is the 16 raw bytes of a UUID, the time it arrived one integer
+    of epoch nanoseconds, the headers one flat ``(name, value, name,
+    value, ...)`` tuple of interned strings (a sender repeats the same
+    names and mostly the same values in every request) and the body the
+    bytes received, or the preview of a spooled body. The JSON shape of a
+    record is only built by to_dict(), for the API, SSE clients, exports
+    and the capture log.
+    """
+
+    __slots__ = ('uid', 'received_ns', 'channel', 'method', 'path', 'headers', 'body',
+                 'body_size', 'body_spooled', 'duplicates', 'last_seen_ns')
+
+    def __init__(self, uid, received_ns, channel, method, path, headers, body,
+                 body_size=None, body_spooled=False, duplicates=None):
+        self.uid = uid
+        self.received_ns = received_ns
+        self.channel = sys.intern(channel)
+        self.method = sys.intern(method)
+        self.path = path
+        self.headers = tuple(sys.intern(text) for pair in headers for text in pair)
+        self.body = body
+        self.body_size = len(body) if body_size is None else body_size
+        self.body_spooled = body_spooled
+        # None unless --dedup counts repeats (see Deduplicator)
+        self.duplicates = duplicates
+        self.last_seen_ns = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a capture from its JSON shape (capture log, CaptureBus)."""
+        body = data['body']
+        if data.get('body_encoding') == 'base64':
+            body = base64.b64decode(body)
+        else:
+            body = body.encode('utf-8')
+        return cls(
+            uuid.UUID(data['id']).bytes,
+            int(timestamp_seconds(data['timestamp'])) * 1000000000,
+            # Stored before captures had channels
+            data.get('channel') or webhook_channel(urlparse(data['path']).path) or DEFAULT_CHANNEL,
+            data['method'], data['path'], data['headers'].items(), body,
+            data.get('body_size'), data.get('body_spooled', False), data.get('duplicates'),
+        )
+
+    @property
+    def id(self):
+        return str(uuid.UUID(bytes=self.uid))
+
+    @property
+    def epoch(self):
+        return self.received_ns / 1e9
+
+    @property
+    def timestamp(self):
+        return format_timestamp(self.received_ns // 1000000000)
+
+    def header_items(self):
+        """Return the headers as ``(name, value)`` pairs."""
+        return zip(self.headers[::2], self.headers[1::2])
+
+    def header(self, name, default=None):
+        """Return the first value of a header, matched case-insensitively."""
+        name = name.lower()
+        for key, value in self.header_items():
+            if key.lower() == name:
+                return value
+        return default
+
+    def to_dict(self):
+        """Return the record in its JSON shape."""
+        body, body_encoding = encode_body(self.body, self.body_spooled)
+        data = {
+            'id': self.id,
+            'timestamp': self.timestamp,
+            'channel': self.channel,
+            'method': self.method,
+            'path': self.path,
+            'headers': dict(self.header_items()),
+            'body': body,
+            'body_encoding': body_encoding,
+            'body_size': self.body_size,
+            'body_spooled': self.body_spooled,
         }
-        @keyframes fadeIn {
-            from { opacity: 0; transform: translateY(-10px); }
-            to { opacity: 1; transform: translateY(0); }
+        if self.duplicates is not None:
+            data['duplicates'] = self.duplicates
+            data['last_seen'] = None if self.last_seen_ns is None else format_timestamp(self.last_seen_ns // 1000000000)
+        return data
+
+
+def record_size(webhook_data):
+    """Approximate bytes held by a captured webhook."""
+    size = RECORD_OVERHEAD + len(webhook_data.body) + len(webhook_data.path)
+    for key, value in webhook_data.header_items():
+        size += 8 + len(value)
+    return size
+
+
+# Captures sent to plain /webhook
+DEFAULT_CHANNEL = 'default'
+
+# /webhook/<channel>/... - channel names are short and URL-safe
+WEBHOOK_PREFIX = '/webhook/'
+CHANNEL_RE = re.compile(r'[A-Za-z0-9_.~-]{1,64}\Z')
+
+
+def webhook_channel(path):
+    """Return the channel a request path captures to, or None.
+
+    ``/webhook`` is the default channel; ``/webhook/<channel>`` and
+    anything below it belong to ``<channel>``.
+    """
+    if path == '/webhook' or path == WEBHOOK_PREFIX:
+        return DEFAULT_CHANNEL
+    if not path.startswith(WEBHOOK_PREFIX):
+        return None
+    channel = path[len(WEBHOOK_PREFIX):].partition('/')[0]
+    return channel if CHANNEL_RE.match(channel) else None
+
+
+def query_channels(query):
+    """Return the channels named by ``?channel=a,b``, or None for all."""
+    channels = set()
+    for value in parse_qs(query).get('channel', []):
+        channels.update(name for name in value.split(',') if name)
+    return channels or None
+
+
+class HistoryStore:
+    """Bounded per-channel history of captured webhooks with O(1) eviction.
+
+    Records are kept in arrival order in an OrderedDict keyed by id, so
+    lookups and dropping the oldest record are O(1). Each channel keeps
+    at most ``max_requests`` records; when more than ``max_channels``
+    channels are in use, the least recently used channel is dropped
+    whole. Each record is also filed under a size class (the bit length
+    of its byte size). When the byte budget is exceeded, the oldest
+    record of the largest class is evicted first, so one big upload does
+    not push out hundreds of small ones.
+    """
+
+    def __init__(self, max_requests=100, max_bytes=None, max_channels=64):
+        self.max_requests = max_requests
+        self.max_bytes = max_bytes
+        self.max_channels = max_channels
+        self.lock = TimedLock('history')
+        self.records = OrderedDict()
+        self.sizes = {}
+        self.size_classes = {}
+        # Channel -> its record ids, least recently used channel first
+        self.channels = OrderedDict()
+        self.bytes = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self.records)
+
+    def add(self, webhook_data):
+        """Store a record and return the records evicted to make room."""
+        record_id = webhook_data.uid
+        channel = webhook_data.channel
+        size = record_size(webhook_data)
+        size_class = size.bit_length()
+        evicted = []
+        with self.lock:
+            members = self.channels.get(channel)
+            if members is None:
+                while len(self.channels) >= self.max_channels:
+                    for oldest in list(next(iter(self.channels.values()))):
+                        evicted.append(self.remove(oldest))
+                members = self.channels[channel] = OrderedDict()
+            else:
+                self.channels.move_to_end(channel)
+            self.records[record_id] = webhook_data
+            self.sizes[record_id] = size
+            self.size_classes.setdefault(size_class, OrderedDict())[record_id] = None
+            members[record_id] = None
+            self.bytes += size
+
+            while len(members) > self.max_requests:
+                evicted.append(self.remove(next(iter(members))))
+            while self.max_bytes and self.bytes > self.max_bytes and len(self.records) > 1:
+                largest = self.size_classes[max(self.size_classes)]
+                evicted.append(self.remove(next(iter(largest))))
+            self.evicted += len(evicted)
+        return evicted
+
+    def remove(self, record_id):
+        """Drop a record by id. Caller must hold the lock."""
+        webhook_data = self.records.pop(record_id)
+        size = self.sizes.pop(record_id)
+        size_class = size.bit_length()
+        members = self.size_classes[size_class]
+        del members[record_id]
+        if not members:
+            del self.size_classes[size_class]
+        members = self.channels[webhook_data.channel]
+        del members[record_id]
+        if not members:
+            del self.channels[webhook_data.channel]
+        self.bytes -= size
+        return webhook_data
+
+    def get(self, record_id):
+        """Return a record by its id, as a string or as 16 bytes."""
+        if isinstance(record_id, str):
+            record_id = record_key(record_id)
+        with self.lock:
+            return self.records.get(record_id)
+
+    def newest(self, limit=None):
+        """Return up to limit records, newest first."""
+        with self.lock:
+            records = []
+            for webhook_data in reversed(self.records.values()):
+                if limit is not None and len(records) >= limit:
+                    break
+                records.append(webhook_data)
+            return records
+
+    def stats(self):
+        with self.lock:
+            return {
+                'requests': len(self.records),
+                'bytes': self.bytes,
+                'max_requests': self.max_requests,
+                'max_bytes': self.max_bytes,
+                'evicted': self.evicted,
+                'channels': {channel: len(members) for channel, members in self.channels.items()},
+                'max_channels': self.max_channels,
+            }
+
+
+class Deduplicator:
+    """Folds repeated webhooks into the record that first carried them.
+
+    A fingerprint covers the channel, method, path (without the query) and
+    body. JSON bodies are normalized first: keys are sorted and fields named
+    in ``ignore`` are dropped at any depth, so payloads that differ only in
+    timestamps or ids match. A repeat bumps the ``duplicates`` count and
+    ``last_seen`` time of the original while it is still in history.
+    Spooled bodies are never folded.
+    """
+
+    def __init__(self, ignore=(), max_entries=6400):
+        self.ignore = frozenset(ignore)
+        self.max_entries = max_entries
+        # Fingerprint -> record id, least recently seen first
+        self.seen = OrderedDict()
+        self.lock = threading.Lock()
+
+    def strip(self, value):
+        if isinstance(value, dict):
+            return {key: self.strip(item) for key, item in value.items() if key not in self.ignore}
+        if isinstance(value, list):
+            return [self.strip(item) for item in value]
+        return value
+
+    def fingerprint(self, webhook_data):
+        """Return the 16-byte fingerprint of a record, or None if it has none."""
+        if webhook_data.body_spooled:
+            return None
+        body = webhook_data.body
+        try:
+            body = json.dumps(
+                self.strip(json.loads(body)), sort_keys=True, separators=(',', ':')
+            ).encode('utf-8')
+        except (ValueError, RecursionError):
+            pass  # Not JSON: compared byte for byte
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (webhook_data.channel, webhook_data.method, urlparse(webhook_data.path).path):
+            digest.update(part.encode('utf-8') + b'\0')
+        digest.update(body)
+        return digest.digest()
+
+    def fold(self, webhook_data):
+        """Count webhook_data against an earlier record with the same
+        fingerprint and return that record, or remember it and return None.
+        """
+        fingerprint = self.fingerprint(webhook_data)
+        if fingerprint is None:
+            return None
+        with self.lock:
+            record_id = self.seen.get(fingerprint)
+            original = webhooks.get(record_id) if record_id is not None else None
+            if original is None:
+                self.seen[fingerprint] = webhook_data.uid
+                self.seen.move_to_end(fingerprint)
+                while len(self.seen) > self.max_entries:
+                    self.seen.popitem(last=False)
+                return None
+            self.seen.move_to_end(fingerprint)
+            original.duplicates += 1
+            original.last_seen_ns = webhook_data.received_ns
+        return original
+
+
+class CaptureLogReader:
+    """Read-only access to the segment files of a CaptureLog.
+
+    ``--processes`` workers export from the log the parent process
+    writes; segments are listed afresh on every scan to pick up
+    rotations.
+    """
+
+    OFFSET = struct.Struct('<Q')
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def segment_path(self, number, suffix='.jsonl'):
+        return os.path.join(self.directory, f'segment-{number:06d}{suffix}')
+
+    def list_segments(self):
+        numbers = []
+        for name in os.listdir(self.directory):
+            if name.startswith('segment-') and name.endswith('.jsonl'):
+                number = name[len('segment-'):-len('.jsonl')]
+                if number.isdigit():
+                    numbers.append(int(number))
+        return sorted(numbers)
+
+    def current_segments(self):
+        return self.list_segments()
+
+    def first_line(self, number):
+        """Return the first record line of a segment, or None if it is empty."""
+        with open(self.segment_path(number), 'rb') as data:
+            line = data.readline()
+        return line if line.endswith(b'\n') else None
+
+    def scan(self, position=None, skip_segment=None):
+        """Yield ``((segment, line number), line)`` oldest first.
+
+        Starts after position (a pair previously yielded). Lines are raw
+        JSON without the newline, read with a fixed-size buffer. A segment
+        is skipped when ``skip_segment(first line of the next segment)`` is
+        true. Only indexed, complete lines are returned, so records being
+        written concurrently are picked up by a later scan.
+        """
+        segments = self.current_segments()
+        after_segment, after_line = position or (0, -1)
+        for place, number in enumerate(segments):
+            if number < after_segment:
+                continue
+            if skip_segment is not None and place + 1 < len(segments):
+                following = self.first_line(segments[place + 1])
+                if following is not None and skip_segment(following):
+                    continue
+            start = after_line + 1 if number == after_segment else 0
+            with open(self.segment_path(number, '.idx'), 'rb') as index:
+                count = os.fstat(index.fileno()).st_size // self.OFFSET.size
+                if start >= count:
+                    continue
+                index.seek(start * self.OFFSET.size)
+                offset, = self.OFFSET.unpack(index.read(self.OFFSET.size))
+            with open(self.segment_path(number), 'rb') as data:
+                data.seek(offset)
+                for line_number in range(start, count):
+                    line = data.readline()
+                    if not line.endswith(b'\n'):
+                        break
+                    yield (number, line_number), line[:-1]
+
+
+class CaptureLog(CaptureLogReader):
+    """Append-only on-disk log of captured webhooks.
+
+    Records are written as JSON lines to numbered segment files that
+    rotate at ``segment_bytes``. Each segment has a companion ``.idx``
+    file holding the 8-byte offset of every line, so a restart can load
+    the newest records without parsing the rest of the history. A
+    background thread writes queued records in batches and fsyncs once
+    per batch, so ingest never waits on the disk.
+    """
+
+    SEGMENT_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, directory, segment_bytes=SEGMENT_BYTES):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.pending = []
+        self.condition = threading.Condition()
+        self.closed = False
+        self.segments = self.list_segments() or [1]
+        self.repair(self.segments[-1])
+        self.open_segment(self.segments[-1])
+        self.thread = threading.Thread(target=self.writer_loop, name='hooklens-store')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def current_segments(self):
+        with self.condition:
+            return list(self.segments)
+
+    def repair(self, number):
+        """Rebuild the index of a segment that may have been cut off mid-write."""
+        path = self.segment_path(number)
+        offsets = []
+        end = 0
+        if os.path.exists(path):
+            with open(path, 'rb') as data:
+                for line in data:
+                    if not line.endswith(b'\n'):
+                        break
+                    offsets.append(end)
+                    end += len(line)
+            with open(path, 'r+b') as data:
+                data.truncate(end)
+        with open(self.segment_path(number, '.idx'), 'wb') as index:
+            index.write(b''.join(self.OFFSET.pack(offset) for offset in offsets))
+
+    def open_segment(self, number):
+        self.number = number
+        self.data = open(self.segment_path(number), 'ab')
+        self.index = open(self.segment_path(number, '.idx'), 'ab')
+        self.offset = self.data.tell()
+
+    def rotate(self):
+        self.sync()
+        self.data.close()
+        self.index.close()
+        self.segments.append(self.number + 1)
+        self.open_segment(self.number + 1)
+
+    def sync(self):
+        for handle in (self.data, self.index):
+            handle.flush()
+            os.fsync(handle.fileno())
+
+    def append(self, line):
+        """Queue one JSON-encoded record (bytes, no newline) for writing."""
+        with self.condition:
+            self.pending.append(line)
+            self.condition.notify()
+
+    def writer_loop(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.closed:
+                    self.condition.wait()
+                if not self.pending:
+                    return
+                batch, self.pending = self.pending, []
+            self.write_batch(batch)
+
+    def write_batch(self, batch):
+        """Write a batch of records and fsync them as one group."""
+        lines = []
+        offsets = []
+        for line in batch:
+            if self.offset >= self.segment_bytes:
+                self.data.write(b''.join(lines))
+                self.index.write(b''.join(offsets))
+                lines, offsets = [], []
+                self.rotate()
+            lines.append(line + b'\n')
+            offsets.append(self.OFFSET.pack(self.offset))
+            self.offset += len(line) + 1
+        self.data.write(b''.join(lines))
+        self.index.write(b''.join(offsets))
+        self.sync()
+
+    def load_tail(self, limit):
+        """Return up to limit of the newest records, oldest first."""
+        chunks = []
+        remaining = limit
+        for number in reversed(self.segments):
+            if remaining <= 0:
+                break
+            with open(self.segment_path(number, '.idx'), 'rb') as index:
+                count = os.fstat(index.fileno()).st_size // self.OFFSET.size
+                take = min(count, remaining)
+                if not take:
+                    continue
+                index.seek((count - take) * self.OFFSET.size)
+                start, = self.OFFSET.unpack(index.read(self.OFFSET.size))
+            with open(self.segment_path(number), 'rb') as data:
+                data.seek(start)
+                lines = data.read().splitlines()[:take]
+            chunks.append(lines)
+            remaining -= take
+        records = []
+        for lines in reversed(chunks):
+            records.extend(json.loads(line) for line in lines)
+        return records
+
+    def close(self):
+        """Write everything still queued and close the segment files."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.thread.join()
+        self.data.close()
+        self.index.close()
+
+
+class AccessLog:
+    """Access log written by a background thread.
+
+    Ingest threads only queue the record; formatting and writing happen on
+    the writer thread, so a slow terminal or pipe never holds up a
+    request. At most ``max_entries`` lines wait in memory. When the buffer
+    is full, the ``drop`` policy discards new lines (and says so in the
+    log) while ``block`` makes the caller wait. Lines are plain text or
+    JSON. A log file is rotated to ``.1`` ... ``.<backups>`` once it grows
+    past ``max_bytes``.
+    """
+
+    def __init__(self, path=None, format='text', max_entries=10000, policy='drop',
+                 max_bytes=0, backups=5):
+        self.path = path
+        self.format = format
+        self.max_entries = max_entries
+        self.policy = policy
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.pending = []
+        self.dropped = 0
+        self.condition = threading.Condition()
+        self.closed = False
+        self.stream = sys.stdout if path is None else open(path, 'a', encoding='utf-8')
+        self.thread = threading.Thread(target=self.writer_loop, name='hooklens-log')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def log(self, record):
+        """Queue a webhook record (a dict, or its JSON encoding) for logging."""
+        with self.condition:
+            while len(self.pending) >= self.max_entries:
+                if self.policy != 'block' or self.closed:
+                    self.dropped += 1
+                    metrics.inc('hooklens_access_log_dropped_total')
+                    return
+                self.condition.wait()
+            self.pending.append(record)
+            self.condition.notify_all()
+
+    def writer_loop(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.closed:
+                    self.condition.wait()
+                if not self.pending:
+                    return
+                batch, self.pending = self.pending, []
+                dropped, self.dropped = self.dropped, 0
+                # Wake callers blocked on a full buffer
+                self.condition.notify_all()
+            lines = [self.format_line(record) for record in batch]
+            if dropped:
+                lines.append(self.dropped_line(dropped))
+            try:
+                self.write(''.join(lines))
+            except (OSError, ValueError):
+                # Nowhere left to log to (closed pipe or terminal)
+                pass
+
+    def format_line(self, record):
+        if isinstance(record, bytes):
+            # A capture relayed by CaptureBus, in its JSON shape
+            record = json.loads(record)
+            fields = (record['timestamp'], record['id'], record['method'], record['path'], record['body_size'])
+        else:
+            fields = (record.timestamp, record.id, record.method, record.path, record.body_size)
+        timestamp, record_id, method, path, body_size = fields
+        if self.format == 'json':
+            return json.dumps({
+                'timestamp': timestamp,
+                'id': record_id,
+                'method': method,
+                'path': path,
+                'body_size': body_size,
+            }) + '\n'
+        return f'[{timestamp}] {method} {path}\n'
+
+    def dropped_line(self, count):
+        if self.format == 'json':
+            return json.dumps({'event': 'log_dropped', 'count': count}) + '\n'
+        return f'[hooklens] {count} log line(s) dropped\n'
+
+    def write(self, text):
+        if self.path is not None and self.max_bytes and self.stream.tell() >= self.max_bytes:
+            self.rotate()
+        self.stream.write(text)
+        self.stream.flush()
+
+    def rotate(self):
+        """Shift PATH.N to PATH.N+1 (dropping the oldest) and start a new file."""
+        self.stream.close()
+        for number in range(self.backups - 1, 0, -1):
+            source = f'{self.path}.{number}'
+            if os.path.exists(source):
+                os.replace(source, f'{self.path}.{number + 1}')
+        if self.backups > 0:
+            os.replace(self.path, f'{self.path}.1')
+        else:
+            os.unlink(self.path)
+        self.stream = open(self.path, 'a', encoding='utf-8')
+
+    def close(self):
+        """Write everything still queued and close the log file."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join()
+        if self.path is not None:
+            self.stream.close()
+
+
+# Request headers that describe the connection, not the request, and
+# are therefore not relayed upstream
+HOP_BY_HOP_HEADERS = frozenset((
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization', 'te',
+    'trailer', 'transfer-encoding', 'upgrade', 'host', 'content-length', 'expect',
+))
+
+# Longest delay between two delivery attempts
+MAX_BACKOFF_SECONDS = 60
+
+
+class TokenBucket:
+    """Allows ``rate`` events per second on average, in bursts of ``burst``.
+
+    Not thread-safe; callers hold their own lock.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(rate, 1)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def take(self):
+        """Take a token. Returns 0, or the seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """A TokenBucket per key (client IP, header value or channel).
+
+    Buckets live in an OrderedDict in least recently used order, so memory
+    is one bucket per active key. A bucket left alone long enough to
+    refill completely is no different from a new one and is dropped; past
+    ``max_keys`` the least recently used key is dropped as well.
+    """
+
+    def __init__(self, rate, burst=None, max_keys=65536, name='rate_limit'):
+        self.rate = rate
+        self.burst = burst or max(rate, 1)
+        self.idle_seconds = self.burst / rate
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+        self.lock = TimedLock(name)
+
+    def take(self, key):
+        """Take a token for key. Returns 0, or the seconds until one is available."""
+        now = time.monotonic()
+        with self.lock:
+            buckets = self.buckets
+            while buckets:
+                oldest = next(iter(buckets.values()))
+                if now - oldest.updated < self.idle_seconds and len(buckets) < self.max_keys:
+                    break
+                buckets.popitem(last=False)
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = TokenBucket(self.rate, self.burst)
+            else:
+                buckets.move_to_end(key)
+            return bucket.take()
+
+    def __len__(self):
+        return len(self.buckets)
+
+
+def retry_after_seconds(value):
+    """Parse a delay-seconds Retry-After header; None if absent or a date."""
+    try:
+        return max(0, min(int(value), MAX_BACKOFF_SECONDS))
+    except (TypeError, ValueError):
+        return None
+
+
+class Forwarder:
+    """Relays captured requests to upstream URLs from background threads.
+
+    submit() only queues a delivery, so ingest never waits on an upstream.
+    ``concurrency`` sender threads (started on first use) take deliveries
+    when they are due and send them over keep-alive connections pooled
+    per upstream host. Connection errors, 429 and 5xx responses are
+    retried up to ``retries`` times with jittered exponential backoff, or
+    after the upstream's Retry-After. With ``rate`` set, each upstream
+    host gets at most that many requests per second: due deliveries wait
+    in a FIFO per host, and only one heap entry per host waits for the
+    host's next token. At most ``max_pending`` deliveries wait; new ones
+    beyond that are dropped.
+    The last ``history`` deliveries are kept for GET /api/forwarding.
+    """
+
+    def __init__(self, concurrency=8, max_pending=10000, retries=3, backoff=0.5,
+                 rate=0, timeout=10.0, history=1000):
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self.retries = retries
+        self.backoff = backoff
+        self.rate = rate
+        self.timeout = timeout
+        self.history = history
+        # Heap of (due, sequence, delivery, webhook_data), or of
+        # (due, sequence, None, host) when a rate-limited host may send again
+        self.pending = []
+        self.sequence = 0
+        # Rate-limited host -> deque of due (delivery, webhook_data), and the
+        # hosts with an entry in pending
+        self.ready = {}
+        self.waking = set()
+        self.queued = 0
+        self.in_flight = 0
+        self.condition = threading.Condition()
+        self.pools = {}
+        self.buckets = {}
+        self.deliveries = OrderedDict()
+        self.counts = {'delivered': 0, 'failed': 0, 'dropped': 0, 'retried': 0}
+        self.threads = []
+        self.closed = False
+
+    def submit(self, webhook_data, url, kind='forward'):
+        """Queue webhook_data for delivery to url and return the delivery."""
+        target = urlparse(url)
+        if target.scheme not in ('http', 'https') or not target.hostname:
+            raise ValueError(f'invalid upstream URL: {url!r}')
+        delivery = {
+            'id': str(uuid.uuid4()),
+            'request_id': webhook_data.id,
+            'kind': kind,
+            'url': url,
+            'status': 'queued',
+            'attempts': 0,
+            'response_status': None,
+            'error': None,
+            'queued_at': time.time(),
         }
-        .request-item {
-            animation: fadeIn 0.3s ease-out;
+        with self.condition:
+            if not self.threads:
+                self.start()
+            self.deliveries[delivery['id']] = delivery
+            while len(self.deliveries) > self.history:
+                self.deliveries.popitem(last=False)
+            if self.queued >= self.max_pending or self.closed:
+                self.finish(delivery, 'dropped')
+            else:
+                self.schedule(0, delivery, webhook_data)
+            return dict(delivery)
+
+    def start(self):
+        for number in range(self.concurrency):
+            thread = threading.Thread(target=self.sender_loop, name=f'hooklens-forward-{number}')
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+
+    def schedule(self, delay, delivery, webhook_data):
+        """Queue a delivery to be sent in delay seconds (lock held)."""
+        self.queued += 1
+        self.push(delay, delivery, webhook_data)
+
+    def push(self, delay, delivery, item):
+        self.sequence += 1
+        heapq.heappush(self.pending, (time.monotonic() + delay, self.sequence, delivery, item))
+        self.condition.notify()
+
+    def finish(self, delivery, outcome):
+        """Record a delivery's final outcome (lock held)."""
+        delivery['status'] = outcome
+        self.counts[outcome] += 1
+        metrics.inc('hooklens_forward_total', (('kind', delivery['kind']), ('outcome', outcome)))
+
+    def next_delivery(self):
+        """Wait for a due delivery the rate limit allows; None once closed."""
+        with self.condition:
+            while True:
+                if self.closed:
+                    return None
+                wait = None
+                if self.pending:
+                    wait = self.pending[0][0] - time.monotonic()
+                    if wait <= 0:
+                        _, _, delivery, item = heapq.heappop(self.pending)
+                        if delivery is None:
+                            job = self.take_ready(item)
+                        elif self.rate:
+                            job = self.enqueue_ready(delivery, item)
+                        else:
+                            job = delivery, item
+                        if job is not None:
+                            delivery = job[0]
+                            delivery['status'] = 'sending'
+                            delivery['attempts'] += 1
+                            self.queued -= 1
+                            self.in_flight += 1
+                            return job
+                        continue
+                self.condition.wait(wait)
+
+    def enqueue_ready(self, delivery, webhook_data):
+        """Line a due delivery up behind its host's others (lock held).
+
+        Returns it at once when it is alone and the host has a token.
+        """
+        host = urlparse(delivery['url']).netloc
+        queue = self.ready.get(host)
+        if queue is None:
+            queue = self.ready[host] = deque()
+        queue.append((delivery, webhook_data))
+        if host in self.waking:
+            return None
+        return self.take_ready(host)
+
+    def take_ready(self, host):
+        """Return the next delivery for host if it has a token (lock held).
+
+        Otherwise, or when more deliveries wait, one entry is put back on
+        the heap for the host's next token.
+        """
+        self.waking.discard(host)
+        queue = self.ready[host]
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            bucket = self.buckets[host] = TokenBucket(self.rate)
+        wait = bucket.take()
+        job = None
+        if not wait:
+            job = queue.popleft()
+            wait = 0 if bucket.tokens >= 1 else (1 - bucket.tokens) / bucket.rate
+        if queue:
+            self.waking.add(host)
+            self.push(wait, None, host)
+        else:
+            del self.ready[host]
+        return job
+
+    def sender_loop(self):
+        while True:
+            job = self.next_delivery()
+            if job is None:
+                return
+            delivery, webhook_data = job
+            try:
+                status, retry_after = self.send(delivery, webhook_data)
+                error = None
+            except (OSError, http.client.HTTPException) as e:
+                status, retry_after, error = None, None, f'{type(e).__name__}: {e}'
+            with self.condition:
+                self.in_flight -= 1
+                delivery['response_status'] = status
+                delivery['error'] = error
+                if status is not None and status != 429 and status < 500:
+                    self.finish(delivery, 'delivered' if status < 400 else 'failed')
+                elif delivery['attempts'] > self.retries or self.closed:
+                    self.finish(delivery, 'failed')
+                else:
+                    if retry_after is None:
+                        delay = min(self.backoff * 2 ** (delivery['attempts'] - 1), MAX_BACKOFF_SECONDS)
+                        retry_after = delay * random.uniform(0.5, 1)
+                    delivery['status'] = 'retrying'
+                    self.counts['retried'] += 1
+                    metrics.inc('hooklens_forward_retries_total', (('kind', delivery['kind']),))
+                    self.schedule(retry_after, delivery, webhook_data)
+
+    def send(self, delivery, webhook_data):
+        """Make one delivery attempt; return (status, Retry-After or None)."""
+        target = urlparse(delivery['url'])
+        key = (target.scheme, target.netloc)
+        url = (target.path or '/') + ('?' + target.query if target.query else '')
+        headers = {
+            key: value for key, value in webhook_data.header_items()
+            if key.lower() not in HOP_BY_HOP_HEADERS
         }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <header>
-            <h1>&#128269; HookLens</h1>
-            <div class="status">
-                <div class="status-dot" id="statusDot"></div>
-                <span class="status-text" id="statusText">Disconnected</span>
-            </div>
-        </header>
+        headers['X-HookLens-Id'] = webhook_data.id
+        if webhook_data.body_size or webhook_data.method in ('POST', 'PUT', 'PATCH'):
+            headers['Content-Length'] = str(webhook_data.body_size)
+        while True:
+            connection, reused = self.acquire(key)
+            path = body_path(webhook_data)
+            try:
+                body = open(path, 'rb') if path is not None else webhook_data.body
+                try:
+                    connection.request(webhook_data.method, url, body or None, headers)
+                    response = connection.getresponse()
+                    response.read()
+                finally:
+                    if path is not None:
+                        body.close()
+            except ConnectionError:
+                connection.close()
+                if reused:
+                    # The upstream closed the idle connection; use another
+                    continue
+                raise
+            except BaseException:
+                connection.close()
+                raise
+            self.release(key, connection, response)
+            return response.status, retry_after_seconds(response.getheader('Retry-After'))
 
-        <div class="endpoint-section">
-            <div class="endpoint-label">Webhook Endpoint</div>
-            <div class="endpoint-url">
-                <code id="endpointUrl"></code>
+    def acquire(self, key):
+        """Return ``(connection, reused)`` for an upstream (scheme, netloc)."""
+        with self.condition:
+            idle = self.pools.get(key)
+            if idle:
+                return idle.pop(), True
+        scheme, netloc = key
+        if scheme == 'https':
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout), False
+        return http.client.HTTPConnection(netloc, timeout=self.timeout), False
+
+    def release(self, key, connection, response):
+        """Return a connection to its pool unless the upstream is closing it."""
+        if not response.will_close:
+            with self.condition:
+                idle = self.pools.setdefault(key, [])
+                if len(idle) < self.concurrency:
+                    idle.append(connection)
+                    return
+        connection.close()
+
+    def stats(self, limit=50):
+        """Counters and the most recent deliveries, newest first."""
+        with self.condition:
+            recent = list(self.deliveries.values())[-limit:] if limit > 0 else []
+            stats = {'pending': self.queued, 'in_flight': self.in_flight}
+            stats.update(self.counts)
+            stats['deliveries'] = [dict(delivery) for delivery in reversed(recent)]
+            return stats
+
+    def close(self):
+        """Stop the sender threads; deliveries still queued are abandoned."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+# Body tokens for the search index
+TOKEN_RE = re.compile(r'\w+')
+
+
+def text_tokens(text):
+    """Split text into lowercase search tokens."""
+    return TOKEN_RE.findall(text.lower())
+
+
+def body_tokens(body, limit):
+    """Return up to limit distinct tokens from a body's JSON keys and values.
+
+    Bodies that are not JSON (or too large to parse cheaply) are tokenized
+    as plain text instead.
+    """
+    tokens = set()
+    parsed = None
+    if len(body) <= SearchIndex.PARSE_BYTES:
+        try:
+            parsed = [json.loads(body)]
+        except (ValueError, RecursionError):
+            parsed = None
+    if parsed is None:
+        tokens.update(text_tokens(body[:SearchIndex.TOKENIZE_BYTES]))
+    else:
+        stack = parsed
+        while stack and len(tokens) < limit:
+            value = stack.pop()
+            if isinstance(value, dict):
+                for key, item in value.items():
+                    tokens.update(text_tokens(key))
+                    stack.append(item)
+            elif isinstance(value, list):
+                stack.extend(value)
+            elif isinstance(value, str):
+                tokens.update(text_tokens(value))
+            elif value is not None:
+                tokens.update(text_tokens(json.dumps(value)))
+    return list(tokens)[:limit]
+
+
+class SearchIndex:
+    """Inverted index over captured requests for ``/api/requests``.
+
+    Every record gets an increasing document number. Posting lists map
+    terms (method, path, header names and tokens from the body) to the
+    ascending document numbers that contain them, so a query walks its
+    shortest list newest-first and probes the others with bisect.
+    Evicted documents are skipped lazily; the lists are compacted once
+    stale documents outnumber live ones.
+    """
+
+    MAX_TOKENS = 512
+    SCAN_BATCH = 1000
+    PARSE_BYTES = 1024 * 1024
+    TOKENIZE_BYTES = 64 * 1024
+    ALL = '*'
+
+    def __init__(self):
+        self.lock = TimedLock('search_index')
+        self.postings = {}
+        self.live = {}
+        self.docids = {}
+        self.next_doc = 0
+        self.stale = 0
+
+    def terms(self, webhook_data):
+        terms = {
+            self.ALL,
+            'channel:' + webhook_data.channel,
+            'method:' + webhook_data.method.upper(),
+            'path:' + urlparse(webhook_data.path).path,
+        }
+        for name in webhook_data.headers[::2]:
+            terms.add('header:' + name.lower())
+        body, body_encoding = encode_body(webhook_data.body, webhook_data.body_spooled)
+        if body_encoding != 'base64':
+            for token in body_tokens(body, self.MAX_TOKENS):
+                terms.add('q:' + token)
+        return terms
+
+    def add(self, webhook_data):
+        """Index a record; call in capture order."""
+        terms = self.terms(webhook_data)
+        with self.lock:
+            doc = self.next_doc
+            self.next_doc += 1
+            self.live[doc] = webhook_data
+            self.docids[webhook_data.uid] = doc
+            for term in terms:
+                self.postings.setdefault(term, []).append(doc)
+
+    def remove(self, record_id):
+        """Forget an evicted record."""
+        with self.lock:
+            doc = self.docids.pop(record_id, None)
+            if doc is None:
+                return
+            del self.live[doc]
+            self.stale += 1
+            if self.stale > len(self.live):
+                self.compact()
+
+    def compact(self):
+        """Drop stale documents from every posting list. Caller holds the lock."""
+        live = self.live
+        postings = {}
+        for term, docs in self.postings.items():
+            kept = [doc for doc in docs if doc in live]
+            if kept:
+                postings[term] = kept
+        self.postings = postings
+        self.stale = 0
+
+    def search(self, method=None, path=None, header=None, q=None, since=None,
+               limit=50, cursor=None, channel=None):
+        """Return ``(records, next_cursor)`` newest first.
+
+        ``header`` is a header name, optionally followed by ``:value`` for
+        an exact (case-insensitive) value match. ``cursor`` continues a
+        previous page; ``since`` is an epoch time lower bound.
+        """
+        terms = [self.ALL]
+        if channel:
+            terms.append('channel:' + channel)
+        if method:
+            terms.append('method:' + method.upper())
+        if path:
+            terms.append('path:' + path)
+        header_value = None
+        if header:
+            name, sep, value = header.partition(':')
+            name = name.strip().lower()
+            terms.append('header:' + name)
+            if sep:
+                header_value = (name, value.strip().lower())
+        if q:
+            terms.extend('q:' + token for token in text_tokens(q))
+
+        records = []
+        next_cursor = None
+        last_doc = None
+        with self.lock:
+            lists = sorted((self.postings.get(term, []) for term in terms), key=len)
+            driver, others = lists[0], lists[1:]
+            start = len(driver) if cursor is None else bisect.bisect_left(driver, cursor)
+            for index in range(start - 1, -1, -1):
+                doc = driver[index]
+                webhook_data = self.live.get(doc)
+                if webhook_data is None:
+                    continue
+                if since is not None and webhook_data.epoch < since:
+                    break
+                if not all(contains_sorted(docs, doc) for docs in others):
+                    continue
+                if header_value and not header_matches(webhook_data.header_items(), *header_value):
+                    continue
+                if len(records) == limit:
+                    next_cursor = last_doc
+                    break
+                records.append(webhook_data)
+                last_doc = doc
+        return records, next_cursor
+
+    def scan(self, cursor=None, since=None, until=None):
+        """Yield ``(doc, record)`` oldest first, after document cursor.
+
+        The lock is taken once per ``SCAN_BATCH`` documents, so an export
+        of the whole history never holds up ingest for long.
+        """
+        position = -1 if cursor is None else cursor
+        while True:
+            batch = []
+            with self.lock:
+                docs = self.postings.get(self.ALL, [])
+                start = bisect.bisect_right(docs, position)
+                for doc in docs[start:start + self.SCAN_BATCH]:
+                    position = doc
+                    webhook_data = self.live.get(doc)
+                    if webhook_data is None:
+                        continue
+                    received = webhook_data.epoch
+                    if (since is None or received >= since) and (until is None or received <= until):
+                        batch.append((doc, webhook_data))
+                done = start + self.SCAN_BATCH >= len(docs)
+            for item in batch:
+                yield item
+            if done:
+                return
+
+
+def contains_sorted(docs, doc):
+    """Return True if doc is in the ascending list docs."""
+    index = bisect.bisect_left(docs, doc)
+    return index < len(docs) and docs[index] == doc
+
+
+def header_matches(headers, name, value):
+    for key, header_value in headers:
+        if key.lower() == name and header_value.lower() == value:
+            return True
+    return False
+
+
+class BodyTooLarge(ValueError):
+    """A body grew past --max-body-bytes while it was being read."""
+
+    def __init__(self, limit):
+        ValueError.__init__(self, f'body exceeds {limit} bytes')
+
+
+class BodyBuffer:
+    """Collect a request body, spilling it to disk past the spool threshold.
+
+    Small bodies stay in memory. Once a body grows beyond
+    ``spool_threshold`` it is written to a file in the spool directory in
+    the chunks it arrives in, and only the first ``PREVIEW_BYTES`` are
+    kept in memory.
+    """
+
+    CHUNK_BYTES = 64 * 1024
+    PREVIEW_BYTES = 64 * 1024
+
+    def __init__(self, limit=0):
+        self.chunks = []
+        self.size = 0
+        self.file = None
+        self.path = None
+        self.limit = limit
+
+    def write(self, data):
+        if self.limit and self.size + len(data) > self.limit:
+            raise BodyTooLarge(self.limit)
+        if self.file is None and spool_threshold and self.size + len(data) > spool_threshold:
+            fd, self.path = tempfile.mkstemp(prefix='incoming-', dir=spool_directory())
+            self.file = os.fdopen(fd, 'wb')
+            self.file.write(b''.join(self.chunks))
+            self.chunks = [b''.join(self.chunks)[:self.PREVIEW_BYTES]]
+        if self.file is not None:
+            self.file.write(data)
+            kept = sum(len(chunk) for chunk in self.chunks)
+            if kept < self.PREVIEW_BYTES:
+                self.chunks.append(data[:self.PREVIEW_BYTES - kept])
+        else:
+            self.chunks.append(data)
+        self.size += len(data)
+
+    def getvalue(self):
+        """Return the in-memory body (the preview once spooled)."""
+        return b''.join(self.chunks)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+    def discard(self):
+        """Remove the spool file of a body that will not be recorded."""
+        self.close()
+        if self.path is not None:
+            os.unlink(self.path)
+
+
+def encode_body(data, truncated=False):
+    """Return ``(text, encoding)`` that stores raw body bytes losslessly in JSON.
+
+    UTF-8 bodies are kept as text; anything else (protobuf, gzip, msgpack,
+    ...) is base64 encoded. A preview cut in the middle of a UTF-8
+    sequence is trimmed rather than treated as binary.
+    """
+    try:
+        return data.decode('utf-8'), 'utf-8'
+    except UnicodeDecodeError as e:
+        if truncated and e.reason == 'unexpected end of data':
+            return data[:e.start].decode('utf-8'), 'utf-8'
+    return base64.b64encode(data).decode('ascii'), 'base64'
+
+
+def record_key(record_id):
+    """Return the 16-byte key of a record id string, or None if malformed."""
+    try:
+        return uuid.UUID(record_id).bytes
+    except ValueError:
+        return None
+
+
+def decompressor(content_encoding):
+    """Return a zlib decompressor for a gzip/deflate Content-Encoding, or None."""
+    content_encoding = (content_encoding or '').strip().lower()
+    if content_encoding in ('gzip', 'x-gzip'):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if content_encoding == 'deflate':
+        # Auto-detect the zlib header; some senders label gzip as deflate
+        return zlib.decompressobj(32 + zlib.MAX_WBITS)
+    return None
+
+
+def inflate_chunks(source, inflater):
+    """Yield the decompressed contents of a file object, chunk by chunk."""
+    while True:
+        data = source.read(BodyBuffer.CHUNK_BYTES)
+        if not data:
+            break
+        yield inflater.decompress(data)
+    yield inflater.flush()
+
+
+class ParseCache:
+    """Parsed bodies by record id, least recently used first, within a byte budget.
+
+    A body is parsed the first time it is asked for (see parse_body) and
+    kept with its detected kind, so every dashboard and API client reuses
+    the same result. Parsed values bigger than the whole budget are
+    returned but not kept.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = TimedLock('parse_cache')
+
+    def get(self, webhook_data):
+        """Return ``(kind, value)`` for a record's body, parsing it if needed."""
+        record_id = webhook_data.uid
+        with self.lock:
+            entry = self.entries.get(record_id)
+            if entry is not None:
+                self.entries.move_to_end(record_id)
+                self.hits += 1
+                return entry[0], entry[1]
+            self.misses += 1
+        # Parsed outside the lock; a concurrent miss just parses twice
+        kind, value = parse_body(webhook_data)
+        size = parsed_size(value)
+        with self.lock:
+            if size <= self.max_bytes and record_id not in self.entries:
+                self.entries[record_id] = (kind, value, size)
+                self.bytes += size
+                while self.bytes > self.max_bytes:
+                    self.bytes -= self.entries.popitem(last=False)[1][2]
+        return kind, value
+
+    def discard(self, record_id):
+        with self.lock:
+            entry = self.entries.pop(record_id, None)
+            if entry is not None:
+                self.bytes -= entry[2]
+
+    def stats(self):
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+# Longest body (after decompression) that /parsed will parse
+MAX_PARSE_BYTES = 64 * 1024 * 1024
+
+
+def parse_body(webhook_data):
+    """Detect a record's body format and parse it.
+
+    Returns ``(kind, value)``: ``json``, ``form`` (a dict, repeated fields
+    as lists), ``multipart`` (a list of parts), ``xml`` (a dict, see
+    xml_value), ``text``, ``binary`` (value None) or ``empty``. Spooled
+    bodies are read in full and gzip/deflate bodies are inflated first.
+    """
+    path = body_path(webhook_data)
+    if path is None:
+        data = webhook_data.body
+    else:
+        if os.path.getsize(path) > MAX_PARSE_BYTES:
+            raise ValueError(f'body is larger than {MAX_PARSE_BYTES} bytes')
+        with open(path, 'rb') as source:
+            data = source.read()
+    inflater = decompressor(webhook_data.header('Content-Encoding'))
+    if inflater is not None:
+        try:
+            data = inflater.decompress(data, MAX_PARSE_BYTES + 1)
+        except zlib.error as e:
+            raise ValueError(f'cannot decode body: {e}')
+        if len(data) > MAX_PARSE_BYTES:
+            raise ValueError(f'decoded body is larger than {MAX_PARSE_BYTES} bytes')
+    if not data:
+        return 'empty', None
+
+    content_type = webhook_data.header('Content-Type', '')
+    media_type = content_type.partition(';')[0].strip().lower()
+    start = data[:64].lstrip()[:1]
+    try:
+        if media_type == 'application/json' or media_type.endswith('+json') or start in (b'{', b'['):
+            try:
+                return 'json', json.loads(data)
+            except ValueError:
+                if media_type == 'application/json' or media_type.endswith('+json'):
+                    raise
+        if media_type == 'application/x-www-form-urlencoded':
+            fields = {}
+            for key, value in parse_qsl(data.decode('utf-8'), keep_blank_values=True):
+                if key in fields:
+                    if not isinstance(fields[key], list):
+                        fields[key] = [fields[key]]
+                    fields[key].append(value)
+                else:
+                    fields[key] = value
+            return 'form', fields
+        if media_type.startswith('multipart/'):
+            return 'multipart', multipart_parts(content_type, data)
+        if media_type in ('application/xml', 'text/xml') or media_type.endswith('+xml') or start == b'<':
+            try:
+                root = ElementTree.fromstring(data)
+            except ElementTree.ParseError:
+                if media_type.endswith('xml'):
+                    raise
+            else:
+                return 'xml', {root.tag: xml_value(root)}
+    except (ValueError, RecursionError, ElementTree.ParseError) as e:
+        raise ValueError(f'cannot parse body as {media_type}: {e}')
+    try:
+        return 'text', data.decode('utf-8')
+    except UnicodeDecodeError:
+        return 'binary', None
+
+
+def multipart_parts(content_type, data):
+    """Split a multipart body into parts with their name, filename and value.
+
+    A part's value is its text, or None for binary content; ``size`` is
+    always its length in bytes.
+    """
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        b'Content-Type: ' + content_type.encode('latin-1') + b'\r\n\r\n' + data
+    )
+    if not message.is_multipart():
+        raise ValueError('no parts found')
+    parts = []
+    for part in message.iter_parts():
+        payload = part.get_payload(decode=True) or b''
+        try:
+            value = payload.decode(part.get_content_charset() or 'utf-8')
+        except (LookupError, UnicodeDecodeError):
+            value = None
+        parts.append({
+            'name': part.get_param('name', header='content-disposition'),
+            'filename': part.get_filename(),
+            'content_type': part.get_content_type(),
+            'size': len(payload),
+            'value': value,
+        })
+    return parts
+
+
+def xml_value(element):
+    """Convert an XML element to JSON-like data.
+
+    Attributes become ``@name`` keys and child elements keys by tag (a list
+    when repeated); text goes under ``#text``, or is the whole value of an
+    element with neither attributes nor children.
+    """
+    value = {'@' + name: attribute for name, attribute in element.attrib.items()}
+    for child in element:
+        converted = xml_value(child)
+        if child.tag in value:
+            if not isinstance(value[child.tag], list):
+                value[child.tag] = [value[child.tag]]
+            value[child.tag].append(converted)
+        else:
+            value[child.tag] = converted
+    text = (element.text or '').strip()
+    if not value:
+        return text
+    if text:
+        value['#text'] = text
+    return value
+
+
+def parsed_size(value):
+    """Approximate bytes held by a parsed body."""
+    size = 0
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            size += 64 + 24 * len(item)
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            size += 56 + 8 * len(item)
+            stack.extend(item)
+        elif isinstance(item, str):
+            size += 49 + len(item)
+        else:
+            size += 32
+    return size
+
+
+# One step of a field selection: .name, ['name'], [index] or a * wildcard
+SELECTOR_STEP_RE = re.compile(r"""\.(?P<name>[^.\[\]]+)|\[(?:(?P<index>-?\d+)|'(?P<quoted>[^']*)'|"(?P<dquoted>[^"]*)"|(?P<star>\*))\]""")
+
+
+def parse_selector(selector):
+    """Split a JSONPath-style selection (``$.items[0].id``) into steps.
+
+    Each step is a key, an integer index or None for ``*`` (every item).
+    """
+    selector = selector.strip()
+    if selector.startswith('$'):
+        selector = selector[1:]
+    elif selector and selector[0] not in '.[':
+        selector = '.' + selector
+    steps = []
+    position = 0
+    while position < len(selector):
+        match = SELECTOR_STEP_RE.match(selector, position)
+        if match is None:
+            raise ValueError(f'invalid path at {selector[position:]!r}')
+        if match.group('index') is not None:
+            steps.append(int(match.group('index')))
+        elif match.group('star') or match.group('name') == '*':
+            steps.append(None)
+        else:
+            steps.append(next(group for group in match.group('name', 'quoted', 'dquoted') if group is not None))
+        position = match.end()
+    return steps
+
+
+def select_value(value, steps):
+    """Apply parse_selector steps; a wildcard makes the result a list of matches.
+
+    Raises KeyError when nothing matches.
+    """
+    matches = [value]
+    for step in steps:
+        found = []
+        for item in matches:
+            if step is None:
+                if isinstance(item, dict):
+                    found.extend(item.values())
+                elif isinstance(item, list):
+                    found.extend(item)
+            elif isinstance(item, dict) and isinstance(step, str) and step in item:
+                found.append(item[step])
+            elif isinstance(item, list) and isinstance(step, int) and -len(item) <= step < len(item):
+                found.append(item[step])
+        if not found:
+            raise KeyError(step)
+        matches = found
+    if None in steps:
+        return matches
+    return matches[0]
+
+
+def truncate_value(value, depth):
+    """Replace containers nested deeper than depth with a
+    ``{"$type": "object" | "array", "$size": n}`` stub.
+    """
+    if not isinstance(value, (dict, list)):
+        return value
+    if depth <= 0:
+        return {'$type': 'object' if isinstance(value, dict) else 'array', '$size': len(value)}
+    if isinstance(value, dict):
+        return {key: truncate_value(item, depth - 1) for key, item in value.items()}
+    return [truncate_value(item, depth - 1) for item in value]
+
+
+def read_chunked(rfile, body):
+    """Decode a ``Transfer-Encoding: chunked`` body from rfile into body."""
+    while True:
+        size = parse_chunk_size(rfile.readline(MAX_LINE_BYTES))
+        if size == 0:
+            break
+        remaining = size
+        while remaining > 0:
+            data = rfile.read(min(remaining, BodyBuffer.CHUNK_BYTES))
+            if not data:
+                raise ValueError('truncated chunk')
+            body.write(data)
+            remaining -= len(data)
+        if rfile.readline(MAX_LINE_BYTES).strip():
+            raise ValueError('missing CRLF after chunk')
+    # Skip trailers
+    while rfile.readline(MAX_LINE_BYTES).strip():
+        pass
+
+
+def parse_chunk_size(line):
+    if not line.endswith(b'\n'):
+        raise ValueError('malformed chunk size line')
+    try:
+        return int(line.split(b';', 1)[0].strip(), 16)
+    except ValueError:
+        raise ValueError('malformed chunk size line')
+
+
+def is_chunked(headers):
+    return 'chunked' in headers.get('Transfer-Encoding', '').lower()
+
+
+def has_body(headers):
+    """Return True if the request announces a body (or an unreadable length)."""
+    try:
+        return is_chunked(headers) or int(headers.get('Content-Length') or 0) != 0
+    except ValueError:
+        return True
+
+
+def wants_keep_alive(version, headers):
+    """Return True if the client allows its connection to be reused."""
+    connection = headers.get('Connection', '').lower()
+    if version == 'HTTP/1.1':
+        return 'close' not in connection
+    return 'keep-alive' in connection
+
+
+def spool_directory():
+    """Return the directory for spooled bodies, creating a temp one if needed."""
+    global spool_dir
+    if spool_dir is None:
+        spool_dir = tempfile.mkdtemp(prefix='hooklens-')
+        atexit.register(shutil.rmtree, spool_dir, True)
+    return spool_dir
+
+
+def body_path(webhook_data):
+    """Return the spool file of a record's full body, or None if in memory."""
+    if not webhook_data.body_spooled:
+        return None
+    return os.path.join(spool_directory(), webhook_data.id)
+
+
+def parse_range(value, size):
+    """Parse a single ``bytes=`` Range header into an inclusive (start, end).
+
+    Returns None when the header should be ignored and raises ValueError
+    when the range cannot be satisfied.
+    """
+    unit, _, spec = (value or '').partition('=')
+    if unit.strip() != 'bytes' or ',' in spec:
+        return None
+    first, sep, last = spec.strip().partition('-')
+    if not sep:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            start = size - int(last)
+            end = size - 1
+    except ValueError:
+        return None
+    start = max(start, 0)
+    end = min(end, size - 1)
+    if start > end:
+        raise ValueError('range not satisfiable')
+    return start, end
+
+
+# Store received webhooks
+webhooks = HistoryStore()
+
+# Share of webhooks stored and shown (--sample-rate), and the optional
+# Deduplicator that folds repeats into earlier records (--dedup)
+sample_rate = 1.0
+deduplicator = None
+
+# JSON fields ignored by --dedup unless --dedup-ignore names others
+DEDUP_IGNORE_FIELDS = ('id', 'event_id', 'request_id', 'timestamp', 'time', 'created', 'created_at', 'updated_at')
+
+# Parsed bodies for /api/requests/{id}/parsed
+parse_cache = ParseCache()
+
+# Index over the stored webhooks for /api/requests
+search_index = SearchIndex()
+
+# Optional on-disk capture log (--store) and its directory
+capture_log = None
+store_dir = None
+
+# Access log (None with --quiet, and in --processes workers, whose
+# captures are logged by the parent)
+access_log = None
+
+# With --processes, a worker publishes captures to the parent's CaptureBus
+# instead of storing them itself (see BusClient)
+capture_bus = None
+
+# Sends captures upstream: every /webhook request with --forward-to, and
+# single records on POST /api/requests/{id}/replay
+forwarder = Forwarder()
+forward_url = None
+# Whether replay may go to any ?url= rather than only the --forward-to host
+replay_any_url = False
+
+# Format of a record's "timestamp" (local time)
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Longest chunk-size or trailer line accepted in a chunked body
+MAX_LINE_BYTES = 1024
+
+# Bodies larger than this are spooled to files in spool_dir (0 disables)
+spool_threshold = 1024 * 1024
+spool_dir = None
+
+# Admission limits, checked before a webhook body is read (see
+# admit_webhook): the largest body accepted (0 for no limit), a
+# RateLimiter per source keyed by client IP or by the source_header
+# value, and RateLimiters per channel (the None entry covers channels
+# without a quota of their own)
+max_body_bytes = 0
+source_limiter = None
+source_header = None
+channel_quotas = {}
+
+# Headers that let the GUI be hosted elsewhere, sent with every response
+# except to state-changing API calls (see allows_cors)
+CORS_HEADERS = (
+    ('Access-Control-Allow-Origin', '*'),
+    ('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, PATCH, OPTIONS'),
+    ('Access-Control-Allow-Headers', '*'),
+)
+
+# Seconds an overloaded client is asked to wait before retrying
+RETRY_AFTER_SECONDS = 1
+
+# Persistent connections: seconds to wait for the next request, and
+# requests served before the connection is closed (0 means no limit)
+keepalive_timeout = 5.0
+keepalive_requests = 1000
+
+# Seconds between checks, while a persistent connection idles, for other
+# connections waiting on a pool worker
+KEEPALIVE_POLL_INTERVAL = 0.05
+
+# GUI stylesheet, served from /static/hooklens.css
+GUI_CSS = '''* {
+    margin: 0;
+    padding: 0;
+    box-sizing: border-box;
+}
+body {
+    font-family: 'SF Mono', 'Monaco', 'Inconsolata', 'Fira Code', 'Consolas', monospace;
+    background-color: #0d1117;
+    color: #c9d1d9;
+    min-height: 100vh;
+    padding: 20px;
+}
+.container {
+    max-width: 1200px;
+    margin: 0 auto;
+}
+header {
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+    margin-bottom: 30px;
+    padding-bottom: 20px;
+    border-bottom: 1px solid #30363d;
+}
+h1 {
+    font-size: 24px;
+    font-weight: 600;
+    color: #58a6ff;
+}
+.status {
+    display: flex;
+    align-items: center;
+    gap: 8px;
+}
+.status-dot {
+    width: 10px;
+    height: 10px;
+    border-radius: 50%;
+    background-color: #f85149;
+    transition: background-color 0.3s;
+}
+.status-dot.connected {
+    background-color: #3fb950;
+}
+.status-text {
+    font-size: 14px;
+    color: #8b949e;
+}
+.endpoint-section {
+    background-color: #161b22;
+    border: 1px solid #30363d;
+    border-radius: 6px;
+    padding: 16px;
+    margin-bottom: 24px;
+}
+.endpoint-label {
+    font-size: 12px;
+    color: #8b949e;
+    margin-bottom: 8px;
+    text-transform: uppercase;
+    letter-spacing: 0.5px;
+}
+.endpoint-url {
+    display: flex;
+    align-items: center;
+    gap: 12px;
+}
+.endpoint-url code {
+    background-color: #0d1117;
+    padding: 10px 14px;
+    border-radius: 4px;
+    font-size: 14px;
+    color: #58a6ff;
+    flex-grow: 1;
+    border: 1px solid #30363d;
+}
+.copy-btn {
+    background-color: #21262d;
+    border: 1px solid #30363d;
+    color: #c9d1d9;
+    padding: 10px 16px;
+    border-radius: 4px;
+    cursor: pointer;
+    font-size: 14px;
+    font-family: inherit;
+    transition: background-color 0.2s, border-color 0.2s;
+}
+.copy-btn:hover {
+    background-color: #30363d;
+    border-color: #8b949e;
+}
+.copy-btn.copied {
+    background-color: #238636;
+    border-color: #238636;
+}
+.logs-header {
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+    margin-bottom: 16px;
+}
+.logs-title {
+    font-size: 16px;
+    font-weight: 600;
+}
+.clear-btn {
+    background-color: transparent;
+    border: 1px solid #30363d;
+    color: #8b949e;
+    padding: 6px 12px;
+    border-radius: 4px;
+    cursor: pointer;
+    font-size: 12px;
+    font-family: inherit;
+    transition: background-color 0.2s, color 0.2s;
+}
+.clear-btn:hover {
+    background-color: #21262d;
+    color: #c9d1d9;
+}
+.export-btn {
+    background-color: #1f6feb;
+    border: 1px solid #1f6feb;
+    color: #ffffff;
+    padding: 6px 12px;
+    border-radius: 4px;
+    cursor: pointer;
+    font-size: 12px;
+    font-family: inherit;
+    transition: background-color 0.2s;
+    margin-right: 8px;
+}
+.export-btn:hover {
+    background-color: #388bfd;
+    border-color: #388bfd;
+}
+.export-btn:disabled {
+    background-color: #21262d;
+    border-color: #30363d;
+    color: #8b949e;
+    cursor: not-allowed;
+}
+.header-buttons {
+    display: flex;
+    gap: 8px;
+}
+.no-requests {
+    text-align: center;
+    padding: 60px 20px;
+    color: #8b949e;
+    background-color: #161b22;
+    border: 1px dashed #30363d;
+    border-radius: 6px;
+}
+.no-requests-icon {
+    font-size: 48px;
+    margin-bottom: 16px;
+    opacity: 0.5;
+}
+.request-item {
+    margin-bottom: 12px;
+    background-color: #161b22;
+    border: 1px solid #30363d;
+    border-radius: 6px;
+    overflow: hidden;
+}
+.request-header {
+    display: flex;
+    align-items: center;
+    padding: 12px 16px;
+    cursor: pointer;
+    transition: background-color 0.2s;
+    gap: 12px;
+}
+.request-header:hover {
+    background-color: #1c2128;
+}
+.expand-icon {
+    color: #8b949e;
+    font-size: 12px;
+    transition: transform 0.2s;
+    width: 16px;
+}
+.request-item.expanded .expand-icon {
+    transform: rotate(90deg);
+}
+.method-badge {
+    background-color: #238636;
+    color: #ffffff;
+    padding: 4px 8px;
+    border-radius: 4px;
+    font-size: 11px;
+    font-weight: 600;
+    text-transform: uppercase;
+}
+.method-badge.get { background-color: #1f6feb; }
+.method-badge.post { background-color: #238636; }
+.method-badge.put { background-color: #9e6a03; }
+.method-badge.delete { background-color: #da3633; }
+.method-badge.patch { background-color: #8957e5; }
+.request-path {
+    flex-grow: 1;
+    font-size: 14px;
+    color: #c9d1d9;
+}
+.request-timestamp {
+    font-size: 12px;
+    color: #8b949e;
+}
+.request-body {
+    display: none;
+    border-top: 1px solid #30363d;
+}
+.request-item.expanded .request-body {
+    display: block;
+}
+.section {
+    padding: 16px;
+    border-bottom: 1px solid #30363d;
+}
+.section:last-child {
+    border-bottom: none;
+}
+.section-header {
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+    margin-bottom: 12px;
+}
+.section-title {
+    font-size: 12px;
+    color: #8b949e;
+    text-transform: uppercase;
+    letter-spacing: 0.5px;
+}
+.headers-table {
+    width: 100%;
+    font-size: 13px;
+}
+.headers-table tr {
+    border-bottom: 1px solid #21262d;
+}
+.headers-table tr:last-child {
+    border-bottom: none;
+}
+.headers-table td {
+    padding: 6px 0;
+    vertical-align: top;
+}
+.headers-table td:first-child {
+    color: #7ee787;
+    padding-right: 16px;
+    white-space: nowrap;
+}
+.headers-table td:last-child {
+    color: #c9d1d9;
+    word-break: break-all;
+}
+.json-content {
+    background-color: #0d1117;
+    padding: 16px;
+    border-radius: 4px;
+    overflow-x: auto;
+    font-size: 13px;
+    line-height: 1.5;
+}
+.json-key {
+    color: #7ee787;
+    cursor: pointer;
+}
+.json-key:hover {
+    text-decoration: underline;
+}
+.json-string {
+    color: #a5d6ff;
+    cursor: pointer;
+}
+.json-string:hover {
+    text-decoration: underline;
+}
+.json-number {
+    color: #79c0ff;
+    cursor: pointer;
+}
+.json-number:hover {
+    text-decoration: underline;
+}
+.json-boolean {
+    color: #ff7b72;
+    cursor: pointer;
+}
+.json-boolean:hover {
+    text-decoration: underline;
+}
+.json-null {
+    color: #ff7b72;
+    cursor: pointer;
+}
+.json-null:hover {
+    text-decoration: underline;
+}
+.json-bracket {
+    color: #8b949e;
+}
+.raw-body {
+    background-color: #0d1117;
+    padding: 16px;
+    border-radius: 4px;
+    white-space: pre-wrap;
+    word-break: break-all;
+    font-size: 13px;
+    color: #c9d1d9;
+}
+.spool-note {
+    font-size: 12px;
+    color: #8b949e;
+    margin-bottom: 8px;
+}
+.spool-note a {
+    color: #58a6ff;
+}
+.copy-toast {
+    position: fixed;
+    bottom: 20px;
+    right: 20px;
+    background-color: #238636;
+    color: #ffffff;
+    padding: 12px 20px;
+    border-radius: 6px;
+    font-size: 14px;
+    opacity: 0;
+    transform: translateY(10px);
+    transition: opacity 0.3s, transform 0.3s;
+    z-index: 1000;
+}
+.copy-toast.show {
+    opacity: 1;
+    transform: translateY(0);
+}
+@keyframes fadeIn {
+    from { opacity: 0; transform: translateY(-10px); }
+    to { opacity: 1; transform: translateY(0); }
+}
+.request-item.fresh {
+    animation: fadeIn 0.3s ease-out;
+}
+'''
+
+# GUI script, served from /static/hooklens.js
+GUI_JS = '''// Rows are rendered as a virtual list: only the rows in (or near)
+// the viewport exist in the DOM, and spacers stand in for the rest.
+const ROW_GAP = 12;
+const OVERSCAN = 10;
+let rowHeight = 58;
+let rowHeightMeasured = false;
+let requests = [];
+let requestsById = new Map();
+// Full records, fetched from /api/requests/{id} when a row is expanded
+let details = new Map();
+let pendingDetails = new Map();
+let expanded = new Set();
+let expandedHeights = new Map();
+let expandedHeightSum = 0;
+let rows = new Map();
+let freshIds = new Set();
+let renderScheduled = false;
+let pendingScroll = 0;
+let eventSource = null;
+let lastEventId = null;
+// Exports skip requests captured before the last Clear All
+let clearedAt = null;
+// Open the page with ?channel=a,b to only watch those channels
+const channels = new URLSearchParams(window.location.search || '').get('channel');
+
+function init() {
+    const protocol = window.location.protocol;
+    const host = window.location.host;
+    const path = channels ? '/webhook/' + channels.split(',')[0] : '/webhook';
+    document.getElementById('endpointUrl').textContent = protocol + '//' + host + path;
+    window.addEventListener('scroll', scheduleRender, { passive: true });
+    window.addEventListener('resize', scheduleRender);
+    connectSSE();
+}
+
+function connectSSE() {
+    if (eventSource) {
+        eventSource.close();
+    }
+
+    // The list only needs summaries; full records are fetched on
+    // expand. A fresh EventSource does not resend Last-Event-ID, so
+    // pass it along explicitly to only receive the events we missed.
+    let url = '/events?mode=summary';
+    if (channels) {
+        url += '&channel=' + encodeURIComponent(channels);
+    }
+    if (lastEventId) {
+        url += '&last_event_id=' + encodeURIComponent(lastEventId);
+    }
+    eventSource = new EventSource(url);
+
+    eventSource.onopen = function() {
+        document.getElementById('statusDot').classList.add('connected');
+        document.getElementById('statusText').textContent = 'Connected';
+    };
+
+    eventSource.onmessage = function(event) {
+        if (event.lastEventId) {
+            lastEventId = event.lastEventId;
+        }
+        const data = JSON.parse(event.data);
+        if (data.type === 'summary') {
+            addRequest(data.payload);
+        } else if (data.type === 'webhook') {
+            details.set(data.payload.id, data.payload);
+            addRequest(data.payload);
+        } else if (data.type === 'gap') {
+            showToast('Fell behind: ' + data.missed + ' event(s) skipped');
+        }
+    };
+
+    eventSource.onerror = function() {
+        document.getElementById('statusDot').classList.remove('connected');
+        document.getElementById('statusText').textContent = 'Disconnected';
+        setTimeout(connectSSE, 3000);
+    };
+}
+
+function addRequest(req) {
+    if (requestsById.has(req.id)) {
+        return;
+    }
+    requestsById.set(req.id, req);
+    requests.unshift(req);
+    freshIds.add(req.id);
+    // Keep the rows being read still while new ones land above them
+    if (document.getElementById('requestList').getBoundingClientRect().top < 0) {
+        pendingScroll += rowHeight;
+    }
+    scheduleRender();
+}
+
+function scheduleRender() {
+    if (!renderScheduled) {
+        renderScheduled = true;
+        requestAnimationFrame(renderRequests);
+    }
+}
+
+function heightOf(req) {
+    return expandedHeights.has(req.id) ? expandedHeights.get(req.id) : rowHeight;
+}
+
+function setExpandedHeight(id, height) {
+    expandedHeightSum += height - (expandedHeights.get(id) || 0);
+    expandedHeights.set(id, height);
+}
+
+function clearExpandedHeight(id) {
+    if (expandedHeights.has(id)) {
+        expandedHeightSum -= expandedHeights.get(id);
+        expandedHeights.delete(id);
+    }
+}
+
+function renderRequests() {
+    renderScheduled = false;
+    const list = document.getElementById('requestList');
+    const topSpacer = document.getElementById('topSpacer');
+    const bottomSpacer = document.getElementById('bottomSpacer');
+    document.getElementById('noRequests').style.display = requests.length ? 'none' : '';
+
+    if (pendingScroll) {
+        window.scrollBy(0, pendingScroll);
+        pendingScroll = 0;
+    }
+
+    // Find the slice of rows overlapping the viewport
+    const viewTop = Math.max(0, -list.getBoundingClientRect().top);
+    const viewBottom = viewTop + window.innerHeight;
+    let start = 0;
+    let offset = 0;
+    while (start < requests.length && offset + heightOf(requests[start]) < viewTop) {
+        offset += heightOf(requests[start]);
+        start++;
+    }
+    for (let i = 0; i < OVERSCAN && start > 0; i++) {
+        start--;
+        offset -= heightOf(requests[start]);
+    }
+    let end = start;
+    let bottom = offset;
+    while (end < requests.length && bottom < viewBottom) {
+        bottom += heightOf(requests[end]);
+        end++;
+    }
+    for (let i = 0; i < OVERSCAN && end < requests.length; i++) {
+        bottom += heightOf(requests[end]);
+        end++;
+    }
+
+    // Materialize the slice, reusing rows that already exist
+    const wanted = new Set();
+    let cursor = topSpacer.nextSibling;
+    for (let i = start; i < end; i++) {
+        const req = requests[i];
+        wanted.add(req.id);
+        let item = rows.get(req.id);
+        if (!item) {
+            item = createRow(req);
+            rows.set(req.id, item);
+        }
+        if (item === cursor) {
+            cursor = cursor.nextSibling;
+        } else {
+            list.insertBefore(item, cursor);
+        }
+    }
+    for (const [id, item] of rows) {
+        if (!wanted.has(id)) {
+            item.remove();
+            rows.delete(id);
+        }
+    }
+    // Rows that scrolled past before ever being shown should not animate later
+    freshIds.clear();
+
+    const total = (requests.length - expandedHeights.size) * rowHeight + expandedHeightSum;
+    topSpacer.style.height = offset + 'px';
+    bottomSpacer.style.height = Math.max(0, total - bottom) + 'px';
+
+    if (!rowHeightMeasured && start < end && !expanded.has(requests[start].id)) {
+        const measured = rows.get(requests[start].id).offsetHeight + ROW_GAP;
+        if (measured > ROW_GAP) {
+            rowHeight = measured;
+            rowHeightMeasured = true;
+            scheduleRender();
+        }
+    }
+}
+
+function createRow(req) {
+    const item = document.createElement('div');
+    item.className = freshIds.delete(req.id) ? 'request-item fresh' : 'request-item';
+    item.dataset.id = req.id;
+    item.innerHTML = createRequestHeaderHTML(req);
+    if (expanded.has(req.id)) {
+        item.insertAdjacentHTML('beforeend', details.has(req.id) ?
+            createRequestDetailsHTML(details.get(req.id)) : LOADING_HTML);
+        item.classList.add('expanded');
+    }
+    return item;
+}
+
+const LOADING_HTML = '<div class="request-body"><div class="spool-note">Loading...</div></div>';
+
+function loadDetails(id) {
+    if (details.has(id)) {
+        return Promise.resolve(details.get(id));
+    }
+    if (!pendingDetails.has(id)) {
+        pendingDetails.set(id, fetch('/api/requests/' + encodeURIComponent(id))
+            .then(response => response.ok ? response.json() : null)
+            .catch(err => null)
+            .then(req => {
+                pendingDetails.delete(id);
+                if (req && requestsById.has(id)) {
+                    details.set(id, req);
+                }
+                return req;
+            }));
+    }
+    return pendingDetails.get(id);
+}
+
+function showDetails(id) {
+    loadDetails(id).then(req => {
+        const item = rows.get(id);
+        if (!item || !expanded.has(id)) {
+            return;
+        }
+        const body = item.querySelector('.request-body');
+        if (body) {
+            body.remove();
+        }
+        item.insertAdjacentHTML('beforeend', req ? createRequestDetailsHTML(req) :
+            '<div class="request-body"><div class="spool-note">This request is no longer available on the server.</div></div>');
+        setExpandedHeight(id, item.offsetHeight + ROW_GAP);
+        scheduleRender();
+    });
+}
+
+function createRequestHeaderHTML(req) {
+    const methodClass = req.method.toLowerCase();
+    return '<div class="request-header" onclick="toggleRequest(this.parentNode.dataset.id)">' +
+            '<span class="expand-icon">&#9654;</span>' +
+            '<span class="method-badge ' + methodClass + '">' + escapeHtml(req.method) + '</span>' +
+            '<span class="request-path">' + escapeHtml(req.path) + '</span>' +
+            '<span class="request-timestamp">' + escapeHtml(req.timestamp) + '</span>' +
+        '</div>';
+}
+
+// Headers and body are only formatted once a row is expanded
+function createRequestDetailsHTML(req) {
+    const headersHTML = Object.entries(req.headers).map(([key, value]) =>
+        '<tr><td>' + escapeHtml(key) + '</td><td>' + escapeHtml(value) + '</td></tr>'
+    ).join('');
+
+    let bodyHTML = '';
+    if (req.body_encoding === 'base64') {
+        const encoding = headerValue(req.headers, 'Content-Encoding').toLowerCase();
+        const compressed = ['gzip', 'x-gzip', 'deflate'].indexOf(encoding) !== -1;
+        bodyHTML = '<div class="spool-note">Binary body (' + req.body_size + ' bytes), shown as base64.' +
+            (compressed ? ' <a href="#" onclick="event.preventDefault(); loadDecoded(this)">View decoded</a>' : '') +
+            '</div><div class="raw-body">' + escapeHtml(req.body) + '</div>';
+    } else if (req.body) {
+        try {
+            const parsed = JSON.parse(req.body);
+            bodyHTML = formatJSON(parsed, '');
+        } catch (e) {
+            bodyHTML = '<div class="raw-body" onclick="copyValue(this.textContent)">' + escapeHtml(req.body) + '</div>';
+        }
+    } else {
+        bodyHTML = '<div class="raw-body" style="color: #8b949e;">(empty)</div>';
+    }
+
+    if (req.body_spooled) {
+        bodyHTML = '<div class="spool-note">Showing the first part of ' + req.body_size + ' bytes. ' +
+            '<a href="/api/requests/' + encodeURIComponent(req.id) + '/body" target="_blank">Download full body</a> ' +
+            '<a href="/api/requests/' + encodeURIComponent(req.id) + '/parsed?depth=2" target="_blank">Browse parsed</a></div>' +
+            bodyHTML;
+    }
+
+    // Repeats folded into this request by --dedup
+    const duplicatesHTML = req.duplicates ? '<div class="spool-note">Received ' + req.duplicates +
+        ' more time' + (req.duplicates === 1 ? '' : 's') + ', last at ' + escapeHtml(req.last_seen) + '.</div>' : '';
+
+    return '<div class="request-body">' + duplicatesHTML +
+            '<div class="section">' +
+                '<div class="section-header">' +
+                    '<span class="section-title">Headers</span>' +
+                    '<button class="copy-btn" onclick="event.stopPropagation(); copyHeaders(this)">Copy</button>' +
+                '</div>' +
+                '<table class="headers-table"><tbody>' + headersHTML + '</tbody></table>' +
+            '</div>' +
+            '<div class="section">' +
+                '<div class="section-header">' +
+                    '<span class="section-title">Body</span>' +
+                    '<button class="copy-btn" onclick="event.stopPropagation(); copyBody(this)">Copy</button>' +
+                '</div>' +
+                '<div class="json-content">' + bodyHTML + '</div>' +
+            '</div>' +
+        '</div>';
+}
+
+function formatJSON(obj, indent) {
+    if (obj === null) {
+        return '<span class="json-null" onclick="copyValue(this.textContent)">null</span>';
+    }
+    if (typeof obj === 'boolean') {
+        return '<span class="json-boolean" onclick="copyValue(this.textContent)">' + obj + '</span>';
+    }
+    if (typeof obj === 'number') {
+        return '<span class="json-number" onclick="copyValue(this.textContent)">' + obj + '</span>';
+    }
+    if (typeof obj === 'string') {
+        return '<span class="json-string" onclick="copyValue(this.textContent.slice(1,-1))">"' + escapeHtml(obj) + '"</span>';
+    }
+    if (Array.isArray(obj)) {
+        if (obj.length === 0) {
+            return '<span class="json-bracket">[]</span>';
+        }
+        const newIndent = indent + '  ';
+        const NL = String.fromCharCode(10);
+        const items = obj.map(item => newIndent + formatJSON(item, newIndent)).join(',' + NL);
+        return '<span class="json-bracket">[</span>' + NL + items + NL + indent + '<span class="json-bracket">]</span>';
+    }
+    if (typeof obj === 'object') {
+        const keys = Object.keys(obj);
+        if (keys.length === 0) {
+            return '<span class="json-bracket">{}</span>';
+        }
+        const newIndent = indent + '  ';
+        const NL = String.fromCharCode(10);
+        const items = keys.map(key => {
+            const value = obj[key];
+            return newIndent + '<span class="json-key" data-value="' + escapeHtml(typeof value === 'string' ? value : JSON.stringify(value)) + '" onclick="copyValue(this.dataset.value)">"' + escapeHtml(key) + '"</span>: ' + formatJSON(value, newIndent);
+        }).join(',' + NL);
+        return '<span class="json-bracket">{</span>' + NL + items + NL + indent + '<span class="json-bracket">}</span>';
+    }
+    return escapeHtml(String(obj));
+}
+
+function headerValue(headers, name) {
+    const wanted = name.toLowerCase();
+    for (const key of Object.keys(headers)) {
+        if (key.toLowerCase() === wanted) {
+            return headers[key];
+        }
+    }
+    return '';
+}
+
+function loadDecoded(link) {
+    // Compressed bodies are only inflated on demand, by the server
+    const target = link.parentNode.nextSibling;
+    const item = link.closest('.request-item');
+    fetch('/api/requests/' + encodeURIComponent(item.dataset.id) + '/body?decode=1')
+        .then(response => response.text())
+        .then(text => {
+            target.textContent = text;
+            link.remove();
+            setExpandedHeight(item.dataset.id, item.offsetHeight + ROW_GAP);
+            scheduleRender();
+        })
+        .catch(err => showToast('Failed to decode body'));
+}
+
+function requestFor(element) {
+    return details.get(element.closest('.request-item').dataset.id);
+}
+
+function toggleRequest(id) {
+    const item = rows.get(id);
+    if (!item) {
+        return;
+    }
+    if (expanded.has(id)) {
+        expanded.delete(id);
+        item.classList.remove('expanded');
+        clearExpandedHeight(id);
+    } else {
+        expanded.add(id);
+        if (!item.querySelector('.request-body')) {
+            item.insertAdjacentHTML('beforeend', details.has(id) ?
+                createRequestDetailsHTML(details.get(id)) : LOADING_HTML);
+        }
+        item.classList.add('expanded');
+        setExpandedHeight(id, item.offsetHeight + ROW_GAP);
+        if (!details.has(id)) {
+            showDetails(id);
+        }
+    }
+    scheduleRender();
+}
+
+function copyEndpoint() {
+    const url = document.getElementById('endpointUrl').textContent;
+    copyToClipboard(url);
+}
+
+function copyText(text) {
+    copyToClipboard(text);
+}
+
+function copyValue(value) {
+    copyToClipboard(value);
+}
+
+function copyHeaders(button) {
+    copyToClipboard(JSON.stringify(requestFor(button).headers, null, 2));
+}
+
+function copyBody(button) {
+    copyToClipboard(requestFor(button).body || '');
+}
+
+function copyToClipboard(text) {
+    navigator.clipboard.writeText(text).then(() => {
+        showToast('Copied to clipboard!');
+    }).catch(err => {
+        console.error('Failed to copy:', err);
+    });
+}
+
+function showToast(message) {
+    const toast = document.getElementById('copyToast');
+    toast.textContent = message;
+    toast.classList.add('show');
+    setTimeout(() => {
+        toast.classList.remove('show');
+    }, 2000);
+}
+
+function clearLogs() {
+    clearedAt = Date.now() / 1000;
+    requests = [];
+    requestsById.clear();
+    details.clear();
+    freshIds.clear();
+    expanded.clear();
+    expandedHeights.clear();
+    expandedHeightSum = 0;
+    scheduleRender();
+}
+
+function exportData() {
+    if (requests.length === 0) {
+        showToast('No data to export');
+        return;
+    }
+    const now = new Date();
+    const timestamp = now.getFullYear() +
+        String(now.getMonth() + 1).padStart(2, '0') +
+        String(now.getDate()).padStart(2, '0') + '_' +
+        String(now.getHours()).padStart(2, '0') +
+        String(now.getMinutes()).padStart(2, '0') +
+        String(now.getSeconds()).padStart(2, '0');
+    // The server streams the full records straight to the download, so
+    // the export is never built up in the page
+    const a = document.createElement('a');
+    a.href = '/api/export?format=ndjson' + (clearedAt ? '&since=' + clearedAt : '');
+    a.download = 'hooklens_' + timestamp + '.ndjson';
+    document.body.appendChild(a);
+    a.click();
+    document.body.removeChild(a);
+    showToast('Exporting requests');
+}
+
+function escapeHtml(str) {
+    if (str === null || str === undefined) return '';
+    return String(str)
+        .replace(/&/g, '&amp;')
+        .replace(/</g, '&lt;')
+        .replace(/>/g, '&gt;')
+        .replace(/"/g, '&quot;')
+        .replace(/'/g, '&#039;');
+}
+
+init();
+'''
+
+HTML_TEMPLATE = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>HookLens - Webhook Debugger</title>
+    <link rel="stylesheet" href="/static/hooklens.css">
+</head>
+<body>
+    <div class="container">
+        <header>
+            <h1>&#128269; HookLens</h1>
+            <div class="status">
+                <div class="status-dot" id="statusDot"></div>
+                <span class="status-text" id="statusText">Disconnected</span>
+            </div>
+        </header>
+
+        <div class="endpoint-section">
+            <div class="endpoint-label">Webhook Endpoint</div>
+            <div class="endpoint-url">
+                <code id="endpointUrl"></code>
                 <button class="copy-btn" onclick="copyEndpoint()">Copy</button>
             </div>
         </div>
 
-        <div class="logs-section">
-            <div class="logs-header">
-                <span class="logs-title">Request Log</span>
-                <div class="header-buttons">
-                    <button class="export-btn" id="exportBtn" onclick="exportData()">Export JSON</button>
-                    <button class="clear-btn" onclick="clearLogs()">Clear All</button>
-                </div>
-            </div>
-            <div id="requestList" class="request-list">
-                <div class="no-requests" id="noRequests">
-                    <div class="no-requests-icon">&#128229;</div>
-                    <div>No requests yet</div>
-                    <div style="margin-top: 8px; font-size: 12px;">Send a webhook to the endpoint above</div>
-                </div>
-            </div>
-        </div>
-    </div>
+        <div class="logs-section">
+            <div class="logs-header">
+                <span class="logs-title">Request Log</span>
+                <div class="header-buttons">
+                    <button class="export-btn" id="exportBtn" onclick="exportData()">Export NDJSON</button>
+                    <button class="clear-btn" onclick="clearLogs()">Clear All</button>
+                </div>
+            </div>
+            <div id="requestList" class="request-list">
+                <div class="no-requests" id="noRequests">
+                    <div class="no-requests-icon">&#128229;</div>
+                    <div>No requests yet</div>
+                    <div style="margin-top: 8px; font-size: 12px;">Send a webhook to the endpoint above</div>
+                </div>
+                <div id="topSpacer"></div>
+                <div id="bottomSpacer"></div>
+            </div>
+        </div>
+    </div>
+
+    <div class="copy-toast" id="copyToast">Copied to clipboard!</div>
+
+    <script src="/static/hooklens.js"></script>
+</body>
+</html>
+'''
+
+
+class Asset:
+    """A static response encoded once, with a gzip variant and ETags.
+
+    Each variant has its own strong ETag, so a cached gzip copy is never
+    validated against the identity one.
+    """
+
+    def __init__(self, body, content_type, cache_control):
+        self.content_type = content_type
+        self.cache_control = cache_control
+        self.version = hashlib.sha256(body).hexdigest()[:16]
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        gzipped = compressor.compress(body) + compressor.flush()
+        self.variants = {
+            None: (body, f'"{self.version}"'),
+            'gzip': (gzipped, f'"{self.version}-gz"'),
+        }
+
+    def response(self, headers):
+        """Return ``(status, body, headers)`` answering a GET with headers."""
+        coding = 'gzip' if accepts_gzip(headers) else None
+        body, etag = self.variants[coding]
+        extra = [
+            ('ETag', etag),
+            ('Cache-Control', self.cache_control),
+            ('Vary', 'Accept-Encoding'),
+        ]
+        if_none_match = headers.get('If-None-Match', '')
+        if if_none_match.strip() == '*' or etag in [tag.strip() for tag in if_none_match.split(',')]:
+            return 304, b'', extra
+        if coding is not None:
+            extra.append(('Content-Encoding', coding))
+        return 200, body, extra
+
+
+def build_gui_assets():
+    """Encode the GUI once; the page links its assets by content version."""
+    css = Asset(GUI_CSS.encode('utf-8'), 'text/css; charset=utf-8', STATIC_CACHE_CONTROL)
+    js = Asset(GUI_JS.encode('utf-8'), 'application/javascript; charset=utf-8', STATIC_CACHE_CONTROL)
+    page = HTML_TEMPLATE.replace(
+        '/static/hooklens.css', f'/static/hooklens.css?v={css.version}'
+    ).replace(
+        '/static/hooklens.js', f'/static/hooklens.js?v={js.version}'
+    )
+    return {
+        # The page itself is revalidated on every load (a cheap 304)
+        '/': Asset(page.encode('utf-8'), 'text/html; charset=utf-8', 'no-cache'),
+        '/static/hooklens.css': css,
+        '/static/hooklens.js': js,
+    }
+
+
+# Versioned assets never change under the same URL
+STATIC_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Path -> Asset for the GUI, encoded at startup
+GUI_ASSETS = build_gui_assets()
+
+
+def sse_frame(event):
+    """Encode one event as an SSE ``data:`` frame."""
+    return f'data: {json.dumps(event)}\n\n'.encode('utf-8')
+
+
+def webhook_frame(payload):
+    """Wrap an already JSON-encoded webhook record in an SSE frame."""
+    return b'data: {"type": "webhook", "payload": ' + payload + b'}\n\n'
+
+
+def summary_frame(webhook_data):
+    """Encode the compact SSE frame sent to ``mode=summary`` clients."""
+    return sse_frame({'type': 'summary', 'payload': {
+        'id': webhook_data.id,
+        'channel': webhook_data.channel,
+        'method': webhook_data.method,
+        'path': webhook_data.path,
+        'timestamp': webhook_data.timestamp,
+        'size': webhook_data.body_size,
+        'content_type': webhook_data.header('Content-Type'),
+    }})
+
+
+def broadcast_webhook(webhook_data, payload):
+    """Append a record to the SSE ring in both its full and summary form."""
+    event_ring.append(webhook_frame(payload), summary_frame(webhook_data), webhook_data.channel)
+
+
+def encode_events(frames, missed=0):
+    """Join pre-encoded frames, led by a gap notice if any were missed."""
+    if missed:
+        frames = [sse_frame({'type': 'gap', 'missed': missed})] + frames
+    return b''.join(frames)
+
+
+def last_event_id(headers, query):
+    """Return the Last-Event-ID sent as a header or ``last_event_id`` query."""
+    value = headers.get('Last-Event-ID')
+    if value is None:
+        value = parse_qs(query).get('last_event_id', [None])[0]
+    return value
+
+
+def summary_mode(query):
+    """Return True if an /events query asks for ``mode=summary``."""
+    return parse_qs(query).get('mode', ['full'])[-1] == 'summary'
+
+
+class StreamEncoder:
+    """Encode SSE output for one client, gzip-compressed if it asked for it.
+
+    The compressor keeps its window across batches and is sync-flushed
+    after each one, so the browser can decode every batch immediately.
+    """
+
+    def __init__(self, compress=False):
+        self.compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+
+    def encode(self, data):
+        if self.compressor is None:
+            return data
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+def accepts_gzip(headers):
+    """Return True if the Accept-Encoding header allows gzip."""
+    for item in headers.get('Accept-Encoding', '').split(','):
+        coding, _, params = item.partition(';')
+        if coding.strip().lower() in ('gzip', 'x-gzip', '*'):
+            return params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+    return False
+
+
+def open_event_stream(event_id=None, summary=False, client=None):
+    """Return ``(initial_bytes, cursor)`` for a newly connected SSE client.
+
+    A client resuming with a Last-Event-ID we still know only gets the
+    events it missed. Anyone else gets the current history page. Both are
+    read from the ring and returned as a single buffer.
+    """
+    seq = event_ring.parse_id(event_id)
+    if seq is not None and seq < event_ring.head():
+        cursor = seq + 1
+    else:
+        history = len(webhooks)
+        head = event_ring.head()
+        cursor = max(0, head - history, head - event_ring.capacity)
+    events, cursor, missed = event_ring.read(cursor, summary, client)
+    return CONNECTED_FRAME + encode_events(events, missed), cursor
+
+
+def server_stats():
+    """Return current history and SSE buffer usage."""
+    with event_ring.condition:
+        sse = {
+            'buffered_events': event_ring.next_seq - event_ring.oldest_seq,
+            'buffered_bytes': event_ring.bytes,
+            'capacity': event_ring.capacity,
+            'max_bytes': event_ring.max_bytes,
+        }
+    return {'history': webhooks.stats(), 'sse': sse, 'parse_cache': parse_cache.stats()}
+
+
+def metric_path(path):
+    """Collapse a request path into one of a bounded set of metric labels."""
+    if path in ('/events', '/webhook', '/metrics', '/api/export') or path in API_ROUTES or path in GUI_ASSETS:
+        return path
+    if path.startswith(WEBHOOK_PREFIX) and webhook_channel(path) is not None:
+        return WEBHOOK_PREFIX + '{channel}'
+    if path.startswith(RECORD_PREFIX):
+        action = path[len(RECORD_PREFIX):].partition('/')[2]
+        if action == 'body' or any(action in routes for routes in RECORD_API_ROUTES.values()):
+            return RECORD_PREFIX + '{id}' + ('/' + action if action else '')
+    return 'other'
+
+
+def record_request(method, path, started):
+    """Count a handled request and time it (started is a perf_counter())."""
+    label = metric_path(path)
+    metrics.inc('hooklens_http_requests_total', (('method', method), ('path', label)))
+    if label != '/events':
+        metrics.observe(
+            'hooklens_http_request_duration_seconds', time.perf_counter() - started,
+            (('path', label),),
+        )
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(
+        '%s="%s"' % (key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in labels
+    ) + '}'
+
+
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def render_metrics():
+    """Return the Prometheus text exposition for GET /metrics."""
+    counters, histograms = metrics.collect()
+    lines = []
+
+    def header(name, kind, help_text):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+
+    for name, (kind, help_text, buckets) in METRIC_TYPES.items():
+        header(name, kind, help_text)
+        if kind == 'counter':
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f'{name}{format_labels(labels)} {value}')
+            continue
+        for (metric, labels), counts in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{format_labels(labels + (("le", bound),))} {cumulative}')
+            lines.append(f'{name}_sum{format_labels(labels)} {counts[-1]}')
+            lines.append(f'{name}_count{format_labels(labels)} {cumulative}')
+
+    stats = server_stats()
+    history, sse = stats['history'], stats['sse']
+    gauges = [
+        ('hooklens_history_requests', 'Requests held in history', history['requests']),
+        ('hooklens_history_bytes', 'Estimated memory used by history', history['bytes']),
+    ]
+    gauges.append(('hooklens_sse_buffered_events', 'Events held in the SSE ring', sse['buffered_events']))
+    gauges.append(('hooklens_sse_buffered_bytes', 'Bytes held in the SSE ring', sse['buffered_bytes']))
+    backlogs = event_ring.backlogs()
+    gauges.append(('hooklens_sse_clients', 'Connected SSE clients', len(backlogs)))
+    forwarding = forwarder.stats(0)
+    gauges.append(('hooklens_forward_pending', 'Deliveries waiting to be sent upstream', forwarding['pending']))
+    gauges.append(('hooklens_forward_in_flight', 'Upstream requests in flight', forwarding['in_flight']))
+    tracked = len(source_limiter) if source_limiter is not None else 0
+    gauges.append(('hooklens_rate_limit_sources', 'Sources with a live rate-limit bucket', tracked))
+    for name, help_text, value in gauges:
+        header(name, 'gauge', help_text)
+        lines.append(f'{name} {value}')
+    header('hooklens_sse_client_backlog_events', 'gauge', 'Events an SSE client has not read yet')
+    for client, backlog in sorted(backlogs.items()):
+        lines.append(f'hooklens_sse_client_backlog_events{{client="{client}"}} {backlog}')
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def store_webhook(webhook_data):
+    """Add a record to history and the search index, dropping evicted ones."""
+    search_index.add(webhook_data)
+    for evicted in webhooks.add(webhook_data):
+        search_index.remove(evicted.uid)
+        parse_cache.discard(evicted.uid)
+        # Spooled bodies outlive eviction only when they belong to the store
+        path = body_path(evicted)
+        if path is not None and store_dir is None:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+def parse_since(value, name='since'):
+    """Parse an epoch timestamp or ISO 8601 date/time."""
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise ValueError(f'invalid {name}: {value!r}')
+
+
+def api_stats(query):
+    """GET /api/stats"""
+    return 200, server_stats()
+
+
+def api_requests(query):
+    """GET /api/requests - search captured requests, newest first."""
+    params = {key: values[-1] for key, values in parse_qs(query).items()}
+    try:
+        limit = min(int(params.get('limit', 50)), 1000)
+        cursor = int(params['cursor']) if params.get('cursor') else None
+    except ValueError:
+        raise ValueError('limit and cursor must be integers')
+    since = parse_since(params['since']) if params.get('since') else None
+    records, next_cursor = search_index.search(
+        method=params.get('method'),
+        path=params.get('path'),
+        header=params.get('header'),
+        q=params.get('q'),
+        since=since,
+        limit=max(limit, 1),
+        cursor=cursor,
+        channel=params.get('channel'),
+    )
+    return 200, {
+        'requests': [webhook_data.to_dict() for webhook_data in records],
+        'next_cursor': None if next_cursor is None else str(next_cursor),
+    }
+
+
+def api_request_detail(record_id, query):
+    """GET /api/requests/{id}: the full record behind a summary event."""
+    webhook_data = webhooks.get(record_id)
+    if webhook_data is None:
+        return 404, {'error': 'request not found'}
+    return 200, webhook_data.to_dict()
+
+
+def api_parsed(record_id, query):
+    """GET /api/requests/{id}/parsed: the body parsed by its detected format.
+
+    ``?path=$.items[0].id`` selects part of it and ``?depth=N`` stubs out
+    whatever is nested deeper, so large bodies can be read piece by piece.
+    """
+    webhook_data = webhooks.get(record_id)
+    if webhook_data is None:
+        return 404, {'error': 'request not found'}
+    params = {key: values[-1] for key, values in parse_qs(query).items()}
+    selector = params.get('path', '$')
+    try:
+        depth = int(params['depth']) if params.get('depth') else None
+    except ValueError:
+        raise ValueError('depth must be an integer')
+    steps = parse_selector(selector)
+    kind, value = parse_cache.get(webhook_data)
+    try:
+        value = select_value(value, steps)
+    except KeyError:
+        return 404, {'error': f'nothing matches {selector}'}
+    if depth is not None:
+        value = truncate_value(value, max(depth, 0))
+    return 200, {'id': record_id, 'content_type': kind, 'path': selector, 'value': value}
+
+
+def api_replay(record_id, query):
+    """POST /api/requests/{id}/replay: send a captured request upstream again."""
+    webhook_data = webhooks.get(record_id)
+    if webhook_data is None:
+        return 404, {'error': 'request not found'}
+    params = {key: values[-1] for key, values in parse_qs(query).items()}
+    url = params.get('url') or forward_url
+    if not url:
+        raise ValueError('no upstream: pass ?url= or start the server with --forward-to')
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https'):
+        raise ValueError('url must be an http:// or https:// URL')
+    if not replay_any_url and (forward_url is None or origin(parsed) != origin(urlparse(forward_url))):
+        return 403, {'error': 'replay only goes to the --forward-to host unless --replay-any-url is set'}
+    return 202, forwarder.submit(webhook_data, url, 'replay')
+
+
+def origin(parsed):
+    """Return the (scheme, host:port) a parsed URL is sent to."""
+    port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+    return parsed.scheme, parsed.hostname, port
+
+
+def api_forwarding(query):
+    """GET /api/forwarding: delivery counters and recent deliveries."""
+    params = {key: values[-1] for key, values in parse_qs(query).items()}
+    try:
+        limit = min(int(params.get('limit', 50)), forwarder.history)
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    stats = forwarder.stats(limit)
+    stats['forward_to'] = forward_url
+    return 200, stats
+
+
+# JSON API endpoints shared by both engines (GET)
+API_ROUTES = {
+    '/api/stats': api_stats,
+    '/api/requests': api_requests,
+    '/api/forwarding': api_forwarding,
+}
+
+# JSON endpoints under /api/requests/{id}, by method and then by the
+# part after the id
+RECORD_PREFIX = '/api/requests/'
+RECORD_API_ROUTES = {
+    'GET': {'': api_request_detail, 'parsed': api_parsed},
+    'POST': {'replay': api_replay},
+}
+
+
+def api_route(path, method='GET'):
+    """Return ``(handler, args)`` for a JSON API request, or None."""
+    if method == 'GET' and path in API_ROUTES:
+        return API_ROUTES[path], ()
+    if path.startswith(RECORD_PREFIX):
+        record_id, _, action = path[len(RECORD_PREFIX):].partition('/')
+        handler = RECORD_API_ROUTES.get(method, {}).get(action)
+        if record_id and handler is not None:
+            return handler, (record_id,)
+    return None
+
+
+def call_api(route, query):
+    """Run the handler from api_route and return ``(status, data)``."""
+    handler, args = route
+    try:
+        return handler(*args, query)
+    except ValueError as e:
+        return 400, {'error': str(e)}
+
+
+# GET /api/export formats and their content types
+EXPORT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'har': 'application/json',
+}
+
+# Export output is written in pieces of about this size
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+# Records are stored with the "timestamp" field near the start of the line
+LINE_TIMESTAMP_RE = re.compile(rb'"timestamp": "([^"]*)"')
+LINE_ID_RE = re.compile(rb'"id": "([^"]*)"')
+
+HAR_HEAD = b'{"log": {"version": "1.2", "creator": {"name": "HookLens", "version": "1.0"}, "entries": ['
+
+
+def line_timestamp(line):
+    """Return the timestamp of a stored record line (as bytes)."""
+    match = LINE_TIMESTAMP_RE.search(line, 0, 256)
+    if match is None:
+        return json.loads(line)['timestamp'].encode('utf-8')
+    return match.group(1)
+
+
+def with_live_duplicates(line):
+    """Return a stored record line with the repeats --dedup has since
+    folded into the record, while it is still in history.
+
+    The log keeps each record as first captured; repeat counts live only
+    in memory.
+    """
+    match = LINE_ID_RE.search(line, 0, 64)
+    webhook_data = match and webhooks.get(match.group(1).decode('ascii'))
+    if not webhook_data or not webhook_data.duplicates:
+        return line
+    return json.dumps(webhook_data.to_dict()).encode('utf-8')
+
+
+def stored_records(position, since, until):
+    """Yield ``(cursor, line)`` from the capture log, within since/until."""
+    low = since and datetime.fromtimestamp(since).strftime(TIMESTAMP_FORMAT).encode('ascii')
+    high = until and datetime.fromtimestamp(until).strftime(TIMESTAMP_FORMAT).encode('ascii')
+    # Records are stored in capture order, so a segment can be skipped
+    # when the next one already starts before since
+    skip = (lambda line: line_timestamp(line) < low) if low else None
+    for (number, line_number), line in capture_log.scan(position, skip):
+        if low or high:
+            timestamp = line_timestamp(line)
+            if low and timestamp < low or high and timestamp > high:
+                continue
+        if deduplicator is not None:
+            line = with_live_duplicates(line)
+        yield f'{number}:{line_number}', line
+
+
+def history_records(cursor, since, until):
+    """Yield ``(cursor, record)`` from history, within since/until."""
+    for doc, webhook_data in search_index.scan(cursor, since, until):
+        yield str(doc), webhook_data.to_dict()
+
+
+@functools.lru_cache(maxsize=1024)
+def har_time(timestamp):
+    """ISO 8601 form of a record timestamp (many records share a second)."""
+    return datetime.strptime(timestamp, TIMESTAMP_FORMAT).astimezone().isoformat()
+
+
+def har_entry(webhook_data):
+    """Describe a captured request as a HAR 1.2 entry."""
+    headers = webhook_data['headers']
+    host = next((value for name, value in headers.items() if name.lower() == 'host'), 'localhost')
+    query = urlparse(webhook_data['path']).query
+    request = {
+        'method': webhook_data['method'],
+        'url': f'http://{host}{webhook_data["path"]}',
+        'httpVersion': 'HTTP/1.1',
+        'cookies': [],
+        'headers': [{'name': name, 'value': value} for name, value in headers.items()],
+        'queryString': [
+            {'name': name, 'value': value} for name, value in parse_qsl(query, keep_blank_values=True)
+        ],
+        'headersSize': -1,
+        'bodySize': webhook_data['body_size'],
+    }
+    if webhook_data['body_size']:
+        post_data = {'mimeType': headers.get('Content-Type', ''), 'text': webhook_data['body']}
+        if webhook_data.get('body_encoding') == 'base64':
+            post_data['_encoding'] = 'base64'
+        if webhook_data.get('body_spooled'):
+            # text is only the preview; the full body is at /api/requests/{id}/body
+            post_data['_truncated'] = True
+        request['postData'] = post_data
+    return {
+        'startedDateTime': har_time(webhook_data['timestamp']),
+        'time': 0,
+        'request': request,
+        'response': {
+            'status': 200,
+            'statusText': 'OK',
+            'httpVersion': 'HTTP/1.1',
+            'cookies': [],
+            'headers': [],
+            'content': {'size': 0, 'mimeType': 'application/json'},
+            'redirectURL': '',
+            'headersSize': -1,
+            'bodySize': -1,
+        },
+        'cache': {},
+        'timings': {'send': 0, 'wait': 0, 'receive': 0},
+        '_id': webhook_data['id'],
+    }
+
+
+def export_chunks(export_format, records, limit=None):
+    """Encode ``(cursor, record)`` pairs as NDJSON or HAR in ~64 KB chunks.
+
+    A record is a parsed dict or a stored JSON line (bytes), which NDJSON
+    copies as is. When limit stops the export early, the cursor to
+    continue from is added as a final ``{"next_cursor": ...}`` line
+    (NDJSON) or as ``log._next_cursor`` (HAR).
+    """
+    har = export_format == 'har'
+    pieces = [HAR_HEAD] if har else []
+    size = 0
+    count = 0
+    last = next_cursor = None
+    for cursor, record in records:
+        if limit is not None and count >= limit:
+            next_cursor = last
+            break
+        if har:
+            if isinstance(record, bytes):
+                record = json.loads(record)
+            piece = (b', ' if count else b'') + json.dumps(har_entry(record)).encode('utf-8')
+        elif isinstance(record, bytes):
+            piece = record + b'\n'
+        else:
+            piece = json.dumps(record).encode('utf-8') + b'\n'
+        pieces.append(piece)
+        size += len(piece)
+        count += 1
+        last = cursor
+        if size >= EXPORT_CHUNK_BYTES:
+            yield b''.join(pieces)
+            pieces, size = [], 0
+    if har:
+        tail = b', "_next_cursor": ' + json.dumps(next_cursor).encode('utf-8') if next_cursor else b''
+        pieces.append(b']' + tail + b'}}')
+    elif next_cursor is not None:
+        pieces.append(json.dumps({'next_cursor': next_cursor}).encode('utf-8') + b'\n')
+    if pieces:
+        yield b''.join(pieces)
+
+
+def open_export(query):
+    """Start GET /api/export; return ``(filename, content_type, chunks)``.
+
+    Records come from the --store log when there is one (the whole
+    persisted history, not just what is in memory), otherwise from
+    history. Both are read and encoded a batch at a time, so memory use
+    does not grow with the size of the export. Parameters are checked
+    here, before any output, and raise ValueError.
+    """
+    params = {key: values[-1] for key, values in parse_qs(query).items()}
+    export_format = params.get('format', 'ndjson')
+    if export_format not in EXPORT_TYPES:
+        raise ValueError('format must be one of: ' + ', '.join(EXPORT_TYPES))
+    since = parse_since(params['since']) if params.get('since') else None
+    until = parse_since(params['until'], 'until') if params.get('until') else None
+    try:
+        limit = int(params['limit']) if params.get('limit') else None
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    cursor = params.get('cursor') or None
+    try:
+        if capture_log is not None:
+            if cursor is not None:
+                number, line_number = cursor.split(':')
+                cursor = int(number), int(line_number)
+            records = stored_records(cursor, since, until)
+        else:
+            records = history_records(None if cursor is None else int(cursor), since, until)
+    except ValueError:
+        raise ValueError(f'invalid cursor: {cursor!r}')
+    chunks = export_chunks(export_format, records, limit)
+    return f'hooklens-export.{export_format}', EXPORT_TYPES[export_format], chunks
+
+
+# Methods a capture endpoint accepts
+WEBHOOK_METHODS = ('GET', 'POST', 'PUT', 'DELETE', 'PATCH')
+
+# (method, path) -> (route name, args) for every fixed path, shared by
+# both engines; each engine maps route names to its own handlers
+ROUTES = {
+    ('GET', '/events'): ('events', ()),
+    ('GET', '/metrics'): ('metrics', ()),
+    ('GET', '/api/export'): ('export', ()),
+}
+ROUTES.update((('GET', path), ('asset', (asset,))) for path, asset in GUI_ASSETS.items())
+ROUTES.update((('GET', path), ('api', ((handler, ()),))) for path, handler in API_ROUTES.items())
+ROUTES.update(((method, '/webhook'), ('webhook', (DEFAULT_CHANNEL,))) for method in WEBHOOK_METHODS)
+
+
+def find_route(method, path):
+    """Return ``(route name, args)`` for a request, or None if nothing matches.
+
+    Fixed paths cost one dict lookup; ``/webhook/<channel>/...`` and
+    ``/api/requests/{id}/...`` are matched by prefix.
+    """
+    route = ROUTES.get((method, path))
+    if route is not None:
+        return route
+    if path.startswith(WEBHOOK_PREFIX) and method in WEBHOOK_METHODS:
+        channel = webhook_channel(path)
+        return None if channel is None else ('webhook', (channel,))
+    if path.startswith(RECORD_PREFIX):
+        api = api_route(path, method)
+        if api is not None:
+            return 'api', (api,)
+        if method == 'GET' and path.endswith('/body'):
+            return 'body', (path[len(RECORD_PREFIX):-len('/body')],)
+    return None
+
+
+def allows_cors(method, path):
+    """Whether the answer to method on path may carry CORS_HEADERS.
+
+    State-changing API calls (POST /api/requests/{id}/replay) are left
+    without them, so pages on other origins cannot make or read them.
+    """
+    route = find_route(method, path)
+    return route is None or route[0] != 'api' or method == 'GET'
+
+
+def cross_origin(headers):
+    """Whether a browser sent the request from a page on another origin."""
+    value = headers.get('Origin')
+    return bool(value) and urlparse(value).netloc != headers.get('Host', '')
+
+
+# Answer to a state-changing API call from a page on another origin
+CROSS_ORIGIN_ERROR = (403, {'error': 'cross-origin requests cannot change state'})
+
+
+def restore_history(records):
+    """Load records from the capture log into history and the SSE ring.
+
+    Records that cannot be loaded are reported and skipped.
+    """
+    restored = []
+    skipped = 0
+    for record in records:
+        try:
+            webhook_data = Capture.from_dict(record)
+            store_webhook(webhook_data)
+        except Exception:
+            skipped += 1
+            continue
+        restored.append(webhook_data)
+    if skipped:
+        print(f'Skipped {skipped} stored records that could not be loaded', file=sys.stderr)
+    records = restored
+    for webhook_data in records[-event_ring.capacity:]:
+        broadcast_webhook(webhook_data, json.dumps(webhook_data.to_dict()).encode('utf-8'))
+
+
+def commit_capture(webhook_data, payload):
+    """Add a capture to this process's history and SSE ring.
+
+    With --dedup, a repeat of a record still in history is only counted on
+    that record, which is returned; otherwise returns None.
+    """
+    if deduplicator is not None:
+        original = deduplicator.fold(webhook_data)
+        if original is not None:
+            metrics.inc('hooklens_webhook_skipped_total', (('reason', 'duplicate'),))
+            return original
+    store_webhook(webhook_data)
+    broadcast_webhook(webhook_data, payload)
+    return None
+
+
+def forward_target(path):
+    """Return the --forward-to URL with the query string of a /webhook path."""
+    query = urlparse(path).query
+    if not query:
+        return forward_url
+    return forward_url + ('&' if urlparse(forward_url).query else '?') + query
+
+
+def admit_webhook(channel, headers, client_ip):
+    """Apply the admission limits to a webhook before its body is read.
+
+    Returns None to accept it, or ``(status, error, retry_after)`` for the
+    413 or 429 answer. A chunked body is only measured while it is read,
+    by the BodyBuffer limit.
+    """
+    if max_body_bytes:
+        try:
+            length = int(headers.get('Content-Length') or 0)
+        except ValueError:
+            length = 0  # read_body() answers 400
+        if length > max_body_bytes:
+            metrics.inc('hooklens_webhook_rejected_total', (('reason', 'body_too_large'),))
+            return 413, f'body exceeds {max_body_bytes} bytes', None
+    if source_limiter is not None:
+        key = source_header and headers.get(source_header)
+        wait = source_limiter.take(('header', key) if key else ('ip', client_ip))
+        if wait:
+            metrics.inc('hooklens_webhook_rejected_total', (('reason', 'rate_limited'),))
+            return 429, 'rate limit exceeded', math.ceil(wait)
+    limiter = channel_quotas.get(channel, channel_quotas.get(None))
+    if limiter is not None:
+        wait = limiter.take(channel)
+        if wait:
+            metrics.inc('hooklens_webhook_rejected_total', (('reason', 'channel_quota'),))
+            return 429, f'channel {channel} is over its quota', math.ceil(wait)
+    return None
+
+
+def retry_after_header(seconds):
+    """Return the headers that ask a client to wait seconds (none for None)."""
+    return () if seconds is None else (('Retry-After', str(seconds)),)
+
+
+def record_webhook(method, path, headers, body, channel=DEFAULT_CHANNEL):
+    """Store a captured webhook and broadcast it to the channel's SSE clients.
+
+    body is a closed BodyBuffer. A spooled body is moved to a file named
+    after the record id and only its preview is kept in the record.
+    Returns the Capture (or, with --dedup, the earlier one it repeats).
+    """
+    metrics.observe('hooklens_webhook_body_bytes', body.size)
+    webhook_data = Capture(
+        uuid.uuid4().bytes, time.time_ns(), channel, method, path, headers.items(),
+        body.getvalue(), body.size, body.path is not None,
+        0 if deduplicator is not None else None,
+    )
+    if body.path is not None:
+        os.replace(body.path, os.path.join(spool_directory(), webhook_data.id))
+
+    # Relay upstream from background threads (see Forwarder); this
+    # happens whether or not the capture is sampled or folded below
+    if forward_url is not None:
+        forwarder.submit(webhook_data, forward_target(path))
+
+    if sample_rate < 1 and body.path is None and random.random() >= sample_rate:
+        metrics.inc('hooklens_webhook_skipped_total', (('reason', 'sampled'),))
+        return webhook_data
+
+    # Store webhook and broadcast it to all SSE clients. The record is
+    # encoded once here and the same bytes are reused for every subscriber.
+    payload = json.dumps(webhook_data.to_dict()).encode('utf-8')
+    original = None
+    if capture_bus is not None:
+        # Stored when the parent sends it back, in the same order as in
+        # every other worker
+        capture_bus.publish(payload)
+    else:
+        original = commit_capture(webhook_data, payload)
+        if original is None and capture_log is not None:
+            capture_log.append(payload)
+
+    # Log to console (from a background thread; see AccessLog)
+    if access_log is not None:
+        access_log.log(webhook_data)
+
+    return webhook_data if original is None else original
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    """HTTP request handler for webhook debugging.
+
+    Connections are persistent (HTTP/1.1). Every response carries a
+    Content-Length or is chunked, so the next request can follow on the
+    same connection, pipelined or not.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without this, Nagle and
+    # delayed ACKs stall every reused connection by ~40 ms
+    disable_nagle_algorithm = True
+    requests_handled = 0
+    body_read = False
+    # Set when the admission limits already passed the request (see
+    # handle_expect_100)
+    admitted = False
+    # Whether responses carry CORS_HEADERS (see allows_cors)
+    cors = True
+
+    def log_message(self, format, *args):
+        """Override to suppress default logging."""
+        pass
+
+    def setup(self):
+        # Idle connections give their pool worker back after this long
+        self.timeout = keepalive_timeout or None
+        BaseHTTPRequestHandler.setup(self)
+
+    def handle(self):
+        self.close_connection = True
+        self.handle_one_request()
+        while not self.close_connection and self.await_next_request():
+            self.handle_one_request()
+
+    def await_next_request(self):
+        """Wait for the next request on a persistent connection.
+
+        Returns False once the connection idles for keepalive_timeout, or as
+        soon as other connections are queued for a pool worker, so an idle
+        client never holds a worker someone else is waiting for.
+        """
+        deadline = self.timeout and time.monotonic() + self.timeout
+        try:
+            # A pipelined request may already be buffered
+            self.connection.settimeout(0)
+            if self.rfile.peek(1):
+                return True
+            while True:
+                if select.select([self.connection], [], [], KEEPALIVE_POLL_INTERVAL)[0]:
+                    return True
+                if self.workers_wanted():
+                    return False
+                if deadline and time.monotonic() >= deadline:
+                    return False
+        except (OSError, ValueError):
+            return False
+        finally:
+            try:
+                self.connection.settimeout(self.timeout)
+            except OSError:
+                pass
+
+    def workers_wanted(self):
+        """Whether accepted connections are queued for a pool worker."""
+        waiting = getattr(self.server, 'pending', None)
+        return waiting is not None and not waiting.empty()
+
+    def handle_one_request(self):
+        self.requests_handled += 1
+        self.body_read = False
+        self.admitted = False
+        self.cors = True
+        self.started = None
+        BaseHTTPRequestHandler.handle_one_request(self)
+        if self.started is not None and self.command:
+            record_request(self.command, urlparse(self.path).path, self.started)
+
+    def parse_request(self):
+        # Time requests from when they arrive, not from when the
+        # connection started waiting for them
+        self.started = time.perf_counter()
+        return BaseHTTPRequestHandler.parse_request(self)
+
+    def handle_expect_100(self):
+        """Apply the admission limits before inviting the body.
+
+        A rejected webhook gets its 413 or 429 instead of 100 Continue, so
+        the sender never uploads a body that would be thrown away.
+        """
+        route = find_route(self.command, urlparse(self.path).path)
+        if route is not None and route[0] == 'webhook':
+            rejected = admit_webhook(route[1][0], self.headers, self.client_address[0])
+            if rejected is not None:
+                status, error, retry_after = rejected
+                self.send_json({'error': error}, status, retry_after_header(retry_after))
+                return False
+            self.admitted = True
+        self.send_response_only(HTTPStatus.CONTINUE)
+        BaseHTTPRequestHandler.end_headers(self)
+        return True
+
+    def end_headers(self):
+        """Finish the headers, closing the connection when it must not be reused."""
+        if not self.close_connection:
+            if (keepalive_requests and self.requests_handled >= keepalive_requests
+                    or not self.body_read and has_body(self.headers)
+                    or self.workers_wanted()):
+                # Either the connection served its share, an unread body
+                # would be mistaken for the next request, or other
+                # connections are waiting for this worker
+                self.send_header('Connection', 'close')
+            elif self.request_version == 'HTTP/1.0':
+                self.send_header('Connection', 'keep-alive')
+        BaseHTTPRequestHandler.end_headers(self)
+
+    def send_cors_headers(self):
+        """Send CORS headers for cross-origin requests."""
+        if not self.cors:
+            return
+        for key, value in CORS_HEADERS:
+            self.send_header(key, value)
+
+    def do_OPTIONS(self):
+        """Handle OPTIONS requests for CORS preflight."""
+        method = self.headers.get('Access-Control-Request-Method', 'GET')
+        self.cors = allows_cors(method, urlparse(self.path).path)
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.send_cors_headers()
+        self.end_headers()
+
+    # Route name (see find_route) -> method answering it, called with the
+    # route's args and the query string
+    ROUTE_HANDLERS = {
+        'asset': 'serve_asset',
+        'events': 'serve_sse',
+        'metrics': 'send_metrics',
+        'export': 'serve_export',
+        'api': 'send_api',
+        'body': 'serve_body',
+        'webhook': 'handle_webhook',
+    }
+
+    def dispatch(self):
+        """Answer a GET, POST, PUT, DELETE or PATCH through the route table."""
+        parsed_path = urlparse(self.path)
+        route = find_route(self.command, parsed_path.path)
+        if route is None:
+            self.send_error(404, 'Not Found')
+            return
+        name, args = route
+        self.cors = allows_cors(self.command, parsed_path.path)
+        getattr(self, self.ROUTE_HANDLERS[name])(*args, parsed_path.query)
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_PATCH = dispatch
+
+    def serve_asset(self, asset, query=''):
+        """Serve a GUI asset (pre-encoded, conditional, maybe gzipped)."""
+        status, body, headers = asset.response(self.headers)
+        self.send_response(status)
+        if status == 200:
+            self.send_header('Content-Type', asset.content_type)
+            self.send_header('Content-Length', str(len(body)))
+        for key, value in headers:
+            self.send_header(key, value)
+        self.send_cors_headers()
+        self.end_headers()
+        self.wfile.write(body)
+
+    def serve_sse(self, query):
+        """Serve Server-Sent Events stream (``?channel=a,b`` for some channels)."""
+        # The stream lives as long as the browser tab, so give the pool
+        # worker back before settling in.
+        detach = getattr(self.server, 'detach_worker', None)
+        if detach is not None:
+            detach()
+        self.connection.settimeout(None)
+
+        encoder = StreamEncoder(sse_compression and accepts_gzip(self.headers))
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'keep-alive')
+        if encoder.compressor is not None:
+            self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Vary', 'Accept-Encoding')
+        self.send_cors_headers()
+        self.end_headers()
+        # The stream has no length; it ends when the connection does
+        self.close_connection = True
+
+        summary = summary_mode(query)
+        client = event_ring.subscribe(query_channels(query))
+        try:
+            initial, cursor = open_event_stream(last_event_id(self.headers, query), summary, client)
+
+            # Send connection event plus history (or missed events) at once
+            self.wfile.write(encoder.encode(initial))
+            self.wfile.flush()
+
+            # Wait for new events
+            while True:
+                if not event_ring.wait(cursor, 30, client):
+                    # Send keep-alive comment
+                    self.wfile.write(encoder.encode(KEEPALIVE_FRAME))
+                    self.wfile.flush()
+                    continue
+                # Let a burst accumulate so it goes out as one write
+                if sse_batch_delay:
+                    time.sleep(sse_batch_delay)
+                events, cursor, missed = event_ring.read(cursor, summary, client)
+                self.wfile.write(encoder.encode(encode_events(events, missed)))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            event_ring.unsubscribe(client)
+
+    def send_metrics(self, query=''):
+        """Send the Prometheus metrics page."""
+        body = render_metrics()
+        self.send_response(200)
+        self.send_header('Content-Type', METRICS_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, data, status=200, headers=()):
+        """Send a JSON response."""
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in headers:
+            self.send_header(key, value)
+        self.send_cors_headers()
+        self.end_headers()
+        self.wfile.write(body)
+
+    def serve_body(self, record_id, query=''):
+        """Stream a captured request's full body, honouring Range.
+
+        With ``?decode=1`` a gzip/deflate Content-Encoding is undone on the
+        fly; the stored body itself always stays compressed.
+        """
+        webhook_data = webhooks.get(record_id)
+        if webhook_data is None:
+            self.send_json({'error': 'request not found'}, 404)
+            return
+        path = body_path(webhook_data)
+        if path is None:
+            source = io.BytesIO(webhook_data.body)
+            size = len(source.getvalue())
+        else:
+            try:
+                source = open(path, 'rb')
+            except OSError:
+                self.send_json({'error': 'body no longer available'}, 410)
+                return
+            size = os.fstat(source.fileno()).st_size
+
+        with source:
+            decode = parse_qs(query).get('decode', ['0'])[-1] not in ('', '0')
+            if decode:
+                inflater = decompressor(webhook_data.header('Content-Encoding'))
+                if inflater is not None:
+                    self.stream_decompressed(source, inflater, webhook_data.header('Content-Type'))
+                    return
+            try:
+                byte_range = parse_range(self.headers.get('Range'), size)
+            except ValueError:
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{size}')
+                self.send_header('Content-Length', '0')
+                self.send_cors_headers()
+                self.end_headers()
+                return
+            start, end = byte_range or (0, size - 1)
+
+            self.send_response(206 if byte_range else 200)
+            content_type = webhook_data.header('Content-Type', 'application/octet-stream')
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(end - start + 1))
+            self.send_header('Accept-Ranges', 'bytes')
+            if byte_range:
+                self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+            self.send_cors_headers()
+            self.end_headers()
+
+            source.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                data = source.read(min(remaining, BodyBuffer.CHUNK_BYTES))
+                if not data:
+                    break
+                self.wfile.write(data)
+                remaining -= len(data)
+
+    def stream_decompressed(self, source, inflater, content_type):
+        """Send a decompressed body of unknown length."""
+        self.send_stream(content_type or 'application/octet-stream', inflate_chunks(source, inflater))
+
+    def serve_export(self, query):
+        """Stream GET /api/export (see open_export)."""
+        try:
+            filename, content_type, chunks = open_export(query)
+        except ValueError as e:
+            self.send_json({'error': str(e)}, 400)
+            return
+        self.send_stream(content_type, chunks, (
+            ('Content-Disposition', f'attachment; filename="{filename}"'),
+        ))
+
+    def send_stream(self, content_type, chunks, headers=()):
+        """Send a response of unknown length from an iterable of bytes.
+
+        HTTP/1.1 clients get it chunked so the connection can be reused;
+        HTTP/1.0 clients read until the connection closes.
+        """
+        chunked = self.request_version != 'HTTP/1.0'
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        for key, value in headers:
+            self.send_header(key, value)
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        else:
+            self.send_header('Connection', 'close')
+        self.send_cors_headers()
+        self.end_headers()
+
+        chunks = iter(chunks)
+        while True:
+            try:
+                data = next(chunks)
+            except StopIteration:
+                break
+            except (ValueError, OSError, zlib.error):
+                # Headers are already sent; cutting the stream short (without
+                # the last chunk) is all we can do
+                self.close_connection = True
+                return
+            if data and chunked:
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+            elif data:
+                self.wfile.write(data)
+        if chunked:
+            self.wfile.write(b'0\r\n\r\n')
+
+    def read_body(self):
+        """Read the request body into a BodyBuffer (Content-Length or chunked)."""
+        body = BodyBuffer(max_body_bytes)
+        try:
+            if is_chunked(self.headers):
+                read_chunked(self.rfile, body)
+            else:
+                remaining = int(self.headers.get('Content-Length', 0))
+                while remaining > 0:
+                    data = self.rfile.read(min(remaining, BodyBuffer.CHUNK_BYTES))
+                    if not data:
+                        break
+                    body.write(data)
+                    remaining -= len(data)
+        except BaseException:
+            body.discard()
+            raise
+        body.close()
+        self.body_read = True
+        return body
+
+    def send_api(self, route, query):
+        """Answer a JSON API request (see api_route)."""
+        if self.command != 'GET' and cross_origin(self.headers):
+            status, data = CROSS_ORIGIN_ERROR
+        else:
+            status, data = call_api(route, query)
+        self.send_json(data, status)
+
+    def handle_webhook(self, channel, query=''):
+        """Handle incoming webhook requests."""
+        rejected = None if self.admitted else admit_webhook(channel, self.headers, self.client_address[0])
+        if rejected is not None:
+            status, error, retry_after = rejected
+            self.send_json({'error': error}, status, retry_after_header(retry_after))
+            return
+
+        # Read request body
+        try:
+            body = self.read_body()
+        except ValueError as e:
+            self.send_json({'error': str(e)}, 413 if isinstance(e, BodyTooLarge) else 400)
+            self.close_connection = True
+            return
+
+        webhook_data = record_webhook(self.command, self.path, self.headers, body, channel)
+
+        # Send response
+        response = {'status': 'received', 'id': webhook_data.id}
+        self.send_json(response)
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTP server that handles requests on a fixed pool of worker threads.
+
+    Accepted connections wait in a bounded queue. When the queue is full the
+    connection is answered with 503 and a Retry-After header instead of
+    spawning yet another thread.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, server_address, handler_class, workers=16, backlog=128, reuse_port=False):
+        # Read by server_activate() as the listen() backlog
+        self.request_queue_size = backlog
+        self.reuse_port = reuse_port
+        self.workers = workers
+        self.pending = queue.Queue(maxsize=backlog)
+        self.worker_threads = []
+        HTTPServer.__init__(self, server_address, handler_class)
+        for _ in range(workers):
+            self.start_worker()
+
+    def server_bind(self):
+        if self.reuse_port:
+            # Let the other --processes workers accept on the same port
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        HTTPServer.server_bind(self)
+
+    def start_worker(self):
+        """Start one pool worker thread."""
+        thread = threading.Thread(target=self.worker_loop, name='hooklens-worker')
+        thread.daemon = self.daemon_threads
+        thread.detached = False
+        thread.start()
+        self.worker_threads.append(thread)
+
+    def worker_loop(self):
+        """Serve queued connections until the server closes."""
+        thread = threading.current_thread()
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            request, client_address = item
+            self.process_request_thread(request, client_address)
+            if thread.detached:
+                # A replacement already joined the pool; finish here.
+                return
+
+    def detach_worker(self):
+        """Hand the current worker over to a long-lived stream.
+
+        A replacement worker is started so the pool keeps serving webhooks
+        while the stream stays open.
+        """
+        thread = threading.current_thread()
+        if getattr(thread, 'detached', True):
+            return
+        thread.detached = True
+        if thread in self.worker_threads:
+            self.worker_threads.remove(thread)
+        self.start_worker()
+
+    def process_request(self, request, client_address):
+        """Queue the connection for a worker, or reject it when overloaded."""
+        try:
+            self.pending.put_nowait((request, client_address))
+        except queue.Full:
+            self.reject_request(request)
+            self.shutdown_request(request)
+
+    def reject_request(self, request):
+        """Answer an overflowing connection with 503 Service Unavailable."""
+        response = (
+            'HTTP/1.1 503 Service Unavailable\r\n'
+            f'Retry-After: {RETRY_AFTER_SECONDS}\r\n'
+            'Content-Length: 0\r\n'
+            'Connection: close\r\n'
+            '\r\n'
+        )
+        try:
+            request.sendall(response.encode('ascii'))
+        except OSError:
+            pass
+
+    def process_request_thread(self, request, client_address):
+        """Process the request in a worker thread."""
+        try:
+            self.finish_request(request, client_address)
+        except socket.timeout:
+            # A client that stalls mid-request is simply disconnected
+            pass
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        """Stop the worker threads and close the listening socket."""
+        HTTPServer.server_close(self)
+        for _ in self.worker_threads:
+            self.pending.put(None)
+
+
+class AsyncRequest:
+    """A request being answered by AsyncioHookLens."""
+
+    def __init__(self, reader, writer, method, target, version, headers, query, keep_alive):
+        self.reader = reader
+        self.writer = writer
+        self.method = method
+        self.target = target
+        self.version = version
+        self.headers = headers
+        self.query = query
+        self.keep_alive = keep_alive
+        self.cors = True
+
 
-    <div class="copy-toast" id="copyToast">Copied to clipboard!</div>
+class AsyncioHookLens:
+    """Serve /, /events and /webhook from a single asyncio event loop.
 
-    <script>
-        let requests = [];
-        let eventSource = null;
+    Connections are persistent; requests on one connection (pipelined or
+    not) are answered in order.
+    """
 
-        function init() {
-            const protocol = window.location.protocol;
-            const host = window.location.host;
-            document.getElementById('endpointUrl').textContent = protocol + '//' + host + '/webhook';
-            connectSSE();
-        }
+    def __init__(self, server_address, backlog=128, reuse_port=False):
+        self.host, self.port = server_address
+        self.backlog = backlog
+        self.reuse_port = reuse_port
+        self.in_flight = 0
+        # Channel (None for every channel) -> Events of the streams waiting on it
+        self.waiters = {}
 
-        function connectSSE() {
-            if (eventSource) {
-                eventSource.close();
-            }
+    def run(self):
+        """Run the event loop until interrupted."""
+        try:
+            asyncio.run(self.serve_forever())
+        except asyncio.CancelledError:
+            # Stopped by SIGTERM
+            pass
 
-            eventSource = new EventSource('/events');
+    async def serve_forever(self):
+        loop = asyncio.get_running_loop()
+        try:
+            # Stop between callbacks rather than raising inside one
+            loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        except (NotImplementedError, RuntimeError):
+            pass
 
-            eventSource.onopen = function() {
-                document.getElementById('statusDot').classList.add('connected');
-                document.getElementById('statusText').textContent = 'Connected';
-            };
+        def on_append(channel):
+            loop.call_soon_threadsafe(self.notify_streams, channel)
 
-            eventSource.onmessage = function(event) {
-                const data = JSON.parse(event.data);
-                if (data.type === 'webhook') {
-                    addRequest(data.payload);
-                }
-            };
+        event_ring.add_listener(on_append)
+        server = await asyncio.start_server(
+            self.handle_connection, self.host or None, self.port, backlog=self.backlog,
+            reuse_port=self.reuse_port or None,
+        )
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            event_ring.remove_listener(on_append)
 
-            eventSource.onerror = function() {
-                document.getElementById('statusDot').classList.remove('connected');
-                document.getElementById('statusText').textContent = 'Disconnected';
-                setTimeout(connectSSE, 3000);
-            };
-        }
+    def notify_streams(self, channel):
+        """Wake the SSE streams waiting for an event on channel."""
+        for key in (None, channel):
+            for changed in self.waiters.get(key, ()):
+                changed.set()
 
-        function addRequest(req) {
-            requests.unshift(req);
-            renderRequests();
-        }
+    async def handle_connection(self, reader, writer):
+        """Serve requests from a persistent connection until it closes."""
+        try:
+            served = 0
+            keep_alive = True
+            while keep_alive:
+                try:
+                    head = await asyncio.wait_for(
+                        reader.readuntil(b'\r\n\r\n'), keepalive_timeout or None
+                    )
+                except asyncio.TimeoutError:
+                    return
+                if self.in_flight >= self.backlog:
+                    await self.send_response(
+                        writer, 503, headers=[('Retry-After', str(RETRY_AFTER_SECONDS))]
+                    )
+                    return
+                served += 1
+                self.in_flight += 1
+                try:
+                    keep_alive = await self.dispatch(
+                        reader, writer, head,
+                        not keepalive_requests or served < keepalive_requests,
+                    )
+                finally:
+                    self.in_flight -= 1
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        except asyncio.CancelledError:
+            # The server is shutting down; end quietly
+            pass
+        finally:
+            writer.close()
 
-        function renderRequests() {
-            const container = document.getElementById('requestList');
+    # Route name (see find_route) -> method answering it with the request
+    # and the route's args; each returns whether the connection may be reused
+    ROUTE_HANDLERS = {
+        'asset': 'serve_asset',
+        'events': 'serve_events',
+        'metrics': 'serve_metrics',
+        'export': 'serve_export',
+        'api': 'serve_api',
+        'body': 'serve_body',
+        'webhook': 'serve_webhook',
+    }
 
-            if (requests.length === 0) {
-                container.innerHTML = '<div class="no-requests" id="noRequests">' +
-                    '<div class="no-requests-icon">&#128229;</div>' +
-                    '<div>No requests yet</div>' +
-                    '<div style="margin-top: 8px; font-size: 12px;">Send a webhook to the endpoint above</div>' +
-                '</div>';
-                return;
-            }
+    async def dispatch(self, reader, writer, head, reuse=True):
+        """Answer the request whose header block is head.
 
-            container.innerHTML = requests.map((req, index) => createRequestHTML(req, index)).join('');
-        }
+        Returns True if the connection may carry another request.
+        """
+        started = time.perf_counter()
+        request_line, _, header_block = head.partition(b'\r\n')
+        method, target, version = request_line.decode('iso-8859-1').split(' ', 2)
+        headers = http.client.parse_headers(io.BytesIO(header_block))
+        parsed = urlparse(target)
+        path = parsed.path
+        try:
+            route = find_route(method, path)
+            handler = route and self.ROUTE_HANDLERS.get(route[0])
+            # An unread body would be mistaken for the next request
+            keep_alive = (reuse and wants_keep_alive(version.strip(), headers)
+                          and (handler == 'serve_webhook' or not has_body(headers)))
+            if method == 'OPTIONS':
+                await self.send_response(writer, 200, keep_alive=keep_alive, cors=allows_cors(
+                    headers.get('Access-Control-Request-Method', 'GET'), path
+                ))
+                return keep_alive
+            if handler is None:
+                await self.send_response(writer, 404, b'Not Found', 'text/plain', keep_alive=keep_alive)
+                return keep_alive
+            request = AsyncRequest(reader, writer, method, target, version.strip(), headers,
+                                   parsed.query, keep_alive)
+            request.cors = allows_cors(method, path)
+            return await getattr(self, handler)(request, *route[1])
+        finally:
+            record_request(method, path, started)
 
-        function createRequestHTML(req, index) {
-            const methodClass = req.method.toLowerCase();
-            const headersHTML = Object.entries(req.headers).map(([key, value]) =>
-                '<tr><td>' + escapeHtml(key) + '</td><td>' + escapeHtml(value) + '</td></tr>'
-            ).join('');
-
-            let bodyHTML = '';
-            if (req.body) {
-                try {
-                    const parsed = JSON.parse(req.body);
-                    bodyHTML = formatJSON(parsed, '');
-                } catch (e) {
-                    bodyHTML = '<div class="raw-body" onclick="copyValue(this.textContent)">' + escapeHtml(req.body) + '</div>';
-                }
-            } else {
-                bodyHTML = '<div class="raw-body" style="color: #8b949e;">(empty)</div>';
-            }
+    async def send_json(self, request, data, status=200, keep_alive=None, headers=()):
+        await self.send_response(
+            request.writer, status, json.dumps(data).encode('utf-8'), 'application/json',
+            headers, keep_alive=request.keep_alive if keep_alive is None else keep_alive,
+            cors=request.cors,
+        )
 
-            const headersJson = JSON.stringify(req.headers, null, 2);
-            const reqId = 'req-' + index;
+    async def serve_asset(self, request, asset):
+        status, body, headers = asset.response(request.headers)
+        await self.send_response(
+            request.writer, status, body, asset.content_type if status == 200 else None,
+            headers, keep_alive=request.keep_alive,
+        )
+        return request.keep_alive
 
-            return '<div class="request-item" id="request-' + index + '">' +
-                '<div class="request-header" onclick="toggleRequest(' + index + ')">' +
-                    '<span class="expand-icon">&#9654;</span>' +
-                    '<span class="method-badge ' + methodClass + '">' + escapeHtml(req.method) + '</span>' +
-                    '<span class="request-path">' + escapeHtml(req.path) + '</span>' +
-                    '<span class="request-timestamp">' + escapeHtml(req.timestamp) + '</span>' +
-                '</div>' +
-                '<div class="request-body">' +
-                    '<div class="section">' +
-                        '<div class="section-header">' +
-                            '<span class="section-title">Headers</span>' +
-                            '<button class="copy-btn" data-copy="' + reqId + '-headers" onclick="event.stopPropagation(); copyById(this.dataset.copy)">Copy</button>' +
-                        '</div>' +
-                        '<table class="headers-table"><tbody>' + headersHTML + '</tbody></table>' +
-                        '<pre id="' + reqId + '-headers" style="display:none">' + escapeHtml(headersJson) + '</pre>' +
-                    '</div>' +
-                    '<div class="section">' +
-                        '<div class="section-header">' +
-                            '<span class="section-title">Body</span>' +
-                            '<button class="copy-btn" data-copy="' + reqId + '-body" onclick="event.stopPropagation(); copyById(this.dataset.copy)">Copy</button>' +
-                        '</div>' +
-                        '<div class="json-content">' + bodyHTML + '</div>' +
-                        '<pre id="' + reqId + '-body" style="display:none">' + escapeHtml(req.body || '') + '</pre>' +
-                    '</div>' +
-                '</div>' +
-            '</div>';
-        }
+    async def serve_events(self, request):
+        self.in_flight -= 1
+        try:
+            await self.serve_sse(
+                request.writer, request.headers, last_event_id(request.headers, request.query),
+                summary_mode(request.query), query_channels(request.query),
+            )
+        finally:
+            self.in_flight += 1
+        return False
 
-        function formatJSON(obj, indent) {
-            if (obj === null) {
-                return '<span class="json-null" onclick="copyValue(this.textContent)">null</span>';
-            }
-            if (typeof obj === 'boolean') {
-                return '<span class="json-boolean" onclick="copyValue(this.textContent)">' + obj + '</span>';
-            }
-            if (typeof obj === 'number') {
-                return '<span class="json-number" onclick="copyValue(this.textContent)">' + obj + '</span>';
-            }
-            if (typeof obj === 'string') {
-                return '<span class="json-string" onclick="copyValue(this.textContent.slice(1,-1))">"' + escapeHtml(obj) + '"</span>';
-            }
-            if (Array.isArray(obj)) {
-                if (obj.length === 0) {
-                    return '<span class="json-bracket">[]</span>';
-                }
-                const newIndent = indent + '  ';
-                const NL = String.fromCharCode(10);
-                const items = obj.map(item => newIndent + formatJSON(item, newIndent)).join(',' + NL);
-                return '<span class="json-bracket">[</span>' + NL + items + NL + indent + '<span class="json-bracket">]</span>';
-            }
-            if (typeof obj === 'object') {
-                const keys = Object.keys(obj);
-                if (keys.length === 0) {
-                    return '<span class="json-bracket">{}</span>';
-                }
-                const newIndent = indent + '  ';
-                const NL = String.fromCharCode(10);
-                const items = keys.map(key => {
-                    const value = obj[key];
-                    return newIndent + '<span class="json-key" data-value="' + escapeHtml(typeof value === 'string' ? value : JSON.stringify(value)) + '" onclick="copyValue(this.dataset.value)">"' + escapeHtml(key) + '"</span>: ' + formatJSON(value, newIndent);
-                }).join(',' + NL);
-                return '<span class="json-bracket">{</span>' + NL + items + NL + indent + '<span class="json-bracket">}</span>';
-            }
-            return escapeHtml(String(obj));
-        }
+    async def serve_metrics(self, request):
+        await self.send_response(
+            request.writer, 200, render_metrics(), METRICS_CONTENT_TYPE, keep_alive=request.keep_alive
+        )
+        return request.keep_alive
 
-        function toggleRequest(index) {
-            const item = document.getElementById('request-' + index);
-            item.classList.toggle('expanded');
-        }
+    async def serve_export(self, request):
+        try:
+            filename, content_type, chunks = open_export(request.query)
+        except ValueError as e:
+            await self.send_json(request, {'error': str(e)}, 400)
+            return request.keep_alive
+        return await self.send_stream(
+            request.writer, content_type, chunks, request.version != 'HTTP/1.0' and request.keep_alive,
+            (('Content-Disposition', f'attachment; filename="{filename}"'),),
+        )
 
-        function copyEndpoint() {
-            const url = document.getElementById('endpointUrl').textContent;
-            copyToClipboard(url);
-        }
+    async def serve_api(self, request, route):
+        if request.method != 'GET' and cross_origin(request.headers):
+            status, data = CROSS_ORIGIN_ERROR
+        else:
+            status, data = call_api(route, request.query)
+        await self.send_json(request, data, status)
+        return request.keep_alive
 
-        function copyText(text) {
-            copyToClipboard(text);
-        }
+    async def serve_body(self, request, record_id):
+        """Async counterpart of WebhookHandler.serve_body()."""
+        webhook_data = webhooks.get(record_id)
+        if webhook_data is None:
+            await self.send_json(request, {'error': 'request not found'}, 404)
+            return request.keep_alive
+        path = body_path(webhook_data)
+        if path is None:
+            source = io.BytesIO(webhook_data.body)
+            size = len(webhook_data.body)
+        else:
+            try:
+                source = open(path, 'rb')
+            except OSError:
+                await self.send_json(request, {'error': 'body no longer available'}, 410)
+                return request.keep_alive
+            size = os.fstat(source.fileno()).st_size
 
-        function copyValue(value) {
-            copyToClipboard(value);
-        }
+        with source:
+            content_type = webhook_data.header('Content-Type', 'application/octet-stream')
+            decode = parse_qs(request.query).get('decode', ['0'])[-1] not in ('', '0')
+            if decode:
+                inflater = decompressor(webhook_data.header('Content-Encoding'))
+                if inflater is not None:
+                    return await self.send_stream(
+                        request.writer, content_type, inflate_chunks(source, inflater),
+                        request.version != 'HTTP/1.0' and request.keep_alive,
+                    )
+            try:
+                byte_range = parse_range(request.headers.get('Range'), size)
+            except ValueError:
+                await self.send_response(request.writer, 416, headers=[('Content-Range', f'bytes */{size}')],
+                                         keep_alive=request.keep_alive)
+                return request.keep_alive
+            start, end = byte_range or (0, size - 1)
 
-        function copyById(id) {
-            const el = document.getElementById(id);
-            if (el) {
-                copyToClipboard(el.textContent);
-            }
-        }
+            headers = [('Accept-Ranges', 'bytes')]
+            if byte_range:
+                headers.append(('Content-Range', f'bytes {start}-{end}/{size}'))
+            request.writer.write(self.response_head(
+                206 if byte_range else 200, content_type, end - start + 1, headers, request.keep_alive
+            ))
+            source.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                data = source.read(min(remaining, BodyBuffer.CHUNK_BYTES))
+                if not data:
+                    # The spool file shrank; the promised length cannot be met
+                    return False
+                request.writer.write(data)
+                await request.writer.drain()
+                remaining -= len(data)
+        return request.keep_alive
 
-        function copyToClipboard(text) {
-            navigator.clipboard.writeText(text).then(() => {
-                showToast('Copied to clipboard!');
-            }).catch(err => {
-                console.error('Failed to copy:', err);
-            });
-        }
+    async def serve_webhook(self, request, channel):
+        peer = request.writer.get_extra_info('peername')
+        rejected = admit_webhook(channel, request.headers, peer[0] if peer else '')
+        if rejected is not None:
+            # The unread body would be mistaken for the next request
+            keep_alive = request.keep_alive and not has_body(request.headers)
+            status, error, retry_after = rejected
+            await self.send_json(request, {'error': error}, status, keep_alive,
+                                 retry_after_header(retry_after))
+            return keep_alive
+        if (request.version == 'HTTP/1.1'
+                and request.headers.get('Expect', '').lower() == '100-continue'):
+            request.writer.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+        try:
+            body = await self.read_body(request.reader, request.headers)
+        except ValueError as e:
+            status = 413 if isinstance(e, BodyTooLarge) else 400
+            await self.send_json(request, {'error': str(e)}, status, keep_alive=False)
+            return False
+        webhook_data = record_webhook(request.method, request.target, request.headers, body, channel)
+        await self.send_json(request, {'status': 'received', 'id': webhook_data.id})
+        return request.keep_alive
 
-        function showToast(message) {
-            const toast = document.getElementById('copyToast');
-            toast.textContent = message;
-            toast.classList.add('show');
-            setTimeout(() => {
-                toast.classList.remove('show');
-            }, 2000);
-        }
+    async def read_body(self, reader, headers):
+        """Read the request body into a BodyBuffer (Content-Length or chunked)."""
+        body = BodyBuffer(max_body_bytes)
+        try:
+            if is_chunked(headers):
+                await self.read_chunked(reader, body)
+            else:
+                remaining = int(headers.get('Content-Length', 0))
+                while remaining > 0:
+                    data = await reader.read(min(remaining, BodyBuffer.CHUNK_BYTES))
+                    if not data:
+                        break
+                    body.write(data)
+                    remaining -= len(data)
+        except BaseException:
+            body.discard()
+            raise
+        body.close()
+        return body
 
-        function clearLogs() {
-            requests = [];
-            renderRequests();
-        }
+    async def read_chunked(self, reader, body):
+        """Async counterpart of read_chunked()."""
+        while True:
+            size = parse_chunk_size(await reader.readline())
+            if size == 0:
+                break
+            remaining = size
+            while remaining > 0:
+                data = await reader.read(min(remaining, BodyBuffer.CHUNK_BYTES))
+                if not data:
+                    raise ValueError('truncated chunk')
+                body.write(data)
+                remaining -= len(data)
+            if (await reader.readline()).strip():
+                raise ValueError('missing CRLF after chunk')
+        while (await reader.readline()).strip():
+            pass
 
-        function exportData() {
-            if (requests.length === 0) {
-                showToast('No data to export');
-                return;
-            }
-            const now = new Date();
-            const timestamp = now.getFullYear() +
-                String(now.getMonth() + 1).padStart(2, '0') +
-                String(now.getDate()).padStart(2, '0') + '_' +
-                String(now.getHours()).padStart(2, '0') +
-                String(now.getMinutes()).padStart(2, '0') +
-                String(now.getSeconds()).padStart(2, '0');
-            const filename = 'hooklens_' + timestamp + '.json';
-            const data = JSON.stringify(requests, null, 2);
-            const blob = new Blob([data], { type: 'application/json' });
-            const url = URL.createObjectURL(blob);
-            const a = document.createElement('a');
-            a.href = url;
-            a.download = filename;
-            document.body.appendChild(a);
-            a.click();
-            document.body.removeChild(a);
-            URL.revokeObjectURL(url);
-            showToast('Exported ' + requests.length + ' request(s)');
-        }
+    async def send_response(self, writer, status, body=b'', content_type=None, headers=(),
+                            keep_alive=False, cors=True):
+        head = self.response_head(status, content_type, None if status == 304 else len(body),
+                                  headers, keep_alive, cors)
+        writer.write(head + body)
+        await writer.drain()
 
-        function escapeHtml(str) {
-            if (str === null || str === undefined) return '';
-            return String(str)
-                .replace(/&/g, '&amp;')
-                .replace(/</g, '&lt;')
-                .replace(/>/g, '&gt;')
-                .replace(/"/g, '&quot;')
-                .replace(/'/g, '&#039;');
-        }
+    def response_head(self, status, content_type, length, headers=(), keep_alive=False, cors=True):
+        """Return the status line and headers of a response of known length."""
+        lines = [f'HTTP/1.1 {status} {HTTPStatus(status).phrase}']
+        if content_type:
+            lines.append(f'Content-Type: {content_type}')
+        if length is not None:
+            lines.append(f'Content-Length: {length}')
+        lines.append('Connection: keep-alive' if keep_alive else 'Connection: close')
+        for key, value in list(headers) + list(CORS_HEADERS if cors else ()):
+            lines.append(f'{key}: {value}')
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('iso-8859-1')
 
-        init();
-    </script>
-</body>
-</html>
-'''
+    async def send_stream(self, writer, content_type, chunks, chunked=True, headers=()):
+        """Send a chunked response (or, for HTTP/1.0, one ended by closing).
 
+        Returns False if the connection cannot be reused afterwards.
+        """
+        lines = ['HTTP/1.1 200 OK', f'Content-Type: {content_type}']
+        lines.append('Transfer-Encoding: chunked' if chunked else 'Connection: close')
+        for key, value in list(headers) + list(CORS_HEADERS):
+            lines.append(f'{key}: {value}')
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('iso-8859-1'))
+        chunks = iter(chunks)
+        while True:
+            try:
+                data = next(chunks)
+            except StopIteration:
+                break
+            except (ValueError, OSError, zlib.error):
+                # Headers are already sent; all we can do is cut the stream short
+                return False
+            if data:
+                writer.write(b'%x\r\n%s\r\n' % (len(data), data) if chunked else data)
+                await writer.drain()
+        if not chunked:
+            return False
+        writer.write(b'0\r\n\r\n')
+        await writer.drain()
+        return True
 
-class WebhookHandler(BaseHTTPRequestHandler):
-    """HTTP request handler for webhook debugging."""
+    async def serve_sse(self, writer, headers, event_id=None, summary=False, channels=None):
+        """Serve Server-Sent Events stream (of some channels, or all)."""
+        encoder = StreamEncoder(sse_compression and accepts_gzip(headers))
+        lines = ['HTTP/1.1 200 OK', 'Content-Type: text/event-stream',
+                 'Cache-Control: no-cache', 'Connection: keep-alive']
+        if encoder.compressor is not None:
+            lines += ['Content-Encoding: gzip', 'Vary: Accept-Encoding']
+        for key, value in CORS_HEADERS:
+            lines.append(f'{key}: {value}')
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('iso-8859-1'))
 
-    def log_message(self, format, *args):
-        """Override to suppress default logging."""
-        pass
+        client = event_ring.subscribe(channels)
+        changed = asyncio.Event()
+        keys = channels or (None,)
+        for key in keys:
+            self.waiters.setdefault(key, set()).add(changed)
+        try:
+            initial, cursor = open_event_stream(event_id, summary, client)
+            writer.write(encoder.encode(initial))
+            await writer.drain()
 
-    def send_cors_headers(self):
-        """Send CORS headers for cross-origin requests."""
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, PATCH, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', '*')
+            while True:
+                changed.clear()
+                events, cursor, missed = event_ring.read(cursor, summary, client)
+                if events or missed:
+                    writer.write(encoder.encode(encode_events(events, missed)))
+                else:
+                    try:
+                        await asyncio.wait_for(changed.wait(), timeout=30)
+                    except asyncio.TimeoutError:
+                        writer.write(encoder.encode(KEEPALIVE_FRAME))
+                    else:
+                        # Let a burst accumulate so it goes out as one write
+                        if sse_batch_delay:
+                            await asyncio.sleep(sse_batch_delay)
+                        continue
+                await writer.drain()
+        finally:
+            event_ring.unsubscribe(client)
+            for key in keys:
+                self.waiters[key].discard(changed)
+                if not self.waiters[key]:
+                    del self.waiters[key]
 
-    def do_OPTIONS(self):
-        """Handle OPTIONS requests for CORS preflight."""
-        self.send_response(200)
-        self.send_cors_headers()
-        self.end_headers()
 
-    def do_GET(self):
-        """Handle GET requests."""
-        parsed_path = urlparse(self.path)
+# Length prefix of the frames exchanged between CaptureBus and BusClient
+BUS_FRAME = struct.Struct('<I')
 
-        if parsed_path.path == '/':
-            self.serve_gui()
-        elif parsed_path.path == '/events':
-            self.serve_sse()
-        elif parsed_path.path == '/webhook':
-            self.handle_webhook('GET')
-        else:
-            self.send_error(404, 'Not Found')
 
-    def do_POST(self):
-        """Handle POST requests."""
-        parsed_path = urlparse(self.path)
+class CaptureBus:
+    """Put the captures of all worker processes in one order.
 
-        if parsed_path.path == '/webhook':
-            self.handle_webhook('POST')
-        else:
-            self.send_error(404, 'Not Found')
+    Runs in the parent process of ``--processes`` mode. Each worker is
+    connected by a Unix socket pair and sends its captures as
+    length-prefixed JSON records. Every record is appended to the capture
+    log and sent back to all workers in the order it arrived, so each
+    worker's history, event ids and SSE streams are identical.
+    """
 
-    def do_PUT(self):
-        """Handle PUT requests."""
-        parsed_path = urlparse(self.path)
+    def __init__(self):
+        self.selector = selectors.DefaultSelector()
+        self.workers = {}
 
-        if parsed_path.path == '/webhook':
-            self.handle_webhook('PUT')
-        else:
-            self.send_error(404, 'Not Found')
+    def add_worker(self, sock):
+        self.workers[sock] = bytearray()
+        self.selector.register(sock, selectors.EVENT_READ)
 
-    def do_DELETE(self):
-        """Handle DELETE requests."""
-        parsed_path = urlparse(self.path)
+    def remove_worker(self, sock):
+        self.selector.unregister(sock)
+        del self.workers[sock]
+        sock.close()
 
-        if parsed_path.path == '/webhook':
-            self.handle_webhook('DELETE')
-        else:
-            self.send_error(404, 'Not Found')
+    def serve_forever(self):
+        """Relay captures until every worker has gone away."""
+        while self.workers:
+            for key, _ in self.selector.select():
+                sock = key.fileobj
+                try:
+                    data = sock.recv(1024 * 1024)
+                except OSError:
+                    data = b''
+                if not data:
+                    self.remove_worker(sock)
+                    continue
+                buffer = self.workers[sock]
+                buffer += data
+                offset = 0
+                while len(buffer) - offset >= BUS_FRAME.size:
+                    size, = BUS_FRAME.unpack_from(buffer, offset)
+                    end = offset + BUS_FRAME.size + size
+                    if len(buffer) < end:
+                        break
+                    self.relay(bytes(buffer[offset:end]))
+                    offset = end
+                del buffer[:offset]
 
-    def do_PATCH(self):
-        """Handle PATCH requests."""
-        parsed_path = urlparse(self.path)
+    def relay(self, frame):
+        if capture_log is not None:
+            capture_log.append(frame[BUS_FRAME.size:])
+        if access_log is not None:
+            access_log.log(frame[BUS_FRAME.size:])
+        for sock in list(self.workers):
+            try:
+                sock.sendall(frame)
+            except OSError:
+                self.remove_worker(sock)
 
-        if parsed_path.path == '/webhook':
-            self.handle_webhook('PATCH')
-        else:
-            self.send_error(404, 'Not Found')
 
-    def serve_gui(self):
-        """Serve the HTML GUI."""
-        self.send_response(200)
-        self.send_header('Content-Type', 'text/html; charset=utf-8')
-        self.send_cors_headers()
-        self.end_headers()
-        self.wfile.write(HTML_TEMPLATE.encode('utf-8'))
+class BusClient:
+    """A worker's connection to the parent's CaptureBus.
 
-    def serve_sse(self):
-        """Serve Server-Sent Events stream."""
-        self.send_response(200)
-        self.send_header('Content-Type', 'text/event-stream')
-        self.send_header('Cache-Control', 'no-cache')
-        self.send_header('Connection', 'keep-alive')
-        self.send_cors_headers()
-        self.end_headers()
+    ``publish`` sends a capture to the parent; a reader thread commits the
+    captures the parent sends back, from every worker, in bus order. The
+    worker stops when the parent goes away.
+    """
 
-        # Create a queue for this client
-        client_queue = queue.Queue()
+    def __init__(self, sock):
+        self.sock = sock
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.reader_loop, name='hooklens-bus')
+        self.thread.daemon = True
+        self.thread.start()
 
-        with event_queues_lock:
-            event_queues.append(client_queue)
+    def publish(self, payload):
+        with self.lock:
+            self.sock.sendall(BUS_FRAME.pack(len(payload)) + payload)
 
-        try:
-            # Send initial connection event
-            self.wfile.write(b'data: {"type": "connected"}\n\n')
-            self.wfile.flush()
+    def reader_loop(self):
+        stream = self.sock.makefile('rb')
+        while True:
+            header = stream.read(BUS_FRAME.size)
+            if len(header) < BUS_FRAME.size:
+                break
+            size, = BUS_FRAME.unpack(header)
+            payload = stream.read(size)
+            if len(payload) < size:
+                break
+            try:
+                commit_capture(Capture.from_dict(json.loads(payload)), payload)
+            except Exception as e:
+                # One bad record must not stop every later capture
+                print(f'Worker {os.getpid()} skipped a capture: {e!r}', file=sys.stderr)
+        os.kill(os.getpid(), signal.SIGTERM)
 
-            # Send existing webhooks
-            with webhooks_lock:
-                for webhook in webhooks:
-                    event_data = json.dumps({'type': 'webhook', 'payload': webhook})
-                    self.wfile.write(f'data: {event_data}\n\n'.encode('utf-8'))
-                    self.wfile.flush()
 
-            # Wait for new events
-            while True:
-                try:
-                    event = client_queue.get(timeout=30)
-                    event_data = json.dumps(event)
-                    self.wfile.write(f'data: {event_data}\n\n'.encode('utf-8'))
-                    self.wfile.flush()
-                except queue.Empty:
-                    # Send keep-alive comment
-                    self.wfile.write(b': keepalive\n\n')
-                    self.wfile.flush()
-        except (BrokenPipeError, ConnectionResetError):
-            pass
-        finally:
-            with event_queues_lock:
-                if client_queue in event_queues:
-                    event_queues.remove(client_queue)
+def stop_on_signal(signum, frame):
+    raise KeyboardInterrupt
 
-    def handle_webhook(self, method):
-        """Handle incoming webhook requests."""
-        # Read request body
-        content_length = int(self.headers.get('Content-Length', 0))
-        body = ''
-        if content_length > 0:
-            body = self.rfile.read(content_length).decode('utf-8', errors='replace')
-
-        # Collect headers
-        headers_dict = {}
-        for key, value in self.headers.items():
-            headers_dict[key] = value
-
-        # Create webhook data
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        webhook_data = {
-            'id': str(uuid.uuid4()),
-            'timestamp': timestamp,
-            'method': method,
-            'path': self.path,
-            'headers': headers_dict,
-            'body': body
-        }
 
-        # Store webhook
-        with webhooks_lock:
-            webhooks.insert(0, webhook_data)
-            # Keep only last 100 webhooks
-            if len(webhooks) > 100:
-                webhooks.pop()
-
-        # Broadcast to all SSE clients
-        event = {'type': 'webhook', 'payload': webhook_data}
-        with event_queues_lock:
-            for q in event_queues:
-                try:
-                    q.put_nowait(event)
-                except queue.Full:
-                    pass
+def open_access_log(args):
+    """Create the AccessLog configured on the command line (None with --quiet)."""
+    if args.quiet:
+        return None
+    return AccessLog(
+        args.log_file, args.log_format, max(args.log_buffer, 1), args.log_policy,
+        int(args.log_max_mb * 1024 * 1024), max(args.log_backups, 0),
+    )
 
-        # Log to console
-        print(f'[{timestamp}] {method} {self.path}')
 
-        # Send response
-        self.send_response(200)
-        self.send_header('Content-Type', 'application/json')
-        self.send_cors_headers()
-        self.end_headers()
-        response = {'status': 'received', 'id': webhook_data['id']}
-        self.wfile.write(json.dumps(response).encode('utf-8'))
+def make_server(args, reuse_port=False):
+    """Create the server selected by --engine."""
+    server_address = ('', args.port)
+    if args.engine == 'asyncio':
+        return AsyncioHookLens(server_address, backlog=args.backlog, reuse_port=reuse_port)
+    return PooledHTTPServer(
+        server_address, WebhookHandler, workers=args.workers, backlog=args.backlog,
+        reuse_port=reuse_port,
+    )
+
+
+def serve(httpd):
+    """Serve until Ctrl+C or SIGTERM."""
+    try:
+        if isinstance(httpd, AsyncioHookLens):
+            httpd.run()
+        else:
+            httpd.serve_forever()
+    except KeyboardInterrupt:
+        if isinstance(httpd, PooledHTTPServer):
+            httpd.shutdown()
+            httpd.server_close()
 
 
-class ThreadedHTTPServer(HTTPServer):
-    """HTTP server that handles each request in a separate thread."""
+def run_processes(args):
+    """Fork --processes workers on one port and relay captures between them.
 
-    def process_request(self, request, client_address):
-        """Start a new thread to process the request."""
-        thread = threading.Thread(target=self.process_request_thread, args=(request, client_address))
-        thread.daemon = True
-        thread.start()
+    The parent only runs the CaptureBus (and the capture log); the workers
+    serve HTTP. History is restored before forking, so every worker starts
+    from the same state and event ids.
+    """
+    global capture_log, capture_bus, access_log
+    # Workers spool into one shared directory; only the parent cleans it up
+    spool_directory()
+    # Workers must not inherit the log's writer thread; reopen it afterwards
+    if capture_log is not None:
+        capture_log.close()
 
-    def process_request_thread(self, request, client_address):
-        """Process the request in a thread."""
-        try:
-            self.finish_request(request, client_address)
-        except Exception:
-            self.handle_error(request, client_address)
-        finally:
-            self.shutdown_request(request)
+    bus = CaptureBus()
+    pids = []
+    for _ in range(args.processes):
+        parent_end, child_end = socket.socketpair()
+        pid = os.fork()
+        if pid == 0:
+            parent_end.close()
+            for sock in bus.workers:
+                sock.close()
+            if capture_log is not None:
+                # Captures go through the bus; only read the parent's log
+                capture_log = CaptureLogReader(capture_log.directory)
+            capture_bus = BusClient(child_end)
+            status = 0
+            try:
+                serve(make_server(args, reuse_port=True))
+            except Exception as e:
+                print(f'Worker {os.getpid()} stopped: {e}', file=sys.stderr)
+                status = 1
+            finally:
+                # Skip the parent's atexit handlers (they own the spool dir)
+                sys.stdout.flush()
+                os._exit(status)
+        child_end.close()
+        bus.add_worker(parent_end)
+        pids.append(pid)
+
+    if capture_log is not None:
+        capture_log = CaptureLog(capture_log.directory)
+    access_log = open_access_log(args)
+    try:
+        bus.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+        for pid in pids:
+            os.waitpid(pid, 0)
 
 
 def main():
@@ -845,13 +4856,17 @@ def main():
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog='''
 Examples:
-  python hooklens.py              Start server on port 8080
-  python hooklens.py --port 9000  Start server on port 9000
+  python hooklens.py                   Start server on port 8080
+  python hooklens.py --port 9000       Start server on port 9000
+  python hooklens.py --workers 64      Serve with a pool of 64 worker threads
+  python hooklens.py --engine asyncio  Serve everything from one event loop
 
 Endpoints:
   GET  /          Web GUI
   GET  /events    SSE stream for real-time updates
   POST /webhook   Receive webhooks (also supports GET, PUT, DELETE, PATCH)
+  POST /webhook/<channel>/...      Receive webhooks on their own channel
+  POST /api/requests/{id}/replay   Send a captured request upstream again
 '''
     )
     parser.add_argument(
@@ -860,10 +4875,282 @@ Endpoints:
         default=8080,
         help='Port to listen on (default: 8080)'
     )
+    parser.add_argument(
+        '--engine',
+        choices=('threaded', 'asyncio'),
+        default='threaded',
+        help='Server engine (default: threaded)'
+    )
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=16,
+        help='Worker threads for the threaded engine (default: 16)'
+    )
+    parser.add_argument(
+        '--backlog',
+        type=int,
+        default=128,
+        help='Connections allowed to wait before clients get 503 (default: 128)'
+    )
+    parser.add_argument(
+        '--processes',
+        type=int,
+        default=1,
+        help='Worker processes accepting on the same port via SO_REUSEPORT (default: 1)'
+    )
+    parser.add_argument(
+        '--keepalive-timeout',
+        type=float,
+        default=5,
+        help='Seconds an idle persistent connection is kept open, 0 for no limit (default: 5)'
+    )
+    parser.add_argument(
+        '--keepalive-requests',
+        type=int,
+        default=1000,
+        help='Requests served per connection before it is closed, 0 for no limit (default: 1000)'
+    )
+    parser.add_argument(
+        '--sse-buffer',
+        type=int,
+        default=1024,
+        help='Events kept for slow SSE clients before they skip ahead (default: 1024)'
+    )
+    parser.add_argument(
+        '--sse-batch-ms',
+        type=float,
+        default=50,
+        help='Max delay used to batch SSE events into one write, 0 to send immediately (default: 50)'
+    )
+    parser.add_argument(
+        '--no-sse-compression',
+        action='store_true',
+        help='Never gzip SSE streams, even for clients that accept it'
+    )
+    parser.add_argument(
+        '--max-requests',
+        type=int,
+        default=100,
+        help='Captured requests kept in history, per channel (default: 100)'
+    )
+    parser.add_argument(
+        '--max-channels',
+        type=int,
+        default=64,
+        help='Channels (/webhook/<channel>) kept; the least recently used is dropped (default: 64)'
+    )
+    parser.add_argument(
+        '--max-memory-mb',
+        type=float,
+        default=256,
+        help='Memory budget for history and for buffered SSE events, 0 for none (default: 256)'
+    )
+    parser.add_argument(
+        '--parse-cache-mb',
+        type=float,
+        default=64,
+        help='Memory for parsed bodies kept for /api/requests/{id}/parsed (default: 64)'
+    )
+    parser.add_argument(
+        '--store',
+        metavar='DIR',
+        help='Persist every capture to append-only segment files in DIR'
+    )
+    parser.add_argument(
+        '--spool-threshold',
+        type=int,
+        default=1024 * 1024,
+        help='Bodies larger than this many bytes are streamed to disk, 0 to disable (default: 1048576)'
+    )
+    parser.add_argument(
+        '--max-body-bytes',
+        type=int,
+        default=0,
+        help='Answer 413 to webhooks with a larger body, 0 for no limit (default: 0)'
+    )
+    parser.add_argument(
+        '--rate-limit',
+        type=float,
+        default=0,
+        metavar='RATE',
+        help='Webhooks per second accepted from one source before 429, 0 for no limit (default: 0)'
+    )
+    parser.add_argument(
+        '--rate-burst',
+        type=int,
+        default=0,
+        help='Webhooks one source may send at once above --rate-limit (default: one second\'s worth)'
+    )
+    parser.add_argument(
+        '--rate-key',
+        metavar='HEADER',
+        help='Tell sources apart by this request header instead of the client IP'
+    )
+    parser.add_argument(
+        '--channel-quota',
+        action='append',
+        default=[],
+        metavar='[CHANNEL=]RATE',
+        help='Webhooks per second accepted on a channel before 429; without CHANNEL= for every channel (repeatable)'
+    )
+    parser.add_argument(
+        '--sample-rate',
+        type=float,
+        default=1,
+        help='Share of webhooks stored and shown, between 0 and 1; all are still forwarded (default: 1)'
+    )
+    parser.add_argument(
+        '--dedup',
+        action='store_true',
+        help='Count a webhook repeating an earlier one (same channel, method, path and body) on that record instead of storing it'
+    )
+    parser.add_argument(
+        '--dedup-ignore',
+        action='append',
+        metavar='FIELD[,FIELD...]',
+        help='JSON fields ignored by --dedup at any depth (repeatable; default: ' + ', '.join(DEDUP_IGNORE_FIELDS) + ')'
+    )
+    parser.add_argument(
+        '--quiet', '-q',
+        action='store_true',
+        help='Do not log captured requests'
+    )
+    parser.add_argument(
+        '--log-format',
+        choices=('text', 'json'),
+        default='text',
+        help='Access log line format (default: text)'
+    )
+    parser.add_argument(
+        '--log-file',
+        metavar='PATH',
+        help='Write the access log to PATH instead of stdout'
+    )
+    parser.add_argument(
+        '--log-max-mb',
+        type=float,
+        default=64,
+        help='Rotate the log file once it grows past this size, 0 to never rotate (default: 64)'
+    )
+    parser.add_argument(
+        '--log-backups',
+        type=int,
+        default=5,
+        help='Rotated log files to keep (default: 5)'
+    )
+    parser.add_argument(
+        '--log-buffer',
+        type=int,
+        default=10000,
+        help='Log lines buffered while the output is slow (default: 10000)'
+    )
+    parser.add_argument(
+        '--log-policy',
+        choices=('drop', 'block'),
+        default='drop',
+        help='When the log buffer is full: drop new lines or make requests wait (default: drop)'
+    )
+    parser.add_argument(
+        '--forward-to',
+        metavar='URL',
+        help='Relay every captured /webhook request to URL (http or https)'
+    )
+    parser.add_argument(
+        '--replay-any-url',
+        action='store_true',
+        help='Let POST /api/requests/{id}/replay send to any ?url=, not only the --forward-to host'
+    )
+    parser.add_argument(
+        '--forward-concurrency',
+        type=int,
+        default=8,
+        help='Upstream requests in flight at once (default: 8)'
+    )
+    parser.add_argument(
+        '--forward-queue',
+        type=int,
+        default=10000,
+        help='Deliveries waiting for the upstream before new ones are dropped (default: 10000)'
+    )
+    parser.add_argument(
+        '--forward-retries',
+        type=int,
+        default=3,
+        help='Retries after a connection error, 429 or 5xx response (default: 3)'
+    )
+    parser.add_argument(
+        '--forward-rate',
+        type=float,
+        default=0,
+        help='Max requests per second to each upstream host, 0 for no limit (default: 0)'
+    )
+    parser.add_argument(
+        '--forward-timeout',
+        type=float,
+        default=10,
+        help='Seconds to wait for an upstream to connect or answer (default: 10)'
+    )
     args = parser.parse_args()
+    if args.processes > 1 and not (hasattr(os, 'fork') and hasattr(socket, 'SO_REUSEPORT')):
+        parser.error('--processes needs fork() and SO_REUSEPORT (Linux, macOS or BSD)')
+    if args.forward_to and urlparse(args.forward_to).scheme not in ('http', 'https'):
+        parser.error('--forward-to must be an http:// or https:// URL')
+    if not 0 < args.sample_rate <= 1:
+        parser.error('--sample-rate must be above 0 and at most 1')
+    quotas = {}
+    for quota in args.channel_quota:
+        channel, _, rate = quota.rpartition('=')
+        try:
+            rate = float(rate)
+        except ValueError:
+            rate = 0
+        if rate <= 0 or channel and not CHANNEL_RE.match(channel):
+            parser.error(f'invalid --channel-quota {quota!r} (expected [CHANNEL=]RATE)')
+        quotas[channel or None] = RateLimiter(rate, name='channel_quota')
 
-    server_address = ('', args.port)
-    httpd = ThreadedHTTPServer(server_address, WebhookHandler)
+    max_bytes = int(args.max_memory_mb * 1024 * 1024) or None
+    global event_ring, webhooks, capture_log, store_dir, spool_threshold, spool_dir, access_log
+    global sse_batch_delay, sse_compression, keepalive_timeout, keepalive_requests
+    global forwarder, forward_url, replay_any_url
+    global max_body_bytes, source_limiter, source_header, channel_quotas
+    global sample_rate, deduplicator, parse_cache
+    event_ring = EventRing(args.sse_buffer, max_bytes)
+    webhooks = HistoryStore(args.max_requests, max_bytes, max(args.max_channels, 1))
+    spool_threshold = args.spool_threshold
+    sse_batch_delay = max(args.sse_batch_ms, 0) / 1000.0
+    sse_compression = not args.no_sse_compression
+    keepalive_timeout = max(args.keepalive_timeout, 0)
+    keepalive_requests = max(args.keepalive_requests, 0)
+    forwarder = Forwarder(
+        max(args.forward_concurrency, 1), max(args.forward_queue, 1), max(args.forward_retries, 0),
+        rate=max(args.forward_rate, 0), timeout=args.forward_timeout,
+    )
+    forward_url = args.forward_to
+    replay_any_url = args.replay_any_url
+    max_body_bytes = max(args.max_body_bytes, 0)
+    if args.rate_limit > 0:
+        source_limiter = RateLimiter(args.rate_limit, max(args.rate_burst, 0))
+    source_header = args.rate_key
+    channel_quotas = quotas
+    parse_cache = ParseCache(int(max(args.parse_cache_mb, 0) * 1024 * 1024))
+    sample_rate = args.sample_rate
+    if args.dedup:
+        ignore = DEDUP_IGNORE_FIELDS
+        if args.dedup_ignore is not None:
+            ignore = [field.strip() for fields in args.dedup_ignore for field in fields.split(',') if field.strip()]
+        deduplicator = Deduplicator(ignore, webhooks.max_requests * webhooks.max_channels)
+    if args.store:
+        capture_log = CaptureLog(args.store)
+        store_dir = args.store
+        spool_dir = os.path.join(args.store, 'bodies')
+        os.makedirs(spool_dir, exist_ok=True)
+        restore_history(capture_log.load_tail(args.max_requests * webhooks.max_channels))
+
+    httpd = None
+    if args.processes <= 1:
+        httpd = make_server(args)
+        access_log = open_access_log(args)
 
     print(f'''
 ╔═══════════════════════════════════════════════════════════════╗
@@ -873,13 +5160,25 @@ Endpoints:
 ║  Webhook:  http://localhost:{args.port:<5}/webhook                    ║
 ╚═══════════════════════════════════════════════════════════════╝
 ''')
+    if forward_url:
+        print(f'Forwarding captured requests to {forward_url}')
     print('Press Ctrl+C to stop the server\n')
 
+    # Treat SIGTERM like Ctrl+C so queued captures and spool files are cleaned up
+    signal.signal(signal.SIGTERM, stop_on_signal)
+
     try:
-        httpd.serve_forever()
-    except KeyboardInterrupt:
+        if httpd is None:
+            run_processes(args)
+        else:
+            serve(httpd)
         print('\nShutting down server...')
-        httpd.shutdown()
+    finally:
+        if capture_log is not None:
+            capture_log.close()
+        if access_log is not None:
+            access_log.close()
+        forwarder.close()
 
 
 if __name__ == '__main__':